@@ -1,21 +1,114 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Generator, Optional
+import math
+import time
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, create_engine
+from sqlmodel import Session
 from jose import jwt, JWTError
 
 from backend.core.config import settings
+from backend.core.database import ReadOnlySession, db_router
+from backend.core.sharding import shard_router
+from backend.core.security import decode_token
+from backend.core.singleflight import SingleFlight
 from backend.models.user import User
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = db_router.primary
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/access-token")
 
+# Concurrent read requests for the same user share one user lookup
+user_flights = SingleFlight(timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS)
+
 def get_db() -> Generator:
-    with Session(engine) as session:
+    with db_router.write_session() as session:
+        yield session
+
+# Set on write responses so the caller's next reads stay on the primary even
+# when another worker process serves them
+LAST_WRITE_COOKIE = "last_write"
+
+def _last_write_at(request: Request) -> Optional[float]:
+    try:
+        return float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+def get_read_db(request: Request, token: str = Depends(oauth2_scheme)) -> Generator:
+    """
+    Read-only session for GET routes. Uses a replica unless the caller wrote recently.
+    """
+    user_id = decode_token(token)
+    last_write_at = _last_write_at(request)
+    with db_router.read_session(int(user_id) if user_id is not None else None, last_write_at) as session:
+        yield session
+
+def get_shard_db(user_id: int, db: Session = Depends(get_db)) -> Generator:
+    """
+    Session on the shard holding user_id's tasks. Reuses the primary session for shard 0.
+    """
+    shard, moving = shard_router.placement(db, user_id)
+    if moving:
+        raise HTTPException(
+            status_code=503,
+            detail="Tasks are being moved, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    if shard == 0:
+        yield db
+        return
+    with shard_router.session(shard) as session:
+        yield session
+
+def get_shard_read_db(user_id: int, db: Session = Depends(get_read_db)) -> Generator:
+    """
+    Read-only session on the shard holding user_id's tasks. Shard 0 reads may use a replica.
+    """
+    shard, _ = shard_router.placement(db, user_id)
+    if shard == 0:
+        yield db
+        return
+    with ReadOnlySession(shard_router.engines[shard]) as session:
         yield session
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+admin_user_ids = {int(user_id) for user_id in settings.ADMIN_USER_IDS.split(",") if user_id.strip()}
+
+def is_admin_token(token: str) -> bool:
+    """Whether the token is valid and belongs to an admin (no database lookup)."""
+    user_id = decode_token(token)
+    return user_id is not None and user_id.isdigit() and int(user_id) in admin_user_ids
+
+def get_current_admin(token: str = Depends(oauth2_scheme)) -> int:
+    user_id = decode_token(token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    if not is_admin_token(token):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return int(user_id)
+
+def get_current_user(response: Response, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    user = _get_user_from_token(token, db)
+    # Mutating routes use this dependency; keep the user's reads on the primary for a while
+    db_router.mark_write(user.id)
+    if db_router.replicas:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{time.time():.3f}",
+            max_age=math.ceil(db_router.sticky_seconds),
+            httponly=True,
+            secure=True,
+            samesite="none", # The frontend calls the API cross-site with credentials
+        )
+    return user
+
+def get_current_user_read(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)) -> User:
+    # The shared User is only read (id, profile fields), never modified or re-attached
+    return _get_user_from_token(token, db, coalesce=True)
+
+def _get_user_from_token(token: str, db: Session, coalesce: bool = False) -> User:
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
         user_id: str = payload.get("sub")
@@ -30,7 +123,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             detail="Could not validate credentials",
         )
     
-    user = db.get(User, int(user_id))
+    if coalesce:
+        user = user_flights.do(("user", int(user_id)), lambda: db.get(User, int(user_id)))
+    else:
+        user = db.get(User, int(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
@@ -8,6 +10,7 @@ from backend.crud import user as user_crud
 from backend.schemas.user import UserCreate, Token, User
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/register", response_model=Token)
 def register_user(
@@ -31,6 +34,8 @@ def register_user(
             status_code=409, # 409 Conflict is more appropriate for duplicate resource
             detail=str(e),
         )
+    deps.db_router.mark_write(user.id)
+    deps.shard_router.assign(db, user.id)
     access_token = create_access_token(subject=user.id)
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -43,24 +48,23 @@ def login_for_access_token(
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    print(f"Login attempt: Email={form_data.username}, Password={'*' * len(form_data.password)}") # Debug print
     user = user_crud.authenticate_user(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
-        print("Login failed: Invalid credentials or user not found.") # Debug print
+        logger.info("Login failed", extra={"email": form_data.username})
         raise HTTPException(
             status_code=401,
             detail="Incorrect email or password.", # More specific detail
             headers={"WWW-Authenticate": "Bearer"},
         )
-    print(f"Login successful for user ID: {user.id}") # Debug print
+    logger.info("Login succeeded", extra={"user_id": user.id})
     access_token = create_access_token(subject=user.id)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
 def read_user_me(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: User = Depends(deps.get_current_user_read),
 ):
     """
     Get current user.
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Literal
+
+from backend.api import deps
+from backend.core.cache import task_list_cache
+from backend.core.config import settings
+from backend.core.diagnostics import SamplingProfiler, folded, memory_tracer, profile_store, profiler_lock
+
+router = APIRouter(dependencies=[Depends(deps.get_current_admin)])
+
+@router.get("/profile", response_class=PlainTextResponse)
+def cpu_profile(
+    seconds: float = Query(5, gt=0),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    include_idle: bool = False,
+    backend_only: bool = False,
+):
+    """
+    Sample the stacks of every thread of this worker for `seconds` and return
+    them as folded stacks ("frame;frame count" lines) for flamegraph.pl or
+    speedscope. Parked threads are left out unless include_idle=true;
+    backend_only=true keeps only stacks that pass through backend code.
+    """
+    if seconds > settings.DIAGNOSTICS_MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.DIAGNOSTICS_MAX_PROFILE_SECONDS}")
+    if not profiler_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    try:
+        profiler = SamplingProfiler(interval_ms / 1000, include_idle=include_idle, backend_only=backend_only)
+        return folded(profiler.profile(seconds))
+    finally:
+        profiler_lock.release()
+
+@router.get("/requests")
+def list_request_profiles():
+    """
+    Recent per-request profiles on this worker, newest first. A request is
+    profiled when an admin sends it with an X-Profile header; the response
+    carries the profile ID in X-Profile-Id.
+    """
+    return profile_store.list()
+
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+def read_request_profile(profile_id: str):
+    """
+    Folded stacks of one profiled request.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile["folded"]
+
+@router.get("/memory")
+def memory_status():
+    """
+    Whether tracemalloc is running, and traced/peak memory.
+    """
+    return memory_tracer.status()
+
+@router.post("/memory/start")
+def start_memory_tracing(frames: int = Query(1, ge=1, le=50)):
+    """
+    Start tracemalloc, keeping `frames` frames per allocation. Tracing slows
+    allocations down and uses memory until stopped.
+    """
+    return memory_tracer.start(frames)
+
+@router.post("/memory/stop")
+def stop_memory_tracing():
+    """
+    Stop tracemalloc and free its traces.
+    """
+    return memory_tracer.stop()
+
+@router.get("/memory/snapshot")
+def memory_snapshot(
+    limit: int = Query(20, gt=0, le=500),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    compare: bool = False,
+):
+    """
+    Top allocation sites by size. With compare=true, growth since the
+    previous snapshot (call once to set the baseline).
+    """
+    try:
+        return memory_tracer.snapshot(limit=limit, group_by=group_by, compare=compare)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/cache")
+def cache_stats():
+    """
+    Task list cache counters on this worker since it started: hits (local
+    and shared tier), misses, hit ratio, invalidations, and the size and
+    evictions of the in-process tier.
+    """
+    return {"enabled": task_list_cache.enabled, **task_list_cache.stats()}
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List
+
+from backend.api import deps
+from backend.models import User
+from backend.services.tag_service import tag_service
+from backend.schemas.tag import TagAssign, TagResponse
+
+router = APIRouter()
+
+@router.get("/{user_id}/tags", response_model=List[TagResponse])
+def read_tags(
+    user_id: int,
+    db: Session = Depends(deps.get_shard_read_db),
+    current_user: User = Depends(deps.get_current_user_read),
+):
+    """
+    List the user's tags with the number of tasks carrying each.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access these tags")
+    return tag_service.list_tags(db, user=current_user)
+
+@router.post("/{user_id}/tags/assign", response_model=List[TagResponse])
+def assign_tags(
+    user_id: int,
+    *,
+    db: Session = Depends(deps.get_shard_db),
+    assign_in: TagAssign,
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Add and/or remove tags on many tasks at once. Unknown tags in add are created.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify these tasks")
+    return tag_service.assign(
+        db=db, user=current_user, task_ids=assign_in.task_ids, add=assign_in.add, remove=assign_in.remove
+    )
@@ -1,33 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session
-from typing import List
+from typing import List, Literal, Optional
+import datetime
 import uuid
 
 from backend.api import deps
 from backend.models import User
 from backend.services.task_service import task_service
-from backend.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from backend.schemas.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskMove, TaskRollup, TaskHistoryResponse, TaskBatch, TaskBatchResult,
+)
 
 router = APIRouter()
 
 @router.get("/{user_id}/tasks", response_model=List[TaskResponse])
 def read_tasks(
     user_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    updated_since: Optional[datetime.datetime] = None,
+    archived: bool = False,
+    due: Optional[Literal["overdue", "upcoming"]] = None,
+    due_within_hours: float = Query(24, gt=0),
+    limit: Optional[int] = Query(None, gt=0, le=1000),
+    after_id: Optional[int] = None,
+    tags: Optional[List[str]] = Query(None),
+    tag_mode: Literal["any", "all"] = "any",
+    db: Session = Depends(deps.get_shard_read_db),
+    current_user: User = Depends(deps.get_current_user_read),
 ):
     """
-    Retrieve all tasks for a specific user.
+    Retrieve all tasks for a specific user. Filters can be combined.
+    Pass updated_since to only get tasks changed at or after that time.
+    Pass due=overdue or due=upcoming (within due_within_hours) to list open tasks by due date, soonest first.
+    Pass one or more tags to list tasks with any of them (or all, with tag_mode=all).
+    Pass limit (and after_id, the last task of the previous page) to page through the results in order.
+    Pass archived=true to list archived (old completed) tasks instead; it takes no other filter.
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access these tasks")
-    return task_service.get_user_tasks(db, user=current_user)
+    filtered = updated_since is not None or due is not None or bool(tags) or limit is not None or after_id is not None
+    if archived:
+        if filtered:
+            raise HTTPException(status_code=422, detail="archived=true cannot be combined with other filters")
+        return task_service.get_archived_tasks(db, user=current_user)
+    if filtered:
+        return task_service.list_tasks(
+            db,
+            user=current_user,
+            updated_since=updated_since,
+            due=due,
+            within=datetime.timedelta(hours=due_within_hours),
+            tags=tags,
+            match_all=tag_mode == "all",
+            limit=limit,
+            after_id=after_id,
+        )
+    # Full list is cached as serialized JSON, so skip response_model validation
+    return Response(content=task_service.get_user_tasks_json(db, user=current_user), media_type="application/json")
 
 @router.post("/{user_id}/tasks", response_model=TaskResponse)
 def create_task(
     user_id: int,
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_shard_db),
     task_in: TaskCreate,
     current_user: User = Depends(deps.get_current_user),
 ):
@@ -38,12 +72,33 @@ def create_task(
         raise HTTPException(status_code=403, detail="Not authorized to create tasks for this user")
     return task_service.create_task(db=db, user=current_user, task_data=task_in.model_dump())
 
+@router.post("/{user_id}/tasks/batch", response_model=TaskBatchResult)
+def batch_tasks(
+    user_id: int,
+    *,
+    db: Session = Depends(deps.get_shard_db),
+    batch_in: TaskBatch,
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Create, update and delete many tasks in one request and one transaction.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify these tasks")
+    return task_service.apply_batch(
+        db=db,
+        user=current_user,
+        create=[task.model_dump() for task in batch_in.create],
+        update=[task.model_dump(exclude_unset=True) for task in batch_in.update],
+        delete=batch_in.delete,
+    )
+
 @router.get("/{user_id}/tasks/{id}", response_model=TaskResponse)
 def read_task(
     user_id: int,
     id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_shard_read_db),
+    current_user: User = Depends(deps.get_current_user_read),
 ):
     """
     Get task by ID.
@@ -57,7 +112,7 @@ def update_task(
     user_id: int,
     id: int,
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_shard_db),
     task_in: TaskUpdate,
     current_user: User = Depends(deps.get_current_user),
 ):
@@ -68,16 +123,93 @@ def update_task(
         raise HTTPException(status_code=403, detail="Not authorized to update this task")
     return task_service.update_task(db=db, user=current_user, task_id=id, task_data=task_in.model_dump(exclude_unset=True))
 
+@router.patch("/{user_id}/tasks/{id}/move", response_model=TaskResponse)
+def move_task(
+    user_id: int,
+    id: int,
+    *,
+    db: Session = Depends(deps.get_shard_db),
+    move_in: TaskMove,
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Move a task right after another task (after_id, null for the top) and/or
+    under another task (parent_id, null for top level) together with its subtasks.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify this task")
+    return task_service.move_task(db=db, user=current_user, task_id=id, move_data=move_in.model_dump(exclude_unset=True))
+
+@router.get("/{user_id}/tasks/{id}/subtree", response_model=List[TaskResponse])
+def read_subtree(
+    user_id: int,
+    id: int,
+    db: Session = Depends(deps.get_shard_read_db),
+    current_user: User = Depends(deps.get_current_user_read),
+):
+    """
+    Get a task and all its subtasks at any depth, parents before children.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this task")
+    return task_service.get_subtree(db, user=current_user, task_id=id)
+
+@router.get("/{user_id}/tasks/{id}/rollup", response_model=TaskRollup)
+def read_rollup(
+    user_id: int,
+    id: int,
+    db: Session = Depends(deps.get_shard_read_db),
+    current_user: User = Depends(deps.get_current_user_read),
+):
+    """
+    Count a task's subtasks (at any depth) and how many are completed.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this task")
+    return task_service.get_rollup(db, user=current_user, task_id=id)
+
+@router.get("/{user_id}/tasks/{id}/history", response_model=List[TaskHistoryResponse])
+def read_history(
+    user_id: int,
+    id: int,
+    limit: int = Query(50, gt=0, le=500),
+    before_version: Optional[int] = None,
+    db: Session = Depends(deps.get_shard_read_db),
+    current_user: User = Depends(deps.get_current_user_read),
+):
+    """
+    Get the change history of a task (also after it was deleted), newest first.
+    Pass the last version received as before_version to get the next page.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this task")
+    return task_service.get_history(db, user=current_user, task_id=id, limit=limit, before_version=before_version)
+
+@router.patch("/{user_id}/tasks/{id}/subtree/complete", response_model=TaskRollup)
+def complete_subtree(
+    user_id: int,
+    id: int,
+    completed: bool = True,
+    db: Session = Depends(deps.get_shard_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Mark a task and all its subtasks as completed (or not, with completed=false).
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify this task")
+    return task_service.set_subtree_completed(db=db, user=current_user, task_id=id, completed=completed)
+
 @router.delete("/{user_id}/tasks/{id}")
 def delete_task(
     user_id: int,
     id: int,
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_shard_db),
     current_user: User = Depends(deps.get_current_user),
 ):
     """
-    Delete a task.
+    Delete a task and its subtasks.
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this task")
@@ -88,7 +220,7 @@ def delete_task(
 def toggle_task_completion(
     user_id: int,
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_shard_db),
     current_user: User = Depends(deps.get_current_user),
 ):
     """
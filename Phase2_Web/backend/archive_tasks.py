@@ -0,0 +1,32 @@
+"""
+Move old completed tasks into the task_archive table once.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.archive_tasks
+    python -m backend.archive_tasks --older-than-days 7 --batch-size 5000
+"""
+import argparse
+
+from sqlmodel import SQLModel
+
+from backend.core.sharding import shard_router
+from backend.services.archive_service import archive_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, help="Archive completed tasks untouched this long (default: ARCHIVE_AFTER_DAYS)")
+    parser.add_argument("--batch-size", type=int, help="Tasks moved per transaction (default: ARCHIVE_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    SQLModel.metadata.create_all(shard_router.engines[0])
+    shard_router.create_schemas()
+
+    total = archive_service.archive_completed(
+        older_than_days=args.older_than_days, batch_size=args.batch_size, log=print
+    )
+    print(f"Archived {total} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Measure GET /{user_id}/tasks throughput with the task list cache off and on.
+
+Runs the app in process (TestClient) against a fresh SQLite file, or the
+database in DATABASE_URL with --use-env-database. --users users start with
+--tasks tasks each; then --requests requests, --write-ratio of them creates
+and the rest list reads, are sent once with the cache disabled and once with
+it enabled. SQL statements are counted on the primary engine.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_cache
+    python -m backend.benchmark_cache --requests 5000 --write-ratio 0.05
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200, help="Tasks per user before the run")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per run")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Share of requests that create a task")
+    parser.add_argument("--use-env-database", action="store_true", help="Use DATABASE_URL instead of a new SQLite file")
+    args = parser.parse_args()
+
+    # Settings are read when the app is imported, so configure the environment first
+    if not args.use_env_database:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="cache-bench-"), "tasks.db")
+    for name in ("ARCHIVE_INTERVAL_SECONDS", "REMINDER_POLL_SECONDS"):
+        os.environ[name] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, insert
+
+    from backend.core.cache import task_list_cache
+    from backend.core.database import db_router
+    from backend.core.security import create_access_token
+    from backend.main import app
+    from backend.models.task import Task
+    from backend.models.user import User
+
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    with TestClient(app) as client:
+        first_user = 1_000_000
+        user_ids = list(range(first_user, first_user + args.users))
+        with db_router.primary.begin() as connection:
+            connection.execute(insert(User), [
+                {"id": user_id, "email": f"cache-bench{user_id}@example.com", "password_hash": "-"} for user_id in user_ids
+            ])
+            connection.execute(insert(Task), [
+                {"user_id": user_id, "title": f"task {n}", "position": f"a{n:06d}"}
+                for user_id in user_ids for n in range(args.tasks)
+            ])
+        headers = {user_id: {"Authorization": f"Bearer {create_access_token(user_id)}"} for user_id in user_ids}
+        event.listen(db_router.primary, "before_cursor_execute", count)
+
+        print(f"{'cache':<6}  {'req/s':>7}  {'statements':>10}  {'hit ratio':>9}")
+        for enabled in (False, True):
+            task_list_cache.enabled = enabled
+            for user_id in user_ids:
+                task_list_cache.invalidate(user_id)
+            before = task_list_cache.stats()
+            statements = 0
+            rng = random.Random(0)
+            start = time.perf_counter()
+            for n in range(args.requests):
+                user_id = rng.choice(user_ids)
+                if rng.random() < args.write_ratio:
+                    response = client.post(f"/api/v1/{user_id}/tasks", json={"title": f"bench {n}"}, headers=headers[user_id])
+                else:
+                    response = client.get(f"/api/v1/{user_id}/tasks", headers=headers[user_id])
+                response.raise_for_status()
+            rate = args.requests / (time.perf_counter() - start)
+            after = task_list_cache.stats()
+            hits = after["hits"] - before["hits"]
+            lookups = hits + after["misses"] - before["misses"]
+            ratio = f"{hits / lookups:.0%}" if enabled and lookups else "-"
+            print(f"{'on' if enabled else 'off':<6}  {rate:>7.0f}  {statements:>10}  {ratio:>9}")
+
+
+if __name__ == "__main__":
+    main()
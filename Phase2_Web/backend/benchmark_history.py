@@ -0,0 +1,89 @@
+"""
+Measure what recording task history adds to writes.
+
+Loads one user with --tasks tasks and a parent with --subtree subtasks into
+a fresh SQLite file or --url. With history off and then on, times --updates
+single-task updates (one session and commit each, like a request) and
+completing the whole subtree.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_history
+    python -m backend.benchmark_history --updates 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.core.database import engine_options
+from backend.models.task import Task
+from backend.models.user import User
+from backend.services.task_service import task_service
+
+USER_ID = 1
+
+
+def populate(engine, tasks: int, subtree: int) -> int:
+    """Insert the tasks and the subtree. Returns the id of the subtree's root."""
+    root = tasks + 1
+    rows = [
+        {"id": n + 1, "user_id": USER_ID, "title": f"task {n}", "position": f"a{n:06d}", "parent_id": None, "path": "/"}
+        for n in range(tasks)
+    ]
+    rows.append({"id": root, "user_id": USER_ID, "title": "root", "position": "b", "parent_id": None, "path": "/"})
+    rows.extend(
+        {"id": root + n + 1, "user_id": USER_ID, "title": f"subtask {n}", "position": f"c{n:06d}",
+         "parent_id": root, "path": f"/{root}/"}
+        for n in range(subtree)
+    )
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": USER_ID, "email": "history-bench@example.com", "password_hash": "-"}])
+        connection.execute(insert(Task), rows)
+    return root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks updated at random")
+    parser.add_argument("--subtree", type=int, default=10_000, help="Subtasks completed at once")
+    parser.add_argument("--updates", type=int, default=3000, help="Updates per run")
+    parser.add_argument("--url", help="Empty database to load (default: a new SQLite file)")
+    args = parser.parse_args()
+
+    url = args.url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="history-bench-"), "tasks.db")
+    engine = create_engine(url, **engine_options(url))
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        if db.exec(select(func.count()).select_from(Task)).one():
+            raise SystemExit(f"{url} already has tasks; pass an empty database")
+    root = populate(engine, args.tasks, args.subtree)
+
+    print(f"{'history':<8}  {'update p50 ms':>13}  {'update p99 ms':>13}  {f'complete {args.subtree + 1:,} ms':>20}")
+    for enabled in (False, True):
+        task_service.history.enabled = enabled
+        rng = random.Random(0)
+        times = []
+        for n in range(args.updates):
+            with Session(engine) as db:
+                user = db.get(User, USER_ID)
+                start = time.perf_counter()
+                task_service.update_task(db, user, rng.randint(1, args.tasks), {"title": f"update {n}"})
+                times.append((time.perf_counter() - start) * 1000)
+        p99 = statistics.quantiles(times, n=100)[98]
+
+        with Session(engine) as db:
+            user = db.get(User, USER_ID)
+            start = time.perf_counter()
+            task_service.set_subtree_completed(db, user, root, True)
+            complete_ms = (time.perf_counter() - start) * 1000
+            task_service.set_subtree_completed(db, user, root, False)
+        print(f"{'on' if enabled else 'off':<8}  {statistics.median(times):>13.2f}  {p99:>13.2f}  {complete_ms:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
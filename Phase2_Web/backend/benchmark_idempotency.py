@@ -0,0 +1,128 @@
+"""
+Measure a retry storm against POST /{user_id}/tasks with and without Idempotency-Key.
+
+Starts one uvicorn worker per run on a fresh SQLite file. --creates logical
+creates are each sent --copies times at once (a client retrying aggressively)
+from --threads client threads: without a key, with a key on the memory
+backend, and with a key on the database backend. Prints the rows created,
+the wall time and request latency.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_idempotency
+    python -m backend.benchmark_idempotency --creates 500 --threads 64
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+USER_ID = 1
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(url: str, port: int, backend: str) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=url, IDEMPOTENCY_BACKEND=backend, LOG_LEVEL="WARNING",
+               ARCHIVE_INTERVAL_SECONDS="0", REMINDER_POLL_SECONDS="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit("The server did not start")
+
+
+def storm(port: int, token: str, creates: int, copies: int, threads: int, keyed: bool):
+    """Send the requests. Returns (seconds, latencies in ms, status counts)."""
+    requests = []
+    for n in range(creates):
+        key = str(uuid.uuid4()) if keyed else None
+        requests.extend([(n, key)] * copies)
+
+    def send(request):
+        n, key = request
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        if key is not None:
+            headers["Idempotency-Key"] = key
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        start = time.perf_counter()
+        connection.request("POST", f"/api/v1/{USER_ID}/tasks", json.dumps({"title": f"storm {n}"}), headers)
+        status = connection.getresponse().status
+        connection.close()
+        return (time.perf_counter() - start) * 1000, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(send, requests))
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return time.perf_counter() - start, [ms for ms, _ in results], statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--creates", type=int, default=200, help="Logical creates")
+    parser.add_argument("--copies", type=int, default=5, help="Times each create is sent")
+    parser.add_argument("--threads", type=int, default=32, help="Client threads")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="idempotency-bench-")
+    # Settings are read on import; point them at a scratch database before importing the app's modules
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(directory, "unused.db")
+    from sqlalchemy import func
+    from sqlmodel import Session, SQLModel, create_engine, select
+
+    from backend.core.database import engine_options
+    from backend.core.security import create_access_token
+    from backend.models.task import Task
+    from backend.models.user import User
+
+    token = create_access_token(USER_ID)
+    print(f"{'run':<14}  {'rows':>5}  {'seconds':>7}  {'p50 ms':>7}  {'p99 ms':>7}  statuses")
+    for name, keyed, backend in [("no key", False, "memory"), ("key, memory", True, "memory"),
+                                 ("key, database", True, "database")]:
+        url = "sqlite:///" + os.path.join(directory, f"{backend}-{int(keyed)}.db")
+        engine = create_engine(url, **engine_options(url))
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(User(id=USER_ID, email="storm@example.com", password_hash="-"))
+            db.commit()
+
+        port = free_port()
+        server = start_server(url, port, backend)
+        try:
+            seconds, latencies, statuses = storm(port, token, args.creates, args.copies, args.threads, keyed)
+        finally:
+            server.terminate()
+            server.wait()
+        with Session(engine) as db:
+            rows = db.exec(select(func.count()).select_from(Task)).one()
+        engine.dispose()
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(f"{name:<14}  {rows:>5}  {seconds:>7.1f}  {statistics.median(latencies):>7.0f}  {p99:>7.0f}  "
+              + " ".join(f"{status}x{count}" for status, count in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
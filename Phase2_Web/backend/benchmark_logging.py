@@ -0,0 +1,101 @@
+"""
+Measure what writing a log line costs the thread that logs it.
+
+Each variant runs in a child process whose stdout is a pipe read by this
+process, either as fast as possible or slowly (4 KB every 2 ms, like a busy
+log collector). The child writes --records lines and reports the time per
+record on its own thread:
+
+    print     print() to stdout
+    handler   a logging.StreamHandler on stdout (what SQLAlchemy's echo=True installs)
+    queue     the app's logging (core/log.py): queued, written by a listener thread
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_logging
+    python -m backend.benchmark_logging --records 50000
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+
+VARIANTS = ("print", "handler", "queue")
+
+# About the length of a logged SQL statement or access record
+MESSAGE = "SELECT task.id, task.user_id, task.title, task.completed FROM task WHERE task.user_id = ? ORDER BY task.position"
+
+
+def write_records(variant: str, records: int) -> float:
+    """Write the records with one variant. Returns microseconds per record."""
+    if variant == "print":
+        def emit(n):
+            print(MESSAGE, n)
+    elif variant == "handler":
+        logger = logging.getLogger("bench.handler")
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+        def emit(n):
+            logger.info("%s %d", MESSAGE, n)
+    else:
+        os.environ["LOG_LEVEL"] = "INFO"
+        # Room for every record, so none is dropped and each one is measured
+        os.environ["LOG_QUEUE_SIZE"] = str(records + 1)
+        from backend.core.log import setup_logging
+        setup_logging()
+        logger = logging.getLogger("bench.queue")
+
+        def emit(n):
+            logger.info("%s %d", MESSAGE, n)
+
+    start = time.perf_counter()
+    for n in range(records):
+        emit(n)
+    return (time.perf_counter() - start) / records * 1e6
+
+
+def run_child(variant: str, records: int, slow: bool) -> float:
+    """Run one variant in a child process and drain its stdout. Returns microseconds per record."""
+    child = subprocess.Popen(
+        [sys.executable, "-m", "backend.benchmark_logging", "--child", variant, "--records", str(records)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    while True:
+        if slow:
+            chunk = os.read(child.stdout.fileno(), 4096)
+            time.sleep(0.002)
+        else:
+            chunk = os.read(child.stdout.fileno(), 1 << 16)
+        if not chunk:
+            break
+    _, errors = child.communicate()
+    if child.returncode:
+        raise SystemExit(errors.decode())
+    return float(errors.decode().strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000, help="Lines written per run")
+    parser.add_argument("--child", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        per_record = write_records(args.child, args.records)
+        sys.stdout.flush()
+        print(f"{per_record:.2f}", file=sys.stderr)
+        return
+
+    print(f"{'variant':<8}  {'fast reader us':>14}  {'slow reader us':>14}")
+    for variant in VARIANTS:
+        fast = run_child(variant, args.records, slow=False)
+        slow = run_child(variant, args.records, slow=True)
+        print(f"{variant:<8}  {fast:>14.1f}  {slow:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
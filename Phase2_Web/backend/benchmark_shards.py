@@ -0,0 +1,98 @@
+"""
+Measure task write throughput as shards are added (1 to --max-shards).
+
+Each shard is its own database: by default a fresh SQLite file in a temporary
+directory, or --url-template for real servers (e.g.
+"postgresql+psycopg2://app@localhost/tasks_{shard}", databases must exist).
+Writer threads create tasks for random users, routed through the shard hash
+ring, with one transaction per task.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_shards
+    python -m backend.benchmark_shards --max-shards 4 --writers 8 --seconds 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.core.database import engine_options
+from backend.core.sharding import ShardRouter
+from backend.models.task import Task
+from backend.models.user import User
+
+
+def ensure_users(primary, users: int) -> None:
+    with Session(primary) as db:
+        existing = set(db.exec(select(User.id).where(User.id <= users)).all())
+        db.add_all(
+            User(id=user_id, email=f"bench{user_id}@example.com", password_hash="-")
+            for user_id in range(1, users + 1) if user_id not in existing
+        )
+        db.commit()
+
+
+def measure(router: ShardRouter, writers: int, users: int, seconds: float) -> float:
+    """Return tasks written per second across all writers."""
+    stop = threading.Event()
+    counts = [0] * writers
+
+    def writer(index: int) -> None:
+        rng = random.Random(index)
+        while not stop.is_set():
+            user_id = rng.randint(1, users)
+            with router.session(router.ring_shard(user_id)) as db:
+                db.add(Task(user_id=user_id, title=f"bench {index}"))
+                db.commit()
+            counts[index] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-shards", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent writer threads")
+    parser.add_argument("--users", type=int, default=1000, help="Users tasks are spread over")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measurement time per shard count")
+    parser.add_argument("--url-template", help='Shard URL with a "{shard}" placeholder (default: SQLite files)')
+    args = parser.parse_args()
+
+    directory = None
+    if args.url_template is None:
+        directory = tempfile.mkdtemp(prefix="shard-bench-")
+        args.url_template = "sqlite:///" + os.path.join(directory, "shard{shard}.db")
+    urls = [args.url_template.format(shard=shard) for shard in range(args.max_shards)]
+
+    print(f"{'shards':>6}  {'tasks/s':>9}  {'speedup':>7}")
+    baseline = None
+    for count in range(1, args.max_shards + 1):
+        primary = create_engine(urls[0], **engine_options(urls[0]))
+        SQLModel.metadata.create_all(primary)
+        ensure_users(primary, args.users)
+        router = ShardRouter(primary, urls[1:count])
+        router.create_schemas()
+
+        rate = measure(router, args.writers, args.users, args.seconds)
+        baseline = baseline or rate
+        print(f"{count:>6}  {rate:>9,.0f}  {rate / baseline:>6.2f}x")
+        for engine in router.engines:
+            engine.dispose()
+
+    if directory is not None:
+        print(f"SQLite shards left in {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Measure the per-call overhead of the prebuilt hot statements.
+
+Loads one user with one task into a fresh SQLite file, so the cost is in
+Python, not in the database. Each lookup is timed with a fresh session per
+call, once with the statement built per call (select() and its cache key
+derived every time) and once with the prebuilt statement the app uses.
+Prints the best of --rounds rounds of --calls calls, in microseconds.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_statements
+    python -m backend.benchmark_statements --calls 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.core.database import engine_options
+from backend.crud.user import get_user_by_email
+from backend.models.task import Task
+from backend.models.user import User
+from backend.services.task_service import task_service
+
+EMAIL = "statements-bench@example.com"
+
+
+def best_us(engine, fn: Callable[[Session], object], calls: int, rounds: int) -> float:
+    """Fastest round's time per call, in microseconds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            with Session(engine) as db:
+                fn(db)
+        best = min(best, (time.perf_counter() - start) / calls * 1e6)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=3000, help="Calls per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per variant (best is reported)")
+    args = parser.parse_args()
+
+    url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="statements-bench-"), "tasks.db")
+    engine = create_engine(url, **engine_options(url))
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        user = User(email=EMAIL, password_hash="-")
+        db.add(user)
+        db.commit()
+        task = Task(user_id=user.id, title="only task", position="a0")
+        db.add(task)
+        db.commit()
+        user_id, task_id = user.id, task.id
+    # A detached copy is enough: the services only read user.id
+    user = User(id=user_id, email=EMAIL, password_hash="-")
+
+    variants = [
+        (
+            "get_user_tasks",
+            lambda db: db.exec(
+                select(Task).where(Task.user_id == user.id).options(selectinload(Task.tags)).order_by(Task.position, Task.id)
+            ).all(),
+            lambda db: task_service.get_user_tasks(db, user),
+        ),
+        (
+            "get_task",
+            lambda db: db.get(Task, task_id),
+            lambda db: task_service.get_task(db, user, task_id),
+        ),
+        (
+            "get_user_by_email",
+            lambda db: db.exec(select(User).where(User.email == EMAIL)).first(),
+            lambda db: get_user_by_email(db, email=EMAIL),
+        ),
+        ("(session only)", lambda db: None, lambda db: None),
+    ]
+    print(f"{'call':<20}  {'per call us':>11}  {'prebuilt us':>11}")
+    for name, per_call, prebuilt in variants:
+        before = best_us(engine, per_call, args.calls, args.rounds)
+        after = best_us(engine, prebuilt, args.calls, args.rounds)
+        print(f"{name:<20}  {before:>11.0f}  {after:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Measure subtree operations on a large task tree.
+
+Loads one user with a tree of --fanout children per task, --depth levels
+below the root (11,111 tasks by default), next to --other top-level tasks,
+into a fresh SQLite file or --url. Then times reading the subtree one query
+per node against the materialized-path range query, and the rollup, move,
+complete and delete operations of TaskService, counting SQL statements.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_subtree
+    python -m backend.benchmark_subtree --depth 3 --other 0
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+from sqlalchemy import event, func, insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.core.database import engine_options
+from backend.models.task import Task
+from backend.models.user import User
+from backend.services.task_service import task_service
+
+USER_ID = 1
+
+
+def populate(engine, depth: int, fanout: int, other: int) -> int:
+    """Insert the tree (root has id 1) and the other tasks. Returns the tree size."""
+    # Every row needs the same keys: executemany takes the columns from the first one
+    rows = [{"id": 1, "user_id": USER_ID, "title": "root", "position": "a0", "parent_id": None, "path": "/"}]
+    level = [rows[0]]
+    for _ in range(depth):
+        children = []
+        for parent in level:
+            for n in range(fanout):
+                children.append({
+                    "id": len(rows) + len(children) + 1,
+                    "user_id": USER_ID,
+                    "title": f"child {n} of {parent['id']}",
+                    "position": f"a{n:06d}",
+                    "parent_id": parent["id"],
+                    "path": f"{parent['path']}{parent['id']}/",
+                })
+        rows.extend(children)
+        level = children
+    tree = len(rows)
+    rows.extend(
+        {"id": tree + n + 1, "user_id": USER_ID, "title": f"other {n}", "position": f"b{n:06d}",
+         "parent_id": None, "path": "/"}
+        for n in range(other)
+    )
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": USER_ID, "email": "subtree-bench@example.com", "password_hash": "-"}])
+        connection.execute(insert(Task), rows)
+    return tree
+
+
+def subtree_per_node(db: Session, task_id: int) -> List[Task]:
+    """Walk the tree level by level with one query per task on the parent_id index."""
+    result = [db.get(Task, task_id)]
+    index = 0
+    while index < len(result):
+        result.extend(db.exec(
+            select(Task).where(Task.parent_id == result[index].id).order_by(Task.position)
+        ).all())
+        index += 1
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=4, help="Levels below the root")
+    parser.add_argument("--fanout", type=int, default=10, help="Children per task")
+    parser.add_argument("--other", type=int, default=100_000, help="Top-level tasks outside the tree")
+    parser.add_argument("--url", help="Empty database to load (default: a new SQLite file)")
+    args = parser.parse_args()
+
+    url = args.url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="subtree-bench-"), "tasks.db")
+    engine = create_engine(url, **engine_options(url))
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        if db.exec(select(func.count()).select_from(Task)).one():
+            raise SystemExit(f"{url} already has tasks; pass an empty database")
+    tree = populate(engine, args.depth, args.fanout, args.other)
+    print(f"Tree of {tree:,} tasks next to {args.other:,} others ({url})")
+
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    first_child = 2
+
+    def run(name: str, fn: Callable[[Session, User], object]) -> None:
+        nonlocal statements
+        with Session(engine) as db:
+            user = db.get(User, USER_ID)
+            statements = 0
+            start = time.perf_counter()
+            fn(db, user)
+            ms = (time.perf_counter() - start) * 1000
+        print(f"{name:<32}  {ms:>9.1f}  {statements:>10}")
+
+    print(f"{'operation':<32}  {'ms':>9}  {'statements':>10}")
+    run("subtree, one query per node", lambda db, user: subtree_per_node(db, 1))
+    run("subtree, materialized path", lambda db, user: task_service.get_subtree(db, user, 1))
+    run("rollup of the tree", lambda db, user: task_service.get_rollup(db, user, 1))
+    run("move a child subtree to the top", lambda db, user: task_service.move_task(db, user, first_child, {"parent_id": None}))
+    run("move it back", lambda db, user: task_service.move_task(db, user, first_child, {"parent_id": 1}))
+    run("complete the whole tree", lambda db, user: task_service.set_subtree_completed(db, user, 1, True))
+    run("delete the whole tree", lambda db, user: task_service.delete_task(db, user, 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measure tag filters on one user's list with many task-tag links.
+
+Loads --users users with --tasks tasks each, every task carrying --per-task
+of --tags tags (100 x 2000 x 5 = 1M links by default), into a fresh SQLite
+file or --url, then times GET /{user_id}/tasks?tags=... queries for one user
+against loading the full list and filtering in Python.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.benchmark_tags
+    python -m backend.benchmark_tags --users 10 --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.core.database import engine_options
+from backend.models.tag import Tag, TaskTag
+from backend.models.task import Task
+from backend.models.user import User
+from backend.services.task_service import task_service
+
+
+def populate(engine, users: int, tasks: int, tags: int, per_task: int, chunk: int = 20000) -> int:
+    """Insert the data set with plain executemany batches. Returns the number of links."""
+    rng = random.Random(0)
+    links = 0
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"id": user_id, "email": f"bench{user_id}@example.com", "password_hash": "-"}
+            for user_id in range(1, users + 1)
+        ])
+        connection.execute(insert(Tag), [
+            {"id": (user_id - 1) * tags + n + 1, "user_id": user_id, "name": f"tag{n}", "task_count": 0}
+            for user_id in range(1, users + 1) for n in range(tags)
+        ])
+        task_rows, link_rows = [], []
+        for user_id in range(1, users + 1):
+            for n in range(tasks):
+                task_id = (user_id - 1) * tasks + n + 1
+                task_rows.append({"id": task_id, "user_id": user_id, "title": f"task {n}", "position": f"a{n:06d}"})
+                for tag in rng.sample(range(tags), per_task):
+                    link_rows.append({"tag_id": (user_id - 1) * tags + tag + 1, "task_id": task_id, "user_id": user_id})
+            if len(link_rows) >= chunk or user_id == users:
+                connection.execute(insert(Task), task_rows)
+                connection.execute(insert(TaskTag), link_rows)
+                links += len(link_rows)
+                task_rows, link_rows = [], []
+    return links
+
+
+def timed(fn: Callable[[], list], repeat: int):
+    """Median milliseconds over `repeat` runs, and the result size."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), len(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks per user")
+    parser.add_argument("--tags", type=int, default=20, help="Tags per user")
+    parser.add_argument("--per-task", type=int, default=5, help="Tags on each task")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (median is reported)")
+    parser.add_argument("--url", help="Empty database to load (default: a new SQLite file)")
+    args = parser.parse_args()
+
+    url = args.url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="tag-bench-"), "tags.db")
+    engine = create_engine(url, **engine_options(url))
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        if db.exec(select(func.count()).select_from(TaskTag)).one():
+            raise SystemExit(f"{url} already has task_tag rows; pass an empty database")
+
+    start = time.perf_counter()
+    links = populate(engine, args.users, args.tasks, args.tags, args.per_task)
+    print(f"Loaded {links:,} links in {time.perf_counter() - start:.1f}s ({url})")
+
+    with Session(engine) as db:
+        user = db.get(User, 1)
+
+        def python_filter(names):
+            wanted = set(names)
+            return [task for task in task_service.get_user_tasks(db, user) if wanted <= {tag.name for tag in task.tags}]
+
+        queries = [
+            ("any-of 2 tags", lambda: task_service.list_tasks(db, user, tags=["tag0", "tag1"])),
+            ("all-of 2 tags", lambda: task_service.list_tasks(db, user, tags=["tag0", "tag1"], match_all=True)),
+            ("all-of 3 tags", lambda: task_service.list_tasks(db, user, tags=["tag0", "tag1", "tag2"], match_all=True)),
+            ("any-of 2 tags, limit 50", lambda: task_service.list_tasks(db, user, tags=["tag0", "tag1"], limit=50)),
+            ("full list + Python all-of 2", lambda: python_filter(["tag0", "tag1"])),
+        ]
+        print(f"{'query':<30}  {'tasks':>6}  {'ms':>8}")
+        for name, fn in queries:
+            db.expunge_all()
+            ms, count = timed(fn, args.repeat)
+            print(f"{name:<30}  {count:>6}  {ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
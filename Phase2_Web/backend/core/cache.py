@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Protocol, Tuple
+
+from backend.core.config import settings
+
+
+class SharedCacheBackend(Protocol):
+    """
+    Cache shared between worker processes (e.g. Redis).
+
+    Values are bytes; incr must be atomic across processes.
+    """
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    def incr(self, key: str) -> int: ...
+
+
+class RedisCacheBackend:
+    """SharedCacheBackend on top of redis-py (optional dependency)."""
+
+    def __init__(self, url: str):
+        import redis  # Only needed when a shared tier is configured
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, ex=max(1, int(ttl)))
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache bounded by entry count and total bytes.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[int, bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[int, bytes]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[2] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return item[0], item[1]
+
+    def set(self, key: str, version: int, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (version, value, time.monotonic() + self.ttl)
+            self._bytes += len(value)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        _, value, _ = self._data.pop(key)
+        self._bytes -= len(value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+class TaskListCache:
+    """
+    Two-tier cache of serialized (JSON) task lists keyed by user.
+
+    The in-process tier answers most reads. When a shared tier is configured,
+    each user also has a version counter there: writes bump it, and local
+    entries with an older version are ignored, so a write handled by one
+    worker invalidates the list in every worker. Without a shared tier the
+    cache is only coherent within a single process, and versions are kept in
+    a bounded map: users written to least recently are forgotten and fall
+    back to a floor version raised past theirs, so a fill that raced with
+    their last write can still never match.
+    """
+
+    def __init__(self, local: LRUCache, shared: Optional[SharedCacheBackend] = None, enabled: bool = True):
+        self.local = local
+        self.shared = shared
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Without a shared tier, versions are kept per process
+        self._local_versions: "OrderedDict[int, int]" = OrderedDict()
+        self._version_clock = 0
+        self._version_floor = 0
+        self._stats: Dict[str, int] = {"hits": 0, "local_hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._stats[name] += 1
+
+    def _version(self, user_id: int) -> int:
+        if self.shared is None or not self.enabled:
+            with self._lock:
+                return self._local_versions.get(user_id, self._version_floor)
+        value = self.shared.get(f"tasks:v:{user_id}")
+        return int(value) if value is not None else 0
+
+    def get(self, user_id: int) -> Tuple[Optional[bytes], int]:
+        """
+        Return (cached JSON or None, current version). Pass the version back to
+        set() so a fill that raced with a write is not stored as current.
+        Versions are tracked even when caching is disabled.
+        """
+        version = self._version(user_id)
+        if not self.enabled:
+            return None, version
+        key = f"tasks:{user_id}"
+
+        item = self.local.get(key)
+        if item is not None and item[0] == version:
+            self._count("hits", "local_hits")
+            return item[1], version
+
+        if self.shared is not None:
+            value = self.shared.get(f"{key}:{version}")
+            if value is not None:
+                self.local.set(key, version, value)
+                self._count("hits", "shared_hits")
+                return value, version
+
+        self._count("misses")
+        return None, version
+
+    def set(self, user_id: int, version: int, value: bytes) -> None:
+        if not self.enabled:
+            return
+        key = f"tasks:{user_id}"
+        self.local.set(key, version, value)
+        if self.shared is not None:
+            self.shared.set(f"{key}:{version}", value, self.local.ttl)
+
+    def invalidate(self, user_id: int) -> None:
+        self.local.delete(f"tasks:{user_id}")
+        if self.shared is not None and self.enabled:
+            self.shared.incr(f"tasks:v:{user_id}")
+        else:
+            with self._lock:
+                self._version_clock += 1
+                self._local_versions[user_id] = self._version_clock
+                self._local_versions.move_to_end(user_id)
+                if len(self._local_versions) > self.local.max_entries:
+                    # Forget the older half at once so the floor (which misses
+                    # every user still on it) is raised rarely
+                    for _ in range(len(self._local_versions) // 2):
+                        _, self._version_floor = self._local_versions.popitem(last=False)
+        self._count("invalidations")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats: Dict[str, float] = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = len(self.local)
+        stats["bytes"] = self.local.size_bytes
+        stats["evictions"] = self.local.evictions
+        return stats
+
+
+task_list_cache = TaskListCache(
+    LRUCache(
+        max_entries=settings.TASK_CACHE_MAX_ENTRIES,
+        max_bytes=settings.TASK_CACHE_MAX_BYTES,
+        ttl=settings.TASK_CACHE_TTL_SECONDS,
+    ),
+    shared=RedisCacheBackend(settings.TASK_CACHE_REDIS_URL) if settings.TASK_CACHE_REDIS_URL else None,
+    enabled=settings.TASK_CACHE_ENABLED,
+)
@@ -10,6 +10,78 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: str = "" # Comma-separated read replica URLs, empty to disable
+    REPLICA_STICKY_SECONDS: float = 5.0 # Keep a user's reads on the primary after they write
+    REPLICA_RETRY_SECONDS: float = 30.0 # How long a failed replica is skipped
+    DATABASE_SHARD_URLS: str = "" # Comma-separated extra task shards; DATABASE_URL is shard 0
+    SHARD_VNODES: int = 64 # Hash ring points per shard
+    SHARD_DIRECTORY_TTL_SECONDS: float = 30.0 # How long a user's shard placement is cached
+
+    # Archival of old completed tasks
+    ARCHIVE_AFTER_DAYS: int = 30 # Completed tasks untouched this long move to task_archive
+    ARCHIVE_BATCH_SIZE: int = 1000 # Tasks moved per transaction
+    ARCHIVE_INTERVAL_SECONDS: float = 3600 # How often the in-process archiver runs, 0 to disable
+
+    # Task list cache
+    TASK_CACHE_ENABLED: bool = False # Only enable with a single worker or a shared tier
+    TASK_CACHE_MAX_ENTRIES: int = 10000 # Users kept in the in-process tier
+    TASK_CACHE_MAX_BYTES: int = 64 * 1024 * 1024 # Total size of the in-process tier
+    TASK_CACHE_TTL_SECONDS: float = 300 # Upper bound on staleness from out-of-band changes
+    TASK_CACHE_REDIS_URL: str = "" # Shared tier (requires the redis package), empty for in-process only
+
+    # Concurrent identical reads share one query
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 10.0 # Waiters run their own query after this long
+
+    # Task reminders
+    REMINDER_POLL_SECONDS: float = 30 # How often pending reminders are loaded, 0 to disable the scheduler
+    REMINDER_WINDOW_SECONDS: float = 300 # How far ahead each load looks
+    REMINDER_BATCH_SIZE: int = 1000 # Reminders loaded per shard per poll
+    REMINDER_NOTIFIER: str = "" # "module:attribute" of a notifier factory, empty to log reminders
+
+    # Manual task ordering
+    POSITION_MAX_KEY_LENGTH: int = 32 # Renumber a user's tasks in the background when a move creates a longer key
+    POSITION_REBALANCE_POLL_SECONDS: float = 5 # How often the background-jobs worker picks up renumbering queued by other workers
+
+    # Task history
+    HISTORY_ENABLED: bool = True # Record task changes in task_history
+    HISTORY_RETENTION_DAYS: int = 365 # Older history is dropped (whole months on PostgreSQL), 0 keeps it forever
+    HISTORY_MAINTENANCE_INTERVAL_SECONDS: float = 3600 # How often partitions are prepared and retention applied
+
+    # Idempotency-Key header on mutating /{user_id}/ routes
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_BACKEND: str = "memory" # "memory" (per worker process) or "database" (shared by all workers, on the primary)
+    IDEMPOTENCY_TTL_SECONDS: float = 86400 # How long a key's response is replayed to retries
+    IDEMPOTENCY_MAX_ENTRIES: int = 100000 # Keys kept by the memory backend
+    IDEMPOTENCY_MAX_BYTES: int = 64 * 1024 * 1024 # Total size of responses kept by the memory backend
+    IDEMPOTENCY_WAIT_SECONDS: float = 10 # How long a retry waits for the original request before getting 409
+    IDEMPOTENCY_LOCK_SECONDS: float = 60 # A key whose request has not finished after this long (crashed worker) can be reused
+
+    # Diagnostics (admin only)
+    DIAGNOSTICS_ENABLED: bool = False # Mount /admin/diagnostics and the X-Profile request header
+    ADMIN_USER_IDS: str = "" # Comma-separated user IDs allowed to use admin routes
+    DIAGNOSTICS_MAX_PROFILE_SECONDS: float = 30 # Longest on-demand CPU profile
+    DIAGNOSTICS_REQUEST_PROFILES: int = 50 # Per-request profiles kept in memory
+
+    # Server (python -m backend.serve)
+    WEB_CONCURRENCY: int = 0 # Worker processes, 0 for one per available CPU
+    SERVER_MAX_REQUESTS: int = 10000 # Replace a worker after this many requests to bound memory growth, 0 to disable
+    SERVER_MAX_REQUESTS_JITTER: int = 1000 # Random extra requests so workers are not all replaced at once
+    SERVER_TIMEOUT: int = 60 # A worker silent for this long is killed and replaced
+    SERVER_GRACEFUL_TIMEOUT: int = 30 # Time in-flight requests get to finish on reload or shutdown
+    SERVER_KEEPALIVE: int = 5 # Seconds an idle keep-alive connection is held open
+    BACKGROUND_JOBS_LOCK_FILE: str = "" # Set by the launcher: only the worker holding this lock runs background jobs
+
+    # Connection pools (per worker process and database)
+    DB_POOL_SIZE: int = 0 # Connections kept open, 0 for SQLAlchemy's default (5) or a share of DB_MAX_CONNECTIONS
+    DB_MAX_OVERFLOW: int = 10 # Extra connections opened under load
+    DB_MAX_CONNECTIONS: int = 0 # Connection budget per database across all workers, 0 for no limit
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json" # "json" lines, or "text" for local development
+    LOG_SQL: bool = False # Log every SQL statement (sample it with LOG_SAMPLE_RATES)
+    LOG_SAMPLE_RATES: str = "sqlalchemy.engine=0.1" # Comma-separated logger=rate; warnings and errors are always kept
+    LOG_QUEUE_SIZE: int = 10000 # Records waiting for the writer thread; more are dropped, never blocking requests
 
     # CORS
     BACKEND_CORS_ORIGINS: str = "" # Changed to string, default empty
@@ -0,0 +1,192 @@
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, create_engine
+
+from backend.core.config import settings
+
+
+def engine_options(url: str) -> dict:
+    """
+    Pool sizing for one worker process. With DB_MAX_CONNECTIONS set, the
+    budget is split between the WEB_CONCURRENCY workers so that
+    workers * (pool_size + max_overflow) stays within it.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    if settings.DB_MAX_CONNECTIONS > 0:
+        per_worker = max(1, settings.DB_MAX_CONNECTIONS // max(1, settings.WEB_CONCURRENCY))
+        pool_size = min(settings.DB_POOL_SIZE or per_worker, per_worker)
+        options = {"pool_size": pool_size, "max_overflow": per_worker - pool_size}
+    else:
+        options = {"pool_size": settings.DB_POOL_SIZE or 5, "max_overflow": settings.DB_MAX_OVERFLOW}
+    return options
+
+
+class ReadOnlySession(Session):
+    """
+    Session handed out for read-only routes.
+
+    Flushing pending changes raises instead of silently writing to a replica.
+    """
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Attempted to write through a read-only session")
+        super().flush(objects)
+
+
+class DatabaseRouter:
+    """
+    Routes sessions between the primary database and optional read replicas.
+
+    - Writes always go to the primary.
+    - Reads go round-robin to healthy replicas, except for users who wrote
+      within the last `sticky_seconds` (read-your-writes), who stay on the
+      primary. Writes are remembered in this process, and callers can pass
+      the time of the user's last write (e.g. from a cookie) so that writes
+      served by other worker processes count too.
+    - A replica that fails to hand out a connection is skipped for
+      `retry_seconds`, after which it is tried again.
+    """
+
+    def __init__(
+        self,
+        primary_url: str,
+        replica_urls: Optional[List[str]] = None,
+        sticky_seconds: float = 5.0,
+        retry_seconds: float = 30.0,
+        **engine_kwargs,
+    ):
+        self.primary = create_engine(primary_url, **engine_options(primary_url), **engine_kwargs)
+        self.replicas = [
+            create_engine(url, pool_pre_ping=True, **engine_options(url), **engine_kwargs) for url in replica_urls or []
+        ]
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+
+        self._lock = threading.Lock()
+        self._round_robin = itertools.cycle(range(len(self.replicas)))
+        self._down_until: Dict[int, float] = {}
+        self._last_write: Dict[int, float] = {}
+
+    def mark_write(self, user_id: int) -> None:
+        """Pin the user's reads to the primary for the sticky window."""
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[user_id] = now
+            if len(self._last_write) > 10000:
+                cutoff = now - self.sticky_seconds
+                self._last_write = {k: v for k, v in self._last_write.items() if v > cutoff}
+
+    def _is_sticky(self, user_id: Optional[int], last_write_at: Optional[float] = None) -> bool:
+        if last_write_at is not None and time.time() - last_write_at < self.sticky_seconds:
+            return True
+        if user_id is None:
+            return False
+        last_write = self._last_write.get(user_id)
+        return last_write is not None and time.monotonic() - last_write < self.sticky_seconds
+
+    def _next_replica(self) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                index = next(self._round_robin)
+                if self._down_until.get(index, 0) <= now:
+                    return index
+        return None
+
+    def _mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    def write_session(self) -> Session:
+        return Session(self.primary)
+
+    def read_session(self, user_id: Optional[int] = None, last_write_at: Optional[float] = None) -> Session:
+        """
+        Return a read-only session on a replica, or on the primary when the
+        user is sticky or no replica is healthy.
+
+        Args:
+            last_write_at: Unix time of the user's last write as reported by the client
+        """
+        if self.replicas and not self._is_sticky(user_id, last_write_at):
+            for _ in range(len(self.replicas)):
+                index = self._next_replica()
+                if index is None:
+                    break
+                session = ReadOnlySession(self.replicas[index])
+                try:
+                    # Check out a connection now so a dead replica fails over here
+                    session.connection()
+                    return session
+                except OperationalError:
+                    session.close()
+                    self._mark_down(index)
+        return ReadOnlySession(self.primary)
+
+
+def add_missing_columns(connection: Connection, table: Table) -> List[str]:
+    """
+    Add columns (and indexes on them) that the model has but the existing table lacks.
+
+    create_all only creates missing tables, so this brings existing databases
+    up to date with new optional fields. Columns must be nullable or have a
+    server default. Returns the names of the added columns.
+    """
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+    if not missing:
+        return []
+
+    dialect = connection.dialect
+    compiler = dialect.ddl_compiler(dialect, None)
+    for column in missing:
+        if not column.nullable and column.server_default is None:
+            raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a server default")
+        connection.execute(text(
+            f"ALTER TABLE {dialect.identifier_preparer.format_table(table)} "
+            f"ADD COLUMN {compiler.get_column_specification(column)}"
+        ))
+
+    added = {column.name for column in missing}
+    for index in table.indexes:
+        if added & {column.name for column in index.columns}:
+            index.create(connection, checkfirst=True)
+    return sorted(added)
+
+
+def add_missing_indexes(connection: Connection, table: Table) -> List[str]:
+    """
+    Create indexes that the model declares but the existing table lacks
+    (create_all only creates indexes together with new tables). Returns
+    the names of the created indexes.
+    """
+    existing = {index["name"] for index in inspect(connection).get_indexes(table.name)}
+    created = []
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(connection)
+            created.append(index.name)
+    return sorted(created)
+
+
+def split_urls(value: str) -> List[str]:
+    """Parse a comma-separated list of database URLs, as in the *_URLS settings."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+db_router = DatabaseRouter(
+    settings.DATABASE_URL,
+    replica_urls=split_urls(settings.DATABASE_REPLICA_URLS),
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    retry_seconds=settings.REPLICA_RETRY_SECONDS,
+)
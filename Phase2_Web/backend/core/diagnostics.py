@@ -0,0 +1,261 @@
+"""
+In-process diagnostics for a running worker: a sampling CPU profiler that
+produces folded stacks (the input format of flamegraph.pl and speedscope),
+tracemalloc snapshots, and an ASGI middleware that profiles single requests
+on demand.
+
+Nothing here runs unless asked: the sampler is a thread that only exists
+while a profile is being taken, tracemalloc is only started by an explicit
+call, and main.py only installs the middleware when diagnostics are enabled.
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from backend.core.config import settings
+
+# Leaf frames of threads that are parked (idle pool workers, the event loop
+# waiting in select, background services sleeping on an Event)
+_IDLE_LEAVES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_paths: Dict[str, str] = {}
+
+
+def _short_path(filename: str) -> str:
+    """filename relative to the sys.path entry it was imported from."""
+    short = _paths.get(filename)
+    if short is None:
+        short = filename
+        for root in sorted((p for p in sys.path if p), key=len, reverse=True):
+            if filename.startswith(root + os.sep):
+                short = filename[len(root) + 1:]
+                break
+        _paths[filename] = short
+    return short
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stack of every thread each `interval` seconds and
+    counts identical stacks. The profiled code is not instrumented, so the
+    cost is one stack walk per thread per sample in the sampler thread.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False, backend_only: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.backend_only = backend_only
+        self.samples = 0
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._skip = set() # Thread IDs not sampled
+
+    def _stack(self, frame) -> Optional[str]:
+        if not self.include_idle:
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                return None
+        names, ours = [], False
+        while frame is not None:
+            code = frame.f_code
+            ours = ours or code.co_filename.startswith(_BACKEND_DIR)
+            names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if self.backend_only and not ours:
+            return None
+        return ";".join(reversed(names))
+
+    def _run(self) -> None:
+        self._skip.add(threading.get_ident())
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in self._skip:
+                    continue
+                stack = self._stack(frame)
+                if stack is not None:
+                    self.counts[stack] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.counts
+
+    def profile(self, seconds: float) -> Counter:
+        """Sample for `seconds` and return the stack counts (blocks the caller, which is not sampled)."""
+        self._skip.add(threading.get_ident())
+        self.start()
+        try:
+            time.sleep(seconds)
+        finally:
+            self.stop()
+        return self.counts
+
+
+def folded(counts: Counter) -> str:
+    """One "frame;frame;frame count" line per stack, hottest first."""
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class ProfileStore:
+    """The last `size` request profiles, kept in memory by ID."""
+
+    def __init__(self, size: int = 50):
+        self._profiles: Deque[dict] = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> str:
+        return str(next(self._ids))
+
+    def add(self, profile: dict) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [{key: value for key, value in p.items() if key != "folded"} for p in reversed(self._profiles)]
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+
+class MemoryTracer:
+    """tracemalloc start/stop and snapshots, diffed against the previous snapshot when asked."""
+
+    _IGNORED = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ]
+
+    def __init__(self):
+        self._last: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+        }
+
+    def start(self, frames: int = 1) -> dict:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._last = None
+        return self.status()
+
+    def stop(self) -> dict:
+        with self._lock:
+            tracemalloc.stop()
+            self._last = None
+        return self.status()
+
+    def snapshot(self, limit: int = 20, group_by: str = "lineno", compare: bool = False) -> dict:
+        """
+        Top allocation sites (or tracebacks) by size. With compare=True the
+        sizes are growth since the previous snapshot, which is what to look
+        at for a leak; the first call only sets the baseline.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not running")
+            snapshot = tracemalloc.take_snapshot().filter_traces(self._IGNORED)
+            previous, self._last = self._last, snapshot
+        if compare and previous is not None:
+            stats = snapshot.compare_to(previous, group_by)
+        else:
+            stats = snapshot.statistics(group_by)
+        top = [
+            {
+                "location": [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback],
+                "size": stat.size,
+                "count": stat.count,
+                "size_diff": getattr(stat, "size_diff", None),
+                "count_diff": getattr(stat, "count_diff", None),
+            }
+            for stat in stats[:limit]
+        ]
+        return {**self.status(), "compared": compare and previous is not None, "top": top}
+
+
+class RequestProfilerMiddleware:
+    """
+    Profiles a request with SamplingProfiler when it carries `header` and
+    `authorize(scope)` allows it. The response gets an X-Profile-Id header
+    and the folded stacks go to `store`. Only one request (or on-demand
+    profile) is sampled at a time, sharing `lock`; other requests pass
+    through untouched, as do all requests without the header.
+
+    Samples cover every thread, so with concurrent requests the profile
+    also shows their backend code; use it on a quiet worker.
+    """
+
+    def __init__(self, app, store: ProfileStore, lock: threading.Lock, authorize: Callable[[dict], bool],
+                 interval: float = 0.001, header: bytes = b"x-profile"):
+        self.app = app
+        self.store = store
+        self.lock = lock
+        self.authorize = authorize
+        self.interval = interval
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.header not in dict(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        if not self.authorize(scope) or not self.lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.next_id()
+        status = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval, backend_only=True)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            counts = profiler.stop()
+            self.lock.release()
+            self.store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status.get("code"),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "samples": profiler.samples,
+                "folded": folded(counts),
+            })
+
+
+# One sampler at a time per worker, shared by on-demand and per-request profiles
+profiler_lock = threading.Lock()
+profile_store = ProfileStore(settings.DIAGNOSTICS_REQUEST_PROFILES)
+memory_tracer = MemoryTracer()
@@ -0,0 +1,383 @@
+"""
+Idempotency-Key support for mutating routes.
+
+A client that may retry a request sends the same Idempotency-Key header
+with every attempt. The first attempt claims the key and runs; its
+response (status, headers and body) is stored for `ttl` seconds and
+replayed to every later attempt with the same key, without running the
+route again. Attempts that arrive while the first one is still running
+wait for it. Reusing a key for a different request (method, path, query
+or body) is rejected with 422. Keys are scoped to the caller's user.
+
+Responses that ask to be retried (5xx, 409, 429, or any carrying
+Retry-After) and requests that fail with an exception are not stored: the
+key is released so the client's retry runs again.
+"""
+import asyncio
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Protocol, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from backend.models.idempotency_key import IdempotencyKey
+
+# claim() outcomes
+CLAIMED = "claimed" # The caller runs the request and must complete() or release() the key
+DONE = "done" # A stored response is returned
+IN_PROGRESS = "in_progress" # Another request with this key is running
+MISMATCH = "mismatch" # The key was used for a different request
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Statuses below 500 that mean "try again" (e.g. the task order is being rebuilt)
+RETRYABLE_STATUSES = {409, 429}
+
+
+class StoredResponse(NamedTuple):
+    status: int
+    headers: Headers
+    body: bytes
+
+
+class IdempotencyStore(Protocol):
+    """
+    Where keys and responses live. claim must be atomic: of concurrent
+    callers with the same key, exactly one gets CLAIMED. A key that stays
+    claimed for `lock_timeout` seconds (its worker died) may be claimed again.
+    """
+
+    blocking: bool # Calls do I/O and are run in the thread pool
+
+    def claim(self, key: str, fingerprint: str) -> Tuple[str, Optional[StoredResponse]]: ...
+
+    def complete(self, key: str, response: StoredResponse) -> None: ...
+
+    def release(self, key: str) -> None: ...
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "response", "claimed_at", "expires_at")
+
+    def __init__(self, fingerprint: str, now: float, ttl: float):
+        self.fingerprint = fingerprint
+        self.response: Optional[StoredResponse] = None
+        self.claimed_at = now
+        self.expires_at = now + ttl
+
+    def size(self) -> int:
+        return len(self.response.body) if self.response is not None else 0
+
+
+class MemoryIdempotencyStore:
+    """
+    Keys of this worker process, LRU-evicted beyond max_entries or
+    max_bytes of stored bodies. Retries that reach another worker are not
+    deduplicated; use DatabaseIdempotencyStore with several workers.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, lock_timeout: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def claim(self, key: str, fingerprint: str) -> Tuple[str, Optional[StoredResponse]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at > now:
+                if entry.fingerprint != fingerprint:
+                    return MISMATCH, None
+                if entry.response is not None:
+                    self._data.move_to_end(key)
+                    return DONE, entry.response
+                if now - entry.claimed_at < self.lock_timeout:
+                    return IN_PROGRESS, None
+            if entry is not None:
+                self._remove(key)
+            self._data[key] = _Entry(fingerprint, now, self.ttl)
+            self._evict()
+            return CLAIMED, None
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.response is not None:
+                return
+            if len(response.body) > self.max_bytes:
+                self._remove(key)
+                return
+            entry.response = response
+            self._bytes += len(response.body)
+            self._evict()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.response is None:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        self._bytes -= self._data.pop(key).size()
+
+    def _evict(self) -> None:
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DatabaseIdempotencyStore:
+    """
+    Keys in the idempotency_key table, shared by all workers. The primary
+    key on the table makes claims atomic across processes. Expired rows are
+    deleted by the first claim after each `purge_interval` seconds.
+    """
+
+    blocking = True
+
+    def __init__(self, engine: Engine, ttl: float, lock_timeout: float, purge_interval: float = 60):
+        self.engine = engine
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+
+    def _purge(self, now: datetime.datetime) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.purge_interval
+        with self.engine.begin() as connection:
+            connection.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+
+    def claim(self, key: str, fingerprint: str) -> Tuple[str, Optional[StoredResponse]]:
+        now = datetime.datetime.utcnow()
+        self._purge(now)
+        claimed = {
+            "fingerprint": fingerprint,
+            "status_code": None,
+            "headers": "[]",
+            "body": None,
+            "created_at": now,
+            "expires_at": now + datetime.timedelta(seconds=self.ttl),
+        }
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(insert(IdempotencyKey).values(key=key, **claimed))
+            return CLAIMED, None
+        except IntegrityError:
+            pass
+
+        with self.engine.begin() as connection:
+            row = connection.execute(select(IdempotencyKey).where(IdempotencyKey.key == key)).one_or_none()
+            if row is None:
+                return IN_PROGRESS, None # Released or purged just now; the caller tries again
+            stale = now - row.created_at >= datetime.timedelta(seconds=self.lock_timeout)
+            if row.expires_at > now:
+                if row.fingerprint != fingerprint:
+                    return MISMATCH, None
+                if row.status_code is not None:
+                    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(row.headers)]
+                    return DONE, StoredResponse(row.status_code, headers, row.body or b"")
+                if not stale:
+                    return IN_PROGRESS, None
+            # Expired, or claimed by a request that never finished: take it over
+            # unless another request just did
+            taken = connection.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.created_at == row.created_at)
+                .values(**claimed)
+            ).rowcount
+        return (CLAIMED, None) if taken else (IN_PROGRESS, None)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        headers = json.dumps([(name.decode("latin-1"), value.decode("latin-1")) for name, value in response.headers])
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+                .values(status_code=response.status, headers=headers, body=response.body)
+            )
+
+    def release(self, key: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+            )
+
+
+def fingerprint(method: str, path: str, query_string: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """
+    Applies an IdempotencyStore to requests that carry an Idempotency-Key
+    header and for which `applies(scope)` is true. `identify(scope)`
+    returns the caller's user ID (keys are per user), or None to let the
+    request through untouched, e.g. so the route can reject bad credentials.
+
+    A duplicate of a running request polls the store for up to
+    `wait_seconds`, then gets 409 with Retry-After. Replayed responses carry
+    an Idempotent-Replayed: true header. Requests without the header pass
+    through untouched.
+    """
+
+    def __init__(self, app, store: IdempotencyStore, applies: Callable[[dict], bool],
+                 identify: Callable[[dict], Optional[str]], wait_seconds: float = 10,
+                 poll_seconds: float = 0.05, header: bytes = b"idempotency-key", max_key_length: int = 255):
+        self.app = app
+        self.store = store
+        self.applies = applies
+        self.identify = identify
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self.header = header
+        self.max_key_length = max_key_length
+
+    async def _store(self, method, *args):
+        if self.store.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header = dict(scope["headers"]).get(self.header)
+        if header is None or not self.applies(scope):
+            await self.app(scope, receive, send)
+            return
+        if not header or len(header) > self.max_key_length:
+            error = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {self.max_key_length} characters"}, status_code=400
+            )
+            await error(scope, receive, send)
+            return
+        user_id = self.identify(scope)
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        body, disconnected = await _read_body(receive)
+        if disconnected:
+            return
+        key = f"{user_id}:{header.decode('latin-1')}"
+        request_fingerprint = fingerprint(scope["method"], scope["path"], scope.get("query_string", b""), body)
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            state, stored = await self._store(self.store.claim, key, request_fingerprint)
+            if state == CLAIMED:
+                break
+            if state == DONE:
+                await _replay(stored, send)
+                return
+            if state == MISMATCH:
+                error = JSONResponse(
+                    {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                )
+                await error(scope, receive, send)
+                return
+            if time.monotonic() >= deadline:
+                error = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+                await error(scope, receive, send)
+                return
+            await asyncio.sleep(self.poll_seconds)
+
+        await self._run(scope, receive, send, key, body)
+
+    async def _run(self, scope, receive, send, key: str, body: bytes) -> None:
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        response = {"status": None, "headers": [], "body": [], "complete": False}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+                response["complete"] = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_record)
+        except BaseException:
+            await self._store(self.store.release, key)
+            raise
+        if response["complete"] and not _retryable(response["status"], response["headers"]):
+            stored = StoredResponse(response["status"], response["headers"], b"".join(response["body"]))
+            await self._store(self.store.complete, key, stored)
+        else:
+            await self._store(self.store.release, key)
+
+
+def _retryable(status: int, headers: Headers) -> bool:
+    return (
+        status >= 500
+        or status in RETRYABLE_STATUSES
+        or any(name.lower() == b"retry-after" for name, _ in headers)
+    )
+
+
+async def _read_body(receive) -> Tuple[bytes, bool]:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return b"", True
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks), False
+
+
+async def _replay(stored: StoredResponse, send) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": stored.status,
+        "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+    })
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+def create_store(backend: str, engine: Engine, max_entries: int, max_bytes: int, ttl: float,
+                 lock_timeout: float) -> IdempotencyStore:
+    """Store for the IDEMPOTENCY_BACKEND setting: "memory" or "database"."""
+    if backend == "memory":
+        return MemoryIdempotencyStore(max_entries, max_bytes, ttl, lock_timeout)
+    if backend == "database":
+        return DatabaseIdempotencyStore(engine, ttl, lock_timeout)
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND {backend!r} (expected 'memory' or 'database')")
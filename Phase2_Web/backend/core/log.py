@@ -0,0 +1,227 @@
+"""
+Structured, non-blocking logging.
+
+Request threads only put records on a bounded queue; a background
+listener formats them as JSON lines and writes them to stdout. Records
+carry the ID of the request they were logged in (from the X-Request-ID
+header, or generated), and high-volume loggers can be sampled so only a
+fraction of their records is queued at all. When the queue is full,
+records are dropped and counted instead of blocking the request.
+"""
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from backend.core.config import settings
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+access_logger = logging.getLogger("backend.access")
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request_id and any extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Drops a sampled share of records and stamps the rest with the current request ID."""
+
+    def __init__(self, sample_rates: Dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self._rates: Dict[str, float] = {} # Logger name -> rate, resolved by longest prefix
+
+    def _rate(self, name: str) -> float:
+        rate = self._rates.get(name)
+        if rate is None:
+            rate = 1.0
+            for prefix in sorted(self.sample_rates, key=len, reverse=True):
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = self.sample_rates[prefix]
+                    break
+            self._rates[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Warnings and errors are never sampled away
+        if record.levelno < logging.WARNING:
+            rate = self._rate(record.name)
+            if rate < 1.0 and random.random() >= rate:
+                return False
+        record.request_id = request_id_var.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that defers formatting to the listener and drops records when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what cannot cross threads: message arguments and tracebacks
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BatchingStreamHandler(logging.StreamHandler):
+    """Flushes only once the queue is drained, so a burst of records costs one write."""
+
+    def __init__(self, stream, pending: queue.Queue):
+        super().__init__(stream)
+        self.pending = pending
+
+    def flush(self) -> None:
+        if self.pending.empty():
+            super().flush()
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than failing when the queue is full at shutdown
+        self.queue.put(self._sentinel)
+
+
+def _parse_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def setup_logging() -> None:
+    """Route all logging through the queue (idempotent). Call once at startup."""
+    global _listener, _handler
+    if _listener is not None:
+        return
+    first = _handler is None
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    output = _BatchingStreamHandler(sys.stdout, log_queue)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    _handler = NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(ContextFilter(_parse_rates(settings.LOG_SAMPLE_RATES)))
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(settings.LOG_LEVEL)
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.LOG_SQL else logging.WARNING)
+    # uvicorn (and the gunicorn worker) give its loggers their own synchronous
+    # handlers. Its server messages go through the queue instead, and its access
+    # log is switched off: with no handler uvicorn skips it, and
+    # RequestContextMiddleware already logs every request on backend.access.
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    logging.getLogger("uvicorn.access").handlers = []
+    logging.getLogger("uvicorn.access").propagate = False
+
+    _listener = _Listener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    if first:
+        atexit.register(shutdown_logging)
+
+
+def reset_after_fork() -> None:
+    """In a forked worker the writer thread is gone; start a new one with a new queue."""
+    global _listener
+    _listener = None
+    setup_logging()
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        if _handler is not None and _handler.dropped:
+            print(f"WARNING: {_handler.dropped} log records were dropped (LOG_QUEUE_SIZE)", file=sys.stderr)
+
+
+class RequestContextMiddleware:
+    """
+    Gives every request an ID (X-Request-ID if the client sent one), makes
+    it available to log records, returns it in the response and logs one
+    access record per request on the backend.access logger.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(
+                    "%s %s %s", scope["method"], scope["path"], status.get("code"),
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status.get("code"),
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    },
+                )
+            request_id_var.reset(token)
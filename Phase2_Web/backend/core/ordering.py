@@ -0,0 +1,173 @@
+"""
+Fractional indexing: string keys that sort in list order and leave room
+between any two neighbours, so moving an item only rewrites that item.
+
+Keys are an integer part followed by an optional fraction. The first
+character of the integer part encodes its length ("a0".."z...", and
+"A..".."Z.." below zero), so appending or prepending increments/decrements
+the integer and keys only grow logarithmically. Inserting between two keys
+takes the midpoint of their fractions, which grows by about one character
+per six inserts at the same spot; see `key_between`.
+
+Keys compare by byte value, so the column must use a binary collation.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_ZERO = DIGITS[0]
+_SMALLEST_INTEGER = "A" + _ZERO * 26
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Fraction strictly between a and b (b=None means 1). Neither may end in a zero digit."""
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else _ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return key[:length]
+
+
+def _validate(key: str) -> None:
+    if not key or key == _SMALLEST_INTEGER:
+        raise ValueError(f"Invalid order key: {key!r}")
+    if key[len(_integer_part(key)):].endswith(_ZERO):
+        raise ValueError(f"Invalid order key: {key!r}")
+
+
+def _increment_integer(value: str) -> Optional[str]:
+    head, digits = value[0], list(value[1:])
+    for i in reversed(range(len(digits))):
+        index = DIGITS.index(digits[i]) + 1
+        if index < len(DIGITS):
+            digits[i] = DIGITS[index]
+            return head + "".join(digits)
+        digits[i] = _ZERO
+    if head == "Z":
+        return "a" + _ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(_ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(value: str) -> Optional[str]:
+    head, digits = value[0], list(value[1:])
+    for i in reversed(range(len(digits))):
+        index = DIGITS.index(digits[i]) - 1
+        if index >= 0:
+            digits[i] = DIGITS[index]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    Return a key that sorts strictly between a and b.
+
+    Args:
+        a: Key before the new position, or None for the start of the list
+        b: Key after the new position, or None for the end of the list
+
+    Raises:
+        ValueError: If a key is malformed or a >= b
+    """
+    if a is not None:
+        _validate(a)
+    if b is not None:
+        _validate(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Order keys out of order: {a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + _ZERO
+        integer_b = _integer_part(b)
+        fraction_b = b[len(integer_b):]
+        if integer_b == _SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if integer_b < b:
+            return integer_b
+        result = _decrement_integer(integer_b)
+        if result is None:
+            raise ValueError("Cannot decrement the smallest order key")
+        return result
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        result = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if result is None else result
+
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    result = _increment_integer(integer_a)
+    if result is None:
+        raise ValueError("Cannot increment the largest order key")
+    return result if result < b else integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], n: int) -> List[str]:
+    """
+    Return n ascending keys between a and b.
+
+    With b=None (appending, or renumbering a whole list from a=None) keys are
+    consecutive integers, which is as short as keys get.
+    """
+    if n <= 0:
+        return []
+    if b is None:
+        keys = []
+        key = key_between(a, None)
+        for _ in range(n):
+            keys.append(key)
+            key = key_between(key, None)
+        return keys
+    if a is None:
+        keys = []
+        key = key_between(None, b)
+        for _ in range(n):
+            keys.append(key)
+            key = key_between(None, key)
+        return keys[::-1]
+    mid = n // 2
+    key = key_between(a, b)
+    return keys_between(a, key, mid) + [key] + keys_between(key, b, n - mid - 1)
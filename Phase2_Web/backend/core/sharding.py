@@ -0,0 +1,180 @@
+import bisect
+import hashlib
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import ForeignKeyConstraint, MetaData, Table, func, select, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, create_engine
+
+from backend.core.config import settings
+from backend.core.database import add_missing_columns, add_missing_indexes, db_router, engine_options, split_urls
+from backend.models.shard import UserShard
+from backend.models.tag import Tag, TaskTag
+from backend.models.task import Task
+from backend.models.task_archive import TaskArchive
+from backend.models.task_history import TaskHistory
+
+# Tables that live on every shard. Tables added here are created on shards
+# without their foreign keys, since the referenced rows (users) stay on the primary.
+SHARDED_TABLES: List[Table] = [
+    Task.__table__, TaskArchive.__table__, TaskHistory.__table__, Tag.__table__, TaskTag.__table__,
+]
+
+# Each shard allocates task (and tag) IDs from its own range so rows keep their
+# IDs when a user is moved between shards. Shard 0 keeps the existing sequences.
+SHARD_ID_RANGE = 1 << 40
+RANGED_TABLES = [Task.__tablename__, Tag.__tablename__]
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to shard numbers.
+
+    Each shard owns `vnodes` points on the ring, so adding a shard only moves
+    about 1/N of the keys.
+    """
+
+    def __init__(self, shards: List[int], vnodes: int = 64):
+        points = sorted((_hash(f"{shard}:{vnode}"), shard) for shard in shards for vnode in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> int:
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._shards[index]
+
+
+class ShardRouter:
+    """
+    Resolves which database holds a user's tasks.
+
+    Shard 0 is the primary database (settings.DATABASE_URL); shards 1..N come
+    from settings.DATABASE_SHARD_URLS. The user_shard directory on the primary
+    is authoritative and cached in-process for `directory_ttl` seconds, so a
+    move must wait at least that long after flagging a user as moving.
+    """
+
+    def __init__(self, primary: Engine, shard_urls: List[str], vnodes: int = 64,
+                 directory_ttl: float = 30.0, **engine_kwargs):
+        self.engines: List[Engine] = [primary] + [
+            create_engine(url, **engine_options(url), **engine_kwargs) for url in shard_urls
+        ]
+        self.ring = HashRing(list(range(len(self.engines))), vnodes=vnodes)
+        self.directory_ttl = directory_ttl
+        self._lock = threading.Lock()
+        self._cache: Dict[int, Tuple[int, bool, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.engines) > 1
+
+    def ring_shard(self, user_id: int) -> int:
+        """Shard the hash ring assigns to the user (where they should live)."""
+        return self.ring.shard_for(str(user_id))
+
+    def placement(self, db: Session, user_id: int) -> Tuple[int, bool]:
+        """
+        Return (shard, moving) for the user, using the directory cache.
+
+        Args:
+            db: Session on the primary (or a replica of it) for directory lookups
+        """
+        if not self.enabled:
+            return 0, False
+
+        now = time.monotonic()
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[2] > now:
+            return cached[0], cached[1]
+
+        entry = db.get(UserShard, user_id)
+        placement = (entry.shard, entry.moving) if entry else (0, False)
+        with self._lock:
+            if len(self._cache) > 100000:
+                self._cache.clear()
+            self._cache[user_id] = (placement[0], placement[1], now + self.directory_ttl)
+        return placement
+
+    def moving_users(self) -> Set[int]:
+        """
+        Users whose tasks are being moved, read from the primary without the
+        cache. Background jobs skip them: a change made on the source shard
+        during the move would be lost with it.
+        """
+        if not self.enabled:
+            return set()
+        with Session(self.engines[0]) as db:
+            return set(db.execute(select(UserShard.user_id).where(UserShard.moving == True)).scalars())  # noqa: E712
+
+    def forget(self, user_id: int) -> None:
+        """Drop the cached placement for a user."""
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def assign(self, db: Session, user_id: int) -> int:
+        """Record the ring placement for a newly registered user."""
+        if not self.enabled:
+            return 0
+        shard = self.ring_shard(user_id)
+        db.add(UserShard(user_id=user_id, shard=shard))
+        db.commit()
+        self.forget(user_id)
+        return shard
+
+    def session(self, shard: int) -> Session:
+        return Session(self.engines[shard])
+
+    def create_schemas(self) -> None:
+        """
+        Create sharded tables on shards 1..N (shard 0 uses SQLModel metadata)
+        and add new columns and indexes to existing sharded tables on every shard.
+        """
+        with self.engines[0].begin() as connection:
+            for table in SHARDED_TABLES:
+                add_missing_columns(connection, table)
+                add_missing_indexes(connection, table)
+        for shard, engine in enumerate(self.engines[1:], start=1):
+            create_shard_schema(engine, shard)
+
+
+def create_shard_schema(engine: Engine, shard: int) -> None:
+    """
+    Create the sharded tables on one shard and start its ID ranges.
+    """
+    metadata = MetaData()
+    tables = [table.to_metadata(metadata) for table in SHARDED_TABLES]
+    for table in tables:
+        for constraint in [c for c in table.constraints if isinstance(c, ForeignKeyConstraint)]:
+            table.constraints.discard(constraint)
+        for column in table.columns:
+            column.foreign_keys.clear()
+
+    with engine.begin() as connection:
+        for table in tables:
+            table.create(connection, checkfirst=True)
+            add_missing_columns(connection, table)
+            add_missing_indexes(connection, table)
+
+        if connection.dialect.name != "postgresql":
+            return
+        for name in RANGED_TABLES:
+            table = metadata.tables[name]
+            if connection.execute(select(func.max(table.c.id))).scalar() is None:
+                connection.execute(
+                    text("SELECT setval(pg_get_serial_sequence(:table, 'id'), :start, false)"),
+                    {"table": name, "start": shard * SHARD_ID_RANGE + 1},
+                )
+
+
+shard_router = ShardRouter(
+    db_router.primary,
+    split_urls(settings.DATABASE_SHARD_URLS),
+    vnodes=settings.SHARD_VNODES,
+    directory_ttl=settings.SHARD_DIRECTORY_TTL_SECONDS,
+)
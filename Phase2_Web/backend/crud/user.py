@@ -1,4 +1,5 @@
 from typing import Optional
+from sqlalchemy import bindparam
 from sqlmodel import Session, select
 from sqlalchemy.exc import IntegrityError # Import IntegrityError
 
@@ -6,8 +7,11 @@ from backend.core.security import get_password_hash, verify_password
 from backend.models.user import User
 from backend.schemas.user import UserCreate
 
+# Built once: login and registration run it on every call
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
 def get_user_by_email(db: Session, *, email: str) -> Optional[User]:
-    return db.exec(select(User).where(User.email == email)).first()
+    return db.exec(_USER_BY_EMAIL, params={"email": email}).first()
 
 def create_user(db: Session, *, user_in: UserCreate) -> User:
     password_hash = get_password_hash(user_in.password)
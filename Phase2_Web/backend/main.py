@@ -45,11 +45,27 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import create_engine, SQLModel
+from sqlmodel import SQLModel
+from typing import Optional
 import json
+import logging
+import re
+import threading
 
 from backend.core.config import settings
-from backend.api.endpoints import tasks, auth
+from backend.core.log import RequestContextMiddleware, setup_logging
+from backend.core.idempotency import IdempotencyMiddleware, create_store
+from backend.core.security import decode_token
+from backend.core.database import db_router
+from backend.core.sharding import shard_router
+from backend.services.archive_service import archive_service
+from backend.services.history_service import history_service
+from backend.services.position_service import position_service
+from backend.services.reminder_service import reminder_scheduler
+from backend.api.endpoints import tasks, tags, auth, diagnostics
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Todo App",
@@ -62,13 +78,38 @@ if settings.BACKEND_CORS_ORIGINS:
     try:
         # Try to parse as JSON array first (for Railway/Vercel env vars)
         origins = json.loads(settings.BACKEND_CORS_ORIGINS)
-        print(f"✅ CORS origins parsed from JSON: {origins}")
+        logger.info("CORS origins parsed from JSON", extra={"origins": origins})
     except (json.JSONDecodeError, TypeError):
         # Fallback: split by comma for string format (for local .env)
         origins = [str(origin).strip() for origin in settings.BACKEND_CORS_ORIGINS.split(",")]
-        print(f"✅ CORS origins parsed from string: {origins}")
-
-print(f"CORS origins configured: {origins}")
+        logger.info("CORS origins parsed from string", extra={"origins": origins})
+
+if settings.IDEMPOTENCY_ENABLED:
+    _user_route = re.compile(rf"^{re.escape(settings.API_V1_STR)}/\d+/")
+
+    def _is_user_mutation(scope) -> bool:
+        return scope["method"] in ("POST", "PUT", "PATCH", "DELETE") and _user_route.match(scope["path"]) is not None
+
+    def _request_user(scope) -> Optional[str]:
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        return decode_token(token) if scheme.lower() == "bearer" else None
+
+    # Innermost, so CORS headers and the request ID are added to replayed responses too
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=create_store(
+            settings.IDEMPOTENCY_BACKEND,
+            db_router.primary,
+            max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+            max_bytes=settings.IDEMPOTENCY_MAX_BYTES,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+            lock_timeout=settings.IDEMPOTENCY_LOCK_SECONDS,
+        ),
+        applies=_is_user_mutation,
+        identify=_request_user,
+        wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -76,18 +117,84 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Idempotent-Replayed"],
 )
+app.add_middleware(RequestContextMiddleware)
+
+if settings.DIAGNOSTICS_ENABLED:
+    from backend.api.deps import is_admin_token
+    from backend.core.diagnostics import RequestProfilerMiddleware, profile_store, profiler_lock
+
+    def _is_admin_request(scope) -> bool:
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        return scheme.lower() == "bearer" and is_admin_token(token)
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+    # Only installed when enabled, so normal deployments pay nothing per request
+    app.add_middleware(
+        RequestProfilerMiddleware, store=profile_store, lock=profiler_lock, authorize=_is_admin_request
+    )
+
+engine = db_router.primary
 
 from sqlalchemy.exc import OperationalError
 
-@app.on_event("startup")
-def on_startup():
+_database_ready = False
+_jobs_lock = None # Open lock file; closing it would release the lock
+
+def init_database():
+    """Create/upgrade schemas once per process tree (the launcher runs it before forking workers)."""
+    global _database_ready
+    if _database_ready:
+        return
     try:
         SQLModel.metadata.create_all(engine)
+        shard_router.create_schemas()
+        history_service.maintain()
+        _database_ready = True
     except OperationalError as e:
-        print(f"ERROR: Could not connect to database on startup. Please ensure the database is running and accessible. Error: {e}")
+        logger.error(f"Could not connect to database on startup. Please ensure the database is running and accessible. Error: {e}")
+
+def _start_background_jobs():
+    logger.info("Running background jobs in this worker")
+    archive_service.start(settings.ARCHIVE_INTERVAL_SECONDS)
+    reminder_scheduler.start()
+    position_service.start()
+    history_service.start(settings.HISTORY_MAINTENANCE_INTERVAL_SECONDS)
+
+def _elect_background_jobs():
+    """
+    With several workers, only the one holding BACKGROUND_JOBS_LOCK_FILE runs
+    background jobs. The others wait for the lock in a thread, so one of them
+    takes over as soon as the holder exits (recycled, reloaded or crashed).
+    """
+    global _jobs_lock
+    import fcntl # The lock file is only set by the (Unix-only) multi-worker launcher
+    _jobs_lock = open(settings.BACKGROUND_JOBS_LOCK_FILE, "a")
+
+    def wait_for_lock():
+        fcntl.flock(_jobs_lock, fcntl.LOCK_EX) # Held until this process exits
+        _start_background_jobs()
+
+    threading.Thread(target=wait_for_lock, name="background-jobs-election", daemon=True).start()
+
+@app.on_event("startup")
+def on_startup():
+    init_database()
+    if settings.BACKGROUND_JOBS_LOCK_FILE:
+        _elect_background_jobs()
+    else:
+        _start_background_jobs()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    archive_service.stop()
+    reminder_scheduler.stop()
+    position_service.stop()
+    history_service.stop()
 
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
-app.include_router(tasks.router, prefix=f"{settings.API_V1_STR}", tags=["tasks"])
\ No newline at end of file
+app.include_router(tasks.router, prefix=f"{settings.API_V1_STR}", tags=["tasks"])
+app.include_router(tags.router, prefix=f"{settings.API_V1_STR}", tags=["tags"])
+if settings.DIAGNOSTICS_ENABLED:
+    app.include_router(diagnostics.router, prefix=f"{settings.API_V1_STR}/admin/diagnostics", tags=["diagnostics"])
@@ -1,4 +1,10 @@
 from backend.models.user import User
 from backend.models.task import Task
+from backend.models.task_archive import TaskArchive
+from backend.models.task_history import TaskHistory
+from backend.models.shard import UserShard
+from backend.models.tag import Tag, TaskTag
+from backend.models.idempotency_key import IdempotencyKey
+from backend.models.position_rebalance import PositionRebalance
 
-__all__ = ["User", "Task"]
+__all__ = ["User", "Task", "TaskArchive", "TaskHistory", "UserShard", "Tag", "TaskTag", "IdempotencyKey", "PositionRebalance"]
@@ -0,0 +1,21 @@
+from typing import Optional
+from sqlalchemy import LargeBinary, Text
+from sqlmodel import Field, SQLModel
+import datetime
+
+class IdempotencyKey(SQLModel, table=True):
+    """
+    A request made with an Idempotency-Key header and, once it finished, its
+    response (used by the "database" idempotency backend, on the primary).
+
+    status_code is null while the first request is still running.
+    """
+    __tablename__ = "idempotency_key"
+
+    key: str = Field(primary_key=True, max_length=320) # "<user id>:<Idempotency-Key>"
+    fingerprint: str = Field(max_length=64)
+    status_code: Optional[int] = Field(default=None)
+    headers: str = Field(default="[]", sa_type=Text)
+    body: Optional[bytes] = Field(default=None, sa_type=LargeBinary)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    expires_at: datetime.datetime = Field(index=True)
@@ -0,0 +1,14 @@
+from sqlmodel import Field, SQLModel
+import datetime
+
+class PositionRebalance(SQLModel, table=True):
+    """
+    A user whose task positions need renumbering, queued by whichever worker
+    served the move and processed by the worker that runs background jobs.
+    Lives on the primary database.
+    """
+    __tablename__ = "position_rebalance"
+
+    user_id: int = Field(primary_key=True)
+    shard: int = Field(default=0, nullable=False)
+    queued_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
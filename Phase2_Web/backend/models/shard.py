@@ -0,0 +1,13 @@
+from sqlmodel import Field, SQLModel
+
+class UserShard(SQLModel, table=True):
+    """
+    Directory entry saying which shard holds a user's tasks.
+
+    Users without an entry live on shard 0 (the primary database).
+    """
+    __tablename__ = "user_shard"
+
+    user_id: int = Field(primary_key=True, foreign_key="app_user.id")
+    shard: int = Field(default=0, nullable=False)
+    moving: bool = Field(default=False, nullable=False)
@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import Field, SQLModel
+import datetime
+
+class Tag(SQLModel, table=True):
+    """
+    A user's label for tasks. task_count is kept up to date by TagService
+    in the same transaction that adds or removes links.
+    """
+    __table_args__ = (UniqueConstraint("user_id", "name", name="uq_tag_user_id_name"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="app_user.id")
+    name: str = Field(max_length=50)
+    task_count: int = Field(default=0, nullable=False)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
+
+class TaskTag(SQLModel, table=True):
+    """
+    Link between a task and a tag. The (tag_id, task_id) primary key serves
+    tag filters without touching the task table.
+    """
+    __tablename__ = "task_tag"
+    __table_args__ = (
+        Index("ix_task_tag_task_id", "task_id"),
+        Index("ix_task_tag_user_id", "user_id"),
+    )
+
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    task_id: int = Field(foreign_key="task.id", primary_key=True)
+    user_id: int = Field(foreign_key="app_user.id") # Lets a user's links move between shards with them
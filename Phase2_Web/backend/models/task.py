@@ -1,10 +1,39 @@
-from typing import Optional
+from typing import List, Optional
+from sqlalchemy import Index, String, text
 from sqlmodel import Field, Relationship, SQLModel
 import datetime
 
+from backend.models.tag import Tag, TaskTag
 from backend.models.user import User
 
+# Strings that must compare byte-wise: fractional order keys (see
+# core/ordering.py) and materialized paths, which are queried by range
+BYTEWISE_STRING = String().with_variant(String(collation="C"), "postgresql")
+
 class Task(SQLModel, table=True):
+    __table_args__ = (
+        # Ordered (keyset) reads of one user's list
+        Index("ix_task_user_id_position", "user_id", "position", "id"),
+        # Subtree reads: descendants of a task share a path prefix
+        Index("ix_task_user_id_path", "user_id", "path"),
+        # Overdue/upcoming lists for one user
+        Index("ix_task_user_id_due_at", "user_id", "due_at"),
+        # Archiver scan: only completed tasks, oldest change first
+        Index(
+            "ix_task_completed_updated_at",
+            "updated_at",
+            postgresql_where=text("completed = true"),
+            sqlite_where=text("completed = 1"),
+        ),
+        # Only reminders that have not fired yet, so the scheduler's scan stays small
+        Index(
+            "ix_task_pending_reminder",
+            "remind_at",
+            postgresql_where=text("reminded_at IS NULL AND completed = false"),
+            sqlite_where=text("reminded_at IS NULL AND completed = 0"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="app_user.id")
     title: str = Field(index=True)
@@ -12,5 +41,16 @@ class Task(SQLModel, table=True):
     completed: bool = Field(default=False)
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
+    due_at: Optional[datetime.datetime] = Field(default=None)
+    remind_at: Optional[datetime.datetime] = Field(default=None)
+    reminded_at: Optional[datetime.datetime] = Field(default=None) # Set when the reminder fires
+    position: Optional[str] = Field(default=None, sa_type=BYTEWISE_STRING)
+    parent_id: Optional[int] = Field(default=None, index=True)
+    # IDs of all ancestors, root first: "/" for top-level tasks, "/1/5/" for a child of 5 under 1
+    path: str = Field(default="/", sa_type=BYTEWISE_STRING, sa_column_kwargs={"server_default": "/"})
+    # Bumped on every recorded change; numbers the task's history entries (1 is the create)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
 
-    owner: Optional[User] = Relationship(back_populates="tasks")
\ No newline at end of file
+    owner: Optional[User] = Relationship(back_populates="tasks")
+    # Read-only: links are written by TagService, which also maintains tag counts
+    tags: List[Tag] = Relationship(link_model=TaskTag, sa_relationship_kwargs={"viewonly": True, "order_by": "Tag.name"})
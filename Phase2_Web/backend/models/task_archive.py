@@ -0,0 +1,26 @@
+from typing import Optional
+from sqlmodel import Field, SQLModel
+import datetime
+
+class TaskArchive(SQLModel, table=True):
+    """
+    Completed tasks moved out of the hot task table by the archiver.
+    Rows keep their original task ID and everything needed to put them back
+    in place: list position, parent and materialized path, and the history
+    version (reminders are not kept, they only apply to open tasks).
+    """
+    __tablename__ = "task_archive"
+
+    id: int = Field(primary_key=True)
+    user_id: Optional[int] = Field(default=None, foreign_key="app_user.id", index=True)
+    title: str
+    description: Optional[str] = Field(default=None)
+    completed: bool = Field(default=True)
+    created_at: datetime.datetime = Field(nullable=False)
+    updated_at: datetime.datetime = Field(nullable=False)
+    due_at: Optional[datetime.datetime] = Field(default=None)
+    position: Optional[str] = Field(default=None)
+    parent_id: Optional[int] = Field(default=None)
+    path: str = Field(default="/", sa_column_kwargs={"server_default": "/"})
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    archived_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
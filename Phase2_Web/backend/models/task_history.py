@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlalchemy import Text
+from sqlmodel import Field, SQLModel
+import datetime
+
+class TaskHistory(SQLModel, table=True):
+    """
+    Append-only log of task changes, written in the same transaction as the change.
+
+    `changes` is a compact JSON diff ({"field": [old, new]} for updates).
+    On PostgreSQL the table is partitioned by month on changed_at so old
+    history is dropped a partition at a time; elsewhere HistoryService adds
+    an index on changed_at for retention deletes instead.
+    """
+    __tablename__ = "task_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (changed_at)"}
+
+    task_id: int = Field(primary_key=True)
+    version: int = Field(primary_key=True) # Task.version after the change
+    changed_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, primary_key=True)
+    user_id: Optional[int] = Field(default=None)
+    op: str = Field(max_length=16)
+    changes: str = Field(default="{}", sa_type=Text)
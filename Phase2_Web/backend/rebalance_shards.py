@@ -0,0 +1,38 @@
+"""
+Move users' tasks between shards while the API is running.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.rebalance_shards --user 42 --to 2
+    python -m backend.rebalance_shards --all
+"""
+import argparse
+
+from sqlmodel import SQLModel
+
+from backend.core.sharding import shard_router
+from backend.services.shard_service import shard_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--user", type=int, help="Move a single user")
+    target.add_argument("--all", action="store_true", help="Move every user not on its hash ring shard")
+    parser.add_argument("--to", type=int, help="Target shard for --user (default: its hash ring shard)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Tasks copied per batch")
+    parser.add_argument("--wait", type=float, help="Seconds to wait for workers to see the moving flag (default: directory TTL)")
+    args = parser.parse_args()
+
+    SQLModel.metadata.create_all(shard_router.engines[0])
+    shard_router.create_schemas()
+
+    if args.all:
+        moved = shard_service.rebalance(batch_size=args.batch_size, wait=args.wait, log=print)
+        print(f"Rebalanced {moved} users")
+    else:
+        shard = args.to if args.to is not None else shard_router.ring_shard(args.user)
+        shard_service.move_user(args.user, shard, batch_size=args.batch_size, wait=args.wait, log=print)
+
+
+if __name__ == "__main__":
+    main()
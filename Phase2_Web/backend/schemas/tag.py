@@ -0,0 +1,12 @@
+from typing import List
+from sqlmodel import SQLModel
+
+class TagResponse(SQLModel):
+    id: int
+    name: str
+    task_count: int
+
+class TagAssign(SQLModel):
+    task_ids: List[int]
+    add: List[str] = []
+    remove: List[str] = []
@@ -1,14 +1,32 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
+from pydantic import field_validator
 from sqlmodel import SQLModel
+import datetime
+import json
+
+def to_naive_utc(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """Timestamps are stored as naive UTC, like created_at/updated_at."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
 
 class TaskCreate(SQLModel):
     title: str
     description: Optional[str] = None
+    due_at: Optional[datetime.datetime] = None
+    remind_at: Optional[datetime.datetime] = None
+    parent_id: Optional[int] = None
+
+    _normalize_times = field_validator("due_at", "remind_at")(to_naive_utc)
 
 class TaskUpdate(SQLModel):
     title: Optional[str] = None
     description: Optional[str] = None
     completed: Optional[bool] = None
+    due_at: Optional[datetime.datetime] = None
+    remind_at: Optional[datetime.datetime] = None
+
+    _normalize_times = field_validator("due_at", "remind_at")(to_naive_utc)
 
 class TaskResponse(SQLModel):
     id: int
@@ -16,3 +34,51 @@ class TaskResponse(SQLModel):
     description: Optional[str] = None
     completed: bool
     user_id: int
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    due_at: Optional[datetime.datetime] = None
+    remind_at: Optional[datetime.datetime] = None
+    position: Optional[str] = None
+    parent_id: Optional[int] = None
+    tags: List[str] = []
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def _tag_names(cls, value):
+        return [tag if isinstance(tag, str) else tag.name for tag in value]
+
+class TaskMove(SQLModel):
+    after_id: Optional[int] = None # None moves the task to the top
+    parent_id: Optional[int] = None # When set (null for top level), moves the task and its subtasks under that task
+
+class TaskRollup(SQLModel):
+    task_id: int
+    total: int # All descendants, not just direct children
+    completed: int
+
+class TaskHistoryResponse(SQLModel):
+    version: int # Task version after the change; pass as before_version for the next page
+    op: str # create, update, move, tag, delete or archive
+    changes: Dict[str, Any] # {"field": [old, new]} for updates and moves
+    changed_at: datetime.datetime
+
+    @field_validator("changes", mode="before")
+    @classmethod
+    def _decode_changes(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+
+class TaskBatchCreate(TaskCreate):
+    completed: bool = False
+
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+class TaskBatch(SQLModel):
+    create: List[TaskBatchCreate] = []
+    update: List[TaskBatchUpdate] = []
+    delete: List[int] = []
+
+class TaskBatchResult(SQLModel):
+    created: List[TaskResponse]
+    updated: List[TaskResponse]
+    deleted: List[int]
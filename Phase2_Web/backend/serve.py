@@ -0,0 +1,160 @@
+"""
+Run the API in production with several worker processes (gunicorn with
+uvicorn workers), one per available CPU unless told otherwise.
+
+Usage (from the Phase2_Web directory):
+    python -m backend.serve
+    python -m backend.serve --workers 4 --port 8000 --pid /tmp/todo-api.pid
+
+The app is imported and the database schemas are prepared once in the
+master, before the workers are forked, so workers share that memory
+copy-on-write. Each worker is replaced after SERVER_MAX_REQUESTS requests.
+Connection pools are per worker and sized from DB_POOL_SIZE /
+DB_MAX_CONNECTIONS, and only one worker runs the background jobs.
+
+Signals to the master (its PID is in --pid):
+    HUP        replace all workers gracefully (same code and settings: both were
+               loaded once in the master; use USR2 to pick up changes)
+    USR2       start a new master and workers with the new code next to the
+               old ones (the new master's PID goes to <pid>.2); once they are
+               up, send TERM to the old master (PID still in <pid>) so it
+               finishes in-flight requests and exits, and the new master takes
+               over <pid>: a zero-downtime deploy
+    TERM, INT  shut down, giving in-flight requests SERVER_GRACEFUL_TIMEOUT
+"""
+import argparse
+import gc
+import logging
+import math
+import os
+import sys
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup CPU quota (containers)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quotas = [("/sys/fs/cgroup/cpu.max", None), ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us")]
+    for quota_file, period_file in quotas:
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file is not None:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+            quota, period = values[0], values[1]
+            if quota not in ("max", "-1"):
+                cpus = min(cpus, math.ceil(int(quota) / int(period)))
+            break
+        except (OSError, ValueError, IndexError):
+            continue
+    return max(1, cpus)
+
+
+def _engines():
+    from backend.core.database import db_router
+    from backend.core.sharding import shard_router
+    return [db_router.primary, *db_router.replicas, *shard_router.engines[1:]]
+
+
+def _post_fork(server, worker) -> None:
+    # Threads and pooled connections do not survive a fork safely
+    from backend.core.log import reset_after_fork
+    reset_after_fork()
+    for engine in _engines():
+        engine.dispose(close=False)
+
+
+def _on_exit(server) -> None:
+    try:
+        os.remove(settings.BACKGROUND_JOBS_LOCK_FILE)
+    except OSError:
+        pass
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from backend.main import app, init_database
+        init_database()
+        for engine in _engines():
+            engine.dispose() # Workers open their own connections
+        # Keep objects created so far out of the workers' garbage collections,
+        # which would otherwise touch (and copy) the shared pages
+        gc.freeze()
+        return app
+
+    def run(self) -> None:
+        arbiter = Arbiter(self)
+        # USR2 re-executes START_CTX. Gunicorn builds it from sys.argv, whose
+        # first entry is the path of this file, and run as a script it cannot
+        # import the backend package; re-execute it as a module instead.
+        arbiter.START_CTX["args"] = [sys.executable, "-m", "backend.serve", *sys.argv[1:]]
+        try:
+            arbiter.run()
+        except RuntimeError as e:
+            print(f"\nError: {e}\n", file=sys.stderr)
+            sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: WEB_CONCURRENCY, or one per CPU)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)), help="Default: $PORT or 8000")
+    parser.add_argument("--pid", help="Write the master's PID to this file")
+    args = parser.parse_args()
+
+    workers = args.workers or settings.WEB_CONCURRENCY or available_cpus()
+    # Read by engine_options (pool sizing) and the app, which are imported after this
+    settings.WEB_CONCURRENCY = workers
+    settings.BACKGROUND_JOBS_LOCK_FILE = os.path.join(tempfile.gettempdir(), f"todo-api-jobs-{os.getpid()}.lock")
+
+    if workers > 1 and settings.TASK_CACHE_ENABLED and not settings.TASK_CACHE_REDIS_URL:
+        logger.warning("TASK_CACHE_ENABLED with several workers needs TASK_CACHE_REDIS_URL for invalidations")
+    if workers > 1 and settings.DATABASE_REPLICA_URLS:
+        logger.warning(
+            "With several workers, read-your-writes after a write served by another worker relies on the "
+            "last_write cookie; clients that do not send cookies may read from a replica for up to "
+            "REPLICA_STICKY_SECONDS after writing"
+        )
+    if workers > 1 and settings.IDEMPOTENCY_ENABLED and settings.IDEMPOTENCY_BACKEND == "memory":
+        logger.warning("IDEMPOTENCY_BACKEND=memory with several workers only deduplicates retries within a worker")
+
+    Server({
+        "bind": f"{args.host}:{args.port}",
+        "workers": workers,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "timeout": settings.SERVER_TIMEOUT,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "pidfile": args.pid,
+        # Worker heartbeats are file writes; keep them off a possibly slow container disk
+        "worker_tmp_dir": "/dev/shm" if os.path.isdir("/dev/shm") else None,
+        "post_fork": _post_fork,
+        "on_exit": _on_exit,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import datetime
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import and_, delete, exists, insert, literal
+from sqlalchemy.orm import aliased
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from backend.core.cache import TaskListCache, task_list_cache
+from backend.core.config import settings
+from backend.core.sharding import ShardRouter, shard_router
+from backend.models.task import Task
+from backend.models.task_archive import TaskArchive
+from backend.services.history_service import HistoryService, history_service
+from backend.services.tag_service import TagService, tag_service
+
+logger = logging.getLogger(__name__)
+
+class ArchiveService:
+    """
+    Moves completed tasks that have not changed for a while into task_archive,
+    keeping the hot task table (and its indexes) small. Archived tasks lose
+    their tags, so tag counts only cover the hot set. A task is only archived
+    once all its subtasks are, so no hot task points at an archived parent.
+    """
+
+    def __init__(self, router: ShardRouter, cache: TaskListCache, tags: TagService, history: HistoryService):
+        self.router = router
+        self.cache = cache
+        self.tags = tags
+        self.history = history
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def archive_batch(self, engine: Engine, cutoff: datetime.datetime, batch_size: int) -> int:
+        """
+        Move up to batch_size eligible tasks in one transaction. Returns how many moved.
+
+        The picked rows are locked (skipping rows other transactions hold) and
+        every statement repeats the eligibility check, so a task that is
+        reopened or gets a subtask meanwhile stays in the hot table. Users
+        being moved to another shard are skipped.
+        """
+        child = aliased(Task)
+        eligible = and_(
+            Task.completed == True,  # noqa: E712
+            Task.updated_at < cutoff,
+            ~exists().where(child.parent_id == Task.id),
+            Task.user_id.not_in(self.router.moving_users()),
+        )
+        with Session(engine) as db:
+            rows = db.exec(
+                select(Task.id, Task.user_id)
+                .where(eligible)
+                .order_by(Task.updated_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True, of=Task)
+            ).all()
+            if not rows:
+                return 0
+            picked = and_(Task.id.in_([row[0] for row in rows]), eligible)
+
+            now = datetime.datetime.utcnow()
+            columns = [
+                "id", "user_id", "title", "description", "completed", "created_at", "updated_at",
+                "due_at", "position", "parent_id", "path",
+            ]
+            # The archive is the task's next recorded change, so it keeps that version
+            source = select(*[getattr(Task, name) for name in columns], Task.version + 1, literal(now))
+            copied = db.execute(
+                insert(TaskArchive).from_select(columns + ["version", "archived_at"], source.where(picked))
+            ).rowcount
+            self.history.add_from_select(db, picked, "archive", {}, now)
+            self.tags.unlink_tasks(db, select(Task.id).where(picked))
+            moved = db.execute(delete(Task).where(picked)).rowcount
+            if moved != copied:
+                # A subtask was added between the statements (row locks do not stop
+                # that); leave the whole batch for the next run
+                db.rollback()
+                return 0
+            db.commit()
+            for user_id in {row[1] for row in rows}:
+                self.cache.invalidate(user_id)
+            return moved
+
+    def archive_completed(self, older_than_days: Optional[int] = None, batch_size: Optional[int] = None,
+                          log: Callable[[str], None] = logger.info) -> int:
+        """
+        Archive every eligible task on every shard, one batch per transaction.
+        """
+        days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+
+        total = 0
+        for shard, engine in enumerate(self.router.engines):
+            moved = 0
+            while not self._stop.is_set():
+                count = self.archive_batch(engine, cutoff, batch_size)
+                moved += count
+                if count < batch_size:
+                    break
+            if moved:
+                log(f"Archived {moved} completed tasks on shard {shard}")
+            total += moved
+        return total
+
+    def start(self, interval: float) -> None:
+        """Run archive_completed every `interval` seconds in a daemon thread."""
+        if interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.archive_completed()
+                except Exception:
+                    logger.exception("Task archival failed")
+
+        self._thread = threading.Thread(target=loop, name="task-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+archive_service = ArchiveService(shard_router, task_list_cache, tag_service, history_service)
@@ -0,0 +1,195 @@
+import datetime
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Index, delete, insert, literal, text, tuple_
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from backend.core.config import settings
+from backend.core.sharding import ShardRouter, shard_router
+from backend.models.task import Task
+from backend.models.task_history import TaskHistory
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ["task_id", "user_id", "version", "op", "changes", "changed_at"]
+_PARTITION_NAME = re.compile(r"^task_history_(\d{4})_(\d{2})$")
+
+
+def _encode_value(value: Any) -> str:
+    return value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else str(value)
+
+
+def _encode(changes: Dict[str, Any]) -> str:
+    return json.dumps(changes, separators=(",", ":"), default=_encode_value)
+
+
+def _month_start(value: datetime.datetime, offset: int = 0) -> datetime.datetime:
+    month = value.year * 12 + value.month - 1 + offset
+    return datetime.datetime(month // 12, month % 12 + 1, 1)
+
+
+class HistoryService:
+    """
+    Records task changes in task_history inside the caller's transaction.
+
+    Each request adds at most one history statement: rows built in Python
+    go in with a single executemany (add), and bulk changes copy their rows
+    with one INSERT ... SELECT (add_from_select). Callers bump Task.version
+    in the same UPDATE they already run, so numbering entries costs no
+    extra query.
+    """
+
+    def __init__(self, router: ShardRouter, enabled: bool = True, retention_days: int = 0):
+        self.router = router
+        self.enabled = enabled
+        self.retention_days = retention_days
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def diff(self, task: Task, data: Dict[str, Any]) -> Dict[str, list]:
+        """{"field": [old, new]} for the fields in data that differ from the task."""
+        return {key: [getattr(task, key), value] for key, value in data.items() if getattr(task, key) != value}
+
+    def entry(self, task: Task, op: str, changes: Dict[str, Any], now: datetime.datetime) -> dict:
+        return {
+            "task_id": task.id,
+            "user_id": task.user_id,
+            "version": task.version,
+            "op": op,
+            "changes": _encode(changes),
+            "changed_at": now,
+        }
+
+    def add(self, db: Session, entries: List[dict]) -> None:
+        if self.enabled and entries:
+            db.execute(insert(TaskHistory), entries)
+
+    def add_from_select(self, db: Session, condition, op: str, changes: Dict[str, Any],
+                        now: datetime.datetime) -> None:
+        """
+        Record the same change for every task matching condition, numbered
+        Task.version + 1. Run it before the UPDATE (or DELETE) it describes.
+        """
+        if not self.enabled:
+            return
+        source = select(
+            Task.id, Task.user_id, Task.version + 1, literal(op), literal(_encode(changes)), literal(now)
+        ).where(condition)
+        db.execute(insert(TaskHistory).from_select(_COLUMNS, source))
+
+    def get_history(self, db: Session, user: User, task_id: int, limit: int,
+                    before_version: Optional[int] = None) -> List[TaskHistory]:
+        """Newest entries first; pass the last version seen as before_version for the next page."""
+        statement = select(TaskHistory).where(TaskHistory.task_id == task_id, TaskHistory.user_id == user.id)
+        if before_version is not None:
+            statement = statement.where(TaskHistory.version < before_version)
+        return db.exec(statement.order_by(TaskHistory.version.desc()).limit(limit)).all()
+
+    def prepare(self, connection: Connection, now: Optional[datetime.datetime] = None) -> None:
+        """
+        Create this and next month's partitions (and a default one) on
+        PostgreSQL, or the changed_at index used for retention elsewhere.
+        """
+        if connection.dialect.name != "postgresql":
+            Index("ix_task_history_changed_at", TaskHistory.__table__.c.changed_at).create(connection, checkfirst=True)
+            return
+        now = now or datetime.datetime.utcnow()
+        connection.execute(text("CREATE TABLE IF NOT EXISTS task_history_default PARTITION OF task_history DEFAULT"))
+        for offset in (0, 1):
+            start, end = _month_start(now, offset), _month_start(now, offset + 1)
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS task_history_{start:%Y_%m} PARTITION OF task_history "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            ))
+
+    def drop_expired(self, connection: Connection, now: Optional[datetime.datetime] = None) -> int:
+        """
+        Drop the monthly partitions that only hold history older than
+        retention_days (PostgreSQL). Returns the number of partitions dropped.
+        """
+        if self.retention_days <= 0 or connection.dialect.name != "postgresql":
+            return 0
+        cutoff = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=self.retention_days)
+        partitions = connection.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'task_history'"
+        )).scalars().all()
+        dropped = 0
+        for name in partitions:
+            match = _PARTITION_NAME.match(name)
+            if match and _month_start(datetime.datetime(int(match[1]), int(match[2]), 1), 1) <= cutoff:
+                connection.execute(text(f"DROP TABLE {name}"))
+                dropped += 1
+        return dropped
+
+    def delete_expired(self, engine: Engine, now: Optional[datetime.datetime] = None,
+                       batch_size: int = 10000) -> int:
+        """
+        Delete the history older than retention_days that dropping partitions
+        does not remove: all of it on other backends, and on PostgreSQL the
+        rows in the default partition or in a task_history table created
+        before it was partitioned. Deletes batch_size rows per transaction so
+        a large backlog never holds locks for long. Returns rows deleted.
+        """
+        if self.retention_days <= 0:
+            return 0
+        cutoff = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=self.retention_days)
+        key = tuple_(TaskHistory.task_id, TaskHistory.version, TaskHistory.changed_at)
+        expired = (
+            select(TaskHistory.task_id, TaskHistory.version, TaskHistory.changed_at)
+            .where(TaskHistory.changed_at < cutoff)
+            .limit(batch_size)
+        )
+        total = 0
+        while not self._stop.is_set():
+            with engine.begin() as connection:
+                deleted = connection.execute(delete(TaskHistory).where(key.in_(expired))).rowcount
+            total += deleted
+            if deleted < batch_size:
+                break
+        return total
+
+    def maintain(self, engines: Optional[List[Engine]] = None) -> None:
+        """Prepare partitions and apply retention on every shard; errors are logged per shard."""
+        for shard, engine in enumerate(engines or self.router.engines):
+            try:
+                with engine.begin() as connection:
+                    self.prepare(connection)
+                    self.drop_expired(connection)
+                self.delete_expired(engine)
+            except SQLAlchemyError:
+                logger.exception("Task history maintenance failed", extra={"shard": shard})
+
+    def start(self, interval: float) -> None:
+        """Run maintain every `interval` seconds in a daemon thread."""
+        if interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                self.maintain()
+
+        self._thread = threading.Thread(target=loop, name="task-history-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+history_service = HistoryService(
+    shard_router,
+    enabled=settings.HISTORY_ENABLED,
+    retention_days=settings.HISTORY_RETENTION_DAYS,
+)
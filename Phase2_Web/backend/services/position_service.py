@@ -0,0 +1,189 @@
+import datetime
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, or_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from backend.core.cache import TaskListCache, task_list_cache
+from backend.core.config import settings
+from backend.core.ordering import keys_between
+from backend.core.sharding import ShardRouter, shard_router
+from backend.models.position_rebalance import PositionRebalance
+from backend.models.shard import UserShard
+from backend.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+class PositionService:
+    """
+    Renumbers task positions in the background.
+
+    A move only rewrites the moved task, so repeated moves into the same gap
+    make its key longer. When a move produces a key longer than
+    `max_key_length`, the user is queued in the position_rebalance table on
+    the primary, so the worker that runs background jobs sees moves served
+    by every worker, and their whole list is given short consecutive keys in
+    one transaction. On start it also assigns positions to tasks created
+    before the position column existed. Users being moved to another shard
+    are left queued until the move is done.
+    """
+
+    def __init__(self, router: ShardRouter, cache: TaskListCache, max_key_length: int = 32,
+                 poll_interval: float = 5.0):
+        self.router = router
+        self.cache = cache
+        self.max_key_length = max_key_length
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.rebalanced = 0
+
+    def check(self, engine: Engine, user_id: int, key: str) -> None:
+        """Queue a rebalance of the user's list if `key` is too long."""
+        if len(key) <= self.max_key_length:
+            return
+        shard = self.router.engines.index(engine)
+        try:
+            with self.router.engines[0].begin() as connection:
+                connection.execute(insert(PositionRebalance).values(user_id=user_id, shard=shard))
+        except IntegrityError:
+            # Already queued: refresh it, so a rebalance already running does not dequeue this move
+            with self.router.engines[0].begin() as connection:
+                connection.execute(
+                    update(PositionRebalance)
+                    .where(PositionRebalance.user_id == user_id)
+                    .values(shard=shard, queued_at=datetime.datetime.utcnow())
+                )
+        self._wake.set() # Only matters when this process runs the rebalancer
+
+    def rebalance_user(self, engine: Engine, user_id: int) -> int:
+        """
+        Give every task of the user a new short key, keeping the current order
+        (tasks without a position go last, oldest first). Returns how many changed.
+
+        updated_at is left alone: renumbering is not an edit, so it must not
+        reset the archival age or make delta syncs pull the whole list. The
+        order does not change and moves are addressed by task ID, so clients
+        holding the old keys stay correct.
+        """
+        with Session(engine) as db:
+            ids = db.exec(
+                select(Task.id)
+                .where(Task.user_id == user_id)
+                .order_by(Task.position.is_(None), Task.position, Task.id)
+                .with_for_update()
+            ).all()
+            if not ids:
+                return 0
+            db.execute(
+                update(Task),
+                [
+                    {"id": task_id, "position": key}
+                    for task_id, key in zip(ids, keys_between(None, None, len(ids)))
+                ],
+            )
+            db.commit()
+        self.cache.invalidate(user_id)
+        self.rebalanced += 1
+        return len(ids)
+
+    def backfill(self) -> int:
+        """Rebalance every user that has tasks without a position. Returns how many users."""
+        users = 0
+        for engine in self.router.engines:
+            while not self._stop.is_set():
+                with Session(engine) as db:
+                    user_ids = db.exec(
+                        select(Task.user_id)
+                        .where(
+                            Task.position.is_(None),
+                            Task.user_id.is_not(None),
+                            Task.user_id.not_in(self.router.moving_users()),
+                        )
+                        .distinct()
+                        .limit(100)
+                    ).all()
+                if not user_ids:
+                    break
+                for user_id in user_ids:
+                    self.rebalance_user(engine, user_id)
+                users += len(user_ids)
+        return users
+
+    def run_pending(self) -> int:
+        """Rebalance every queued user. Returns how many were processed."""
+        done = 0
+        while not self._stop.is_set():
+            with Session(self.router.engines[0]) as db:
+                # The directory, not the queued shard, says where the user lives now
+                queued = db.exec(
+                    select(
+                        PositionRebalance.user_id,
+                        PositionRebalance.queued_at,
+                        func.coalesce(UserShard.shard, PositionRebalance.shard),
+                    )
+                    .outerjoin(UserShard, UserShard.user_id == PositionRebalance.user_id)
+                    .where(or_(UserShard.moving.is_(None), UserShard.moving == False))  # noqa: E712
+                    .order_by(PositionRebalance.queued_at)
+                    .limit(100)
+                ).all()
+            if not queued:
+                break
+            for user_id, queued_at, shard in queued:
+                if self._stop.is_set():
+                    break
+                self.rebalance_user(self.router.engines[shard], user_id)
+                with self.router.engines[0].begin() as connection:
+                    # A move queued again after this rebalance started keeps its entry
+                    connection.execute(
+                        delete(PositionRebalance).where(
+                            PositionRebalance.user_id == user_id,
+                            PositionRebalance.queued_at == queued_at,
+                        )
+                    )
+                done += 1
+        return done
+
+    def start(self) -> None:
+        """
+        Backfill missing positions, then rebalance queued users as they are
+        queued in this process or every poll_interval seconds, in a daemon thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            try:
+                self.backfill()
+            except Exception:
+                logger.exception("Task position backfill failed")
+            while not self._stop.is_set():
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                try:
+                    self.run_pending()
+                except Exception:
+                    logger.exception("Task position rebalance failed")
+
+        self._thread = threading.Thread(target=loop, name="task-position-rebalancer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+position_service = PositionService(
+    shard_router,
+    task_list_cache,
+    max_key_length=settings.POSITION_MAX_KEY_LENGTH,
+    poll_interval=settings.POSITION_REBALANCE_POLL_SECONDS,
+)
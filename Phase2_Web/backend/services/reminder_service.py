@@ -0,0 +1,194 @@
+import datetime
+import heapq
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Protocol, Set, Tuple
+
+from sqlalchemy import tuple_, update
+from sqlmodel import Session, select
+
+from backend.core.config import settings
+from backend.core.sharding import ShardRouter, shard_router
+from backend.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+
+class Reminder(NamedTuple):
+    task_id: int
+    user_id: int
+    title: str
+    due_at: Optional[datetime.datetime]
+    remind_at: datetime.datetime
+
+
+class Notifier(Protocol):
+    """Delivers reminders (e-mail, push, webhook, ...)."""
+
+    def notify(self, reminder: Reminder) -> None: ...
+
+
+class LogNotifier:
+    """Default notifier: just logs the reminder."""
+
+    def notify(self, reminder: Reminder) -> None:
+        logger.info("Reminder", extra={"task_id": reminder.task_id, "user_id": reminder.user_id, "title": reminder.title, "due_at": reminder.due_at})
+
+
+def load_notifier(path: str) -> Notifier:
+    """Build the notifier from a "module:attribute" factory path, or log reminders by default."""
+    if not path:
+        return LogNotifier()
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+class ReminderScheduler:
+    """
+    Fires task reminders at their remind_at time.
+
+    Every `poll_interval` seconds each shard is asked for at most `batch_size`
+    pending reminders due within the next `window` (an index range scan on
+    the pending-reminder index). They go into an in-memory min-heap, and the
+    scheduler thread sleeps until the earliest one is due. Memory therefore
+    depends on how many reminders fall in the window, not on how many are
+    scheduled in total. When a shard returns a full batch there may be more
+    due, so the next poll runs as soon as the due part of the batch has fired
+    instead of waiting for `poll_interval`.
+
+    Due reminders are claimed per shard with one conditional UPDATE ...
+    RETURNING that sets reminded_at before the notifier runs, so each fires
+    at most once, even with several workers running schedulers or after a
+    restart. Reminders that came due while the app was down fire on the next
+    poll. If remind_at is changed after a reminder was loaded, the claim fails
+    and the new time is picked up by a later poll, as are reminders of users
+    being moved to another shard. A reminder whose notifier raises is not
+    retried.
+    """
+
+    def __init__(self, router: ShardRouter, notifier: Notifier, window: float = 300,
+                 poll_interval: float = 30, batch_size: int = 1000):
+        self.router = router
+        self.notifier = notifier
+        self.window = datetime.timedelta(seconds=window)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._heap: List[Tuple[datetime.datetime, int, int]] = [] # (remind_at, shard, task_id)
+        self._queued: Set[Tuple[int, int]] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.backlog = False # a shard returned a full batch on the last poll
+        self.fired = 0
+
+    def load_window(self, now: Optional[datetime.datetime] = None) -> int:
+        """Queue pending reminders due before now + window. Returns how many were added."""
+        horizon = (now or datetime.datetime.utcnow()) + self.window
+        moving = self.router.moving_users()
+        added = 0
+        self.backlog = False
+        for shard, engine in enumerate(self.router.engines):
+            with Session(engine) as db:
+                rows = db.exec(
+                    select(Task.id, Task.remind_at)
+                    .where(
+                        Task.reminded_at.is_(None),
+                        Task.completed == False,  # noqa: E712
+                        Task.remind_at <= horizon,
+                        Task.user_id.not_in(moving),
+                    )
+                    .order_by(Task.remind_at)
+                    .limit(self.batch_size)
+                ).all()
+            if len(rows) >= self.batch_size:
+                self.backlog = True
+            for task_id, remind_at in rows:
+                if (shard, task_id) not in self._queued:
+                    heapq.heappush(self._heap, (remind_at, shard, task_id))
+                    self._queued.add((shard, task_id))
+                    added += 1
+        return added
+
+    def fire_due(self, now: Optional[datetime.datetime] = None) -> int:
+        """Claim and notify every queued reminder that is due. Returns how many fired."""
+        now = now or datetime.datetime.utcnow()
+        due: Dict[int, List[Tuple[int, datetime.datetime]]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            remind_at, shard, task_id = heapq.heappop(self._heap)
+            self._queued.discard((shard, task_id))
+            due.setdefault(shard, []).append((task_id, remind_at))
+
+        fired = 0
+        moving = self.router.moving_users() if due else set()
+        for shard, entries in due.items():
+            for reminder in self._claim(shard, entries, now, moving):
+                try:
+                    self.notifier.notify(reminder)
+                except Exception:
+                    logger.exception("Reminder delivery failed", extra={"task_id": reminder.task_id})
+                fired += 1
+        self.fired += fired
+        return fired
+
+    def _claim(self, shard: int, entries: List[Tuple[int, datetime.datetime]],
+               now: datetime.datetime, moving: Set[int]) -> List[Reminder]:
+        with self.router.session(shard) as db:
+            rows = db.execute(
+                update(Task)
+                .where(
+                    tuple_(Task.id, Task.remind_at).in_(entries),
+                    Task.reminded_at.is_(None),
+                    Task.completed == False,  # noqa: E712
+                    Task.user_id.not_in(moving),
+                )
+                .values(reminded_at=now)
+                .returning(Task.id, Task.user_id, Task.title, Task.due_at, Task.remind_at)
+            ).all()
+            db.commit()
+        return [Reminder(*row) for row in rows]
+
+    def start(self) -> None:
+        """Run the scheduler in a daemon thread (no-op if poll_interval <= 0)."""
+        if self.poll_interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            next_poll = 0.0
+            while not self._stop.is_set():
+                try:
+                    if time.monotonic() >= next_poll:
+                        self.load_window()
+                        next_poll = time.monotonic() + self.poll_interval
+                    queued = len(self._heap)
+                    self.fire_due()
+                    if self.backlog and len(self._heap) < queued:
+                        # The batch was full and made room: load the next one now
+                        next_poll = time.monotonic()
+                except Exception:
+                    logger.exception("Reminder scheduler failed")
+                    next_poll = time.monotonic() + self.poll_interval
+
+                wait = next_poll - time.monotonic()
+                if self._heap:
+                    until_due = (self._heap[0][0] - datetime.datetime.utcnow()).total_seconds()
+                    wait = min(wait, until_due)
+                self._stop.wait(max(0.0, wait))
+
+        self._thread = threading.Thread(target=loop, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+reminder_scheduler = ReminderScheduler(
+    shard_router,
+    load_notifier(settings.REMINDER_NOTIFIER),
+    window=settings.REMINDER_WINDOW_SECONDS,
+    poll_interval=settings.REMINDER_POLL_SECONDS,
+    batch_size=settings.REMINDER_BATCH_SIZE,
+)
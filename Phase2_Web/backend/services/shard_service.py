@@ -0,0 +1,145 @@
+import logging
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, insert, tuple_
+from sqlmodel import Session, select
+
+from backend.core.cache import TaskListCache, task_list_cache
+from backend.core.sharding import ShardRouter, shard_router
+from backend.models.shard import UserShard
+from backend.models.tag import Tag, TaskTag
+from backend.models.task import Task
+from backend.models.task_archive import TaskArchive
+from backend.models.task_history import TaskHistory
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Per-user tables moved together with the user, parents before children
+MOVED_MODELS = [Task, TaskArchive, TaskHistory, Tag, TaskTag]
+
+class ShardService:
+    def __init__(self, router: ShardRouter, cache: TaskListCache):
+        self.router = router
+        self.cache = cache
+
+    def move_user(self, user_id: int, target: int, batch_size: int = 1000,
+                  wait: Optional[float] = None, log: Callable[[str], None] = logger.info) -> int:
+        """
+        Move one user's tasks to another shard while the API keeps running.
+
+        1. Flag the user as moving and wait out the directory cache, so every
+           worker sends the user's writes a 503 while reads keep hitting the source.
+           Background jobs (archiver, reminders, position rebalancing) skip the user.
+        2. Copy tasks (and archived tasks, history, tags and tag links) to the target in
+           keyset-paginated batches, keeping their IDs.
+        3. Point the directory at the target, still flagged, and wait out the
+           directory cache again, so no worker reads from the source any more.
+        4. Clear the flag, invalidate the user's cached task list and delete
+           the tasks from the source.
+
+        Moved rows keep their IDs. On PostgreSQL each shard allocates IDs from
+        its own range; on shards without one (SQLite) the move is rejected if
+        an ID already exists on the target.
+
+        Returns the number of tasks moved.
+        """
+        if not 0 <= target < len(self.router.engines):
+            raise ValueError(f"Unknown shard {target}")
+        wait = self.router.directory_ttl if wait is None else wait
+
+        with Session(self.router.engines[0]) as db:
+            if db.get(User, user_id) is None:
+                raise ValueError(f"User {user_id} not found")
+            entry = db.get(UserShard, user_id) or UserShard(user_id=user_id, shard=0)
+            source = entry.shard
+            if source == target:
+                return 0
+            entry.moving = True
+            db.add(entry)
+            db.commit()
+        self.router.forget(user_id)
+        log(f"User {user_id}: writes paused, waiting {wait:.0f}s for workers to notice")
+        time.sleep(wait)
+
+        moved = 0
+        try:
+            with self.router.session(source) as src, self.router.session(target) as dst:
+                # Clear leftovers from an earlier interrupted move
+                for model in reversed(MOVED_MODELS):
+                    dst.execute(delete(model).where(model.user_id == user_id))
+                for model in MOVED_MODELS:
+                    key = list(model.__table__.primary_key.columns)
+                    last = None
+                    while True:
+                        statement = select(model).where(model.user_id == user_id)
+                        if last is not None:
+                            statement = statement.where(tuple_(*key) > tuple_(*last))
+                        rows = src.exec(statement.order_by(*key).limit(batch_size)).all()
+                        if not rows:
+                            break
+                        if "id" in model.__table__.c:
+                            ids = [row.id for row in rows]
+                            clash = dst.exec(select(model.id).where(model.id.in_(ids))).first()
+                            if clash is not None:
+                                raise RuntimeError(
+                                    f"{model.__tablename__} ID {clash} already exists on shard {target}, move rejected"
+                                )
+                        dst.execute(insert(model), [row.model_dump() for row in rows])
+                        if model is Task:
+                            moved += len(rows)
+                        last = [getattr(rows[-1], column.name) for column in key]
+                dst.commit()
+        except Exception:
+            with Session(self.router.engines[0]) as db:
+                entry = db.get(UserShard, user_id)
+                entry.moving = False
+                db.add(entry)
+                db.commit()
+            self.router.forget(user_id)
+            raise
+
+        with Session(self.router.engines[0]) as db:
+            entry = db.get(UserShard, user_id)
+            entry.shard = target
+            db.add(entry)
+            db.commit()
+        self.router.forget(user_id)
+        log(f"User {user_id}: copied {moved} tasks, waiting {wait:.0f}s for workers to read from shard {target}")
+        time.sleep(wait)
+
+        with Session(self.router.engines[0]) as db:
+            entry = db.get(UserShard, user_id)
+            entry.moving = False
+            db.add(entry)
+            db.commit()
+        self.router.forget(user_id)
+        self.cache.invalidate(user_id)
+
+        with self.router.session(source) as src:
+            for model in reversed(MOVED_MODELS):
+                src.execute(delete(model).where(model.user_id == user_id))
+            src.commit()
+        log(f"User {user_id}: moved {moved} tasks from shard {source} to shard {target}")
+        return moved
+
+    def misplaced_users(self) -> List[int]:
+        """Users whose directory shard differs from their hash ring shard."""
+        with Session(self.router.engines[0]) as db:
+            placements = {entry.user_id: entry.shard for entry in db.exec(select(UserShard)).all()}
+            user_ids = db.exec(select(User.id)).all()
+        return [
+            user_id for user_id in user_ids
+            if placements.get(user_id, 0) != self.router.ring_shard(user_id)
+        ]
+
+    def rebalance(self, batch_size: int = 1000, wait: Optional[float] = None,
+                  log: Callable[[str], None] = logger.info) -> int:
+        """Move every misplaced user to its ring shard. Returns users moved."""
+        users = self.misplaced_users()
+        for user_id in users:
+            self.move_user(user_id, self.router.ring_shard(user_id), batch_size=batch_size, wait=wait, log=log)
+        return len(users)
+
+shard_service = ShardService(shard_router, task_list_cache)
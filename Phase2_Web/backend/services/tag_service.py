@@ -0,0 +1,135 @@
+from typing import Dict, List, Union
+import datetime
+from fastapi import HTTPException
+from sqlalchemy import Select, delete, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from backend.core.cache import TaskListCache, task_list_cache
+from backend.models.tag import Tag, TaskTag
+from backend.models.task import Task
+from backend.models.user import User
+from backend.services.history_service import HistoryService, history_service
+
+class TagService:
+    def __init__(self, cache: TaskListCache, history: HistoryService):
+        self.cache = cache
+        self.history = history
+
+    def list_tags(self, db: Session, user: User) -> List[Tag]:
+        return db.exec(select(Tag).where(Tag.user_id == user.id).order_by(Tag.name)).all()
+
+    def resolve(self, db: Session, user: User, names: List[str]) -> Dict[str, int]:
+        """Map the user's existing tag names to IDs (unknown names are left out)."""
+        if not names:
+            return {}
+        rows = db.exec(select(Tag.name, Tag.id).where(Tag.user_id == user.id, Tag.name.in_(names))).all()
+        return dict(rows)
+
+    def _clean_names(self, names: List[str]) -> List[str]:
+        cleaned = []
+        for name in names:
+            name = name.strip()
+            if not name or len(name) > 50:
+                raise HTTPException(status_code=400, detail=f"Invalid tag name: {name!r}")
+            if name not in cleaned:
+                cleaned.append(name)
+        return cleaned
+
+    def _get_or_create(self, db: Session, user: User, names: List[str]) -> Dict[str, int]:
+        tag_ids = self.resolve(db, user, names)
+        for name in names:
+            if name in tag_ids:
+                continue
+            try:
+                with db.begin_nested():
+                    tag = Tag(user_id=user.id, name=name)
+                    db.add(tag)
+                tag_ids[name] = tag.id
+            except IntegrityError:
+                # Created concurrently by another request
+                tag_ids.update(self.resolve(db, user, [name]))
+        return tag_ids
+
+    def _adjust_counts(self, db: Session, counts: Dict[int, int]) -> None:
+        for tag_id, delta in counts.items():
+            if delta:
+                db.execute(update(Tag).where(Tag.id == tag_id).values(task_count=Tag.task_count + delta))
+
+    def unlink_tasks(self, db: Session, task_ids: Union[List[int], Select]) -> None:
+        """
+        Remove all tag links of the given tasks (a list of IDs or a select of
+        task IDs) and update tag counts. Call before deleting the tasks; the
+        caller commits.
+        """
+        if isinstance(task_ids, list) and not task_ids:
+            return
+        counts = db.exec(
+            select(TaskTag.tag_id, func.count()).where(TaskTag.task_id.in_(task_ids)).group_by(TaskTag.tag_id)
+        ).all()
+        if not counts:
+            return
+        self._adjust_counts(db, {tag_id: -count for tag_id, count in counts})
+        db.execute(delete(TaskTag).where(TaskTag.task_id.in_(task_ids)))
+
+    def assign(self, db: Session, user: User, task_ids: List[int], add: List[str], remove: List[str]) -> List[Tag]:
+        """
+        Add and remove tags on many tasks in one transaction.
+
+        Missing tags in `add` are created. Existing links are read with one
+        query and only new links are inserted, so counts stay exact. Returns
+        the tags that were touched.
+        """
+        task_ids = sorted(set(task_ids))
+        add, remove = self._clean_names(add), self._clean_names(remove)
+        if not task_ids or not (add or remove):
+            return []
+        found = set(db.exec(select(Task.id).where(Task.user_id == user.id, Task.id.in_(task_ids))).all())
+        missing = set(task_ids) - found
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Tasks not found: {sorted(missing)}")
+
+        add_ids = self._get_or_create(db, user, add)
+        remove_ids = self.resolve(db, user, remove)
+        counts: Dict[int, int] = {}
+
+        if add_ids:
+            existing = set(db.exec(
+                select(TaskTag.tag_id, TaskTag.task_id)
+                .where(TaskTag.tag_id.in_(add_ids.values()), TaskTag.task_id.in_(task_ids))
+            ).all())
+            links = [
+                {"tag_id": tag_id, "task_id": task_id, "user_id": user.id}
+                for tag_id in add_ids.values() for task_id in task_ids
+                if (tag_id, task_id) not in existing
+            ]
+            if links:
+                db.execute(insert(TaskTag), links)
+            for link in links:
+                counts[link["tag_id"]] = counts.get(link["tag_id"], 0) + 1
+
+        if remove_ids:
+            removed = db.exec(
+                select(TaskTag.tag_id, func.count())
+                .where(TaskTag.tag_id.in_(remove_ids.values()), TaskTag.task_id.in_(task_ids))
+                .group_by(TaskTag.tag_id)
+            ).all()
+            db.execute(
+                delete(TaskTag).where(TaskTag.tag_id.in_(remove_ids.values()), TaskTag.task_id.in_(task_ids))
+            )
+            for tag_id, count in removed:
+                counts[tag_id] = counts.get(tag_id, 0) - count
+
+        self._adjust_counts(db, counts)
+        now = datetime.datetime.utcnow()
+        changed = Task.id.in_(task_ids)
+        self.history.add_from_select(db, changed, "tag", {"add": add, "remove": remove}, now)
+        # Tags are part of the task, so delta syncs (updated_since) must see the change
+        db.execute(update(Task).where(changed).values(updated_at=now, version=Task.version + 1))
+        db.commit()
+        self.cache.invalidate(user.id)
+
+        touched = set(add_ids.values()) | set(remove_ids.values())
+        return db.exec(select(Tag).where(Tag.id.in_(touched)).order_by(Tag.name)).all()
+
+tag_service = TagService(task_list_cache, history_service)
@@ -1,41 +1,424 @@
-from typing import List
+from typing import List, Optional
 import datetime
+from sqlalchemy import and_, bindparam, case, delete as delete_, func, literal, or_, tuple_, update as update_
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, select
 from fastapi import HTTPException
+from pydantic import TypeAdapter
 
+from backend.core.cache import TaskListCache, task_list_cache
+from backend.core.config import settings
+from backend.core.ordering import key_between, keys_between
+from backend.core.singleflight import SingleFlight
+from backend.models.tag import TaskTag
 from backend.models.task import Task
+from backend.models.task_archive import TaskArchive
+from backend.models.task_history import TaskHistory
 from backend.models.user import User
+from backend.schemas.task import TaskResponse
+from backend.services.history_service import HistoryService, history_service
+from backend.services.position_service import PositionService, position_service
+from backend.services.tag_service import TagService, tag_service
+
+task_list_adapter = TypeAdapter(List[TaskResponse])
+
+# Longest materialized path accepted, which keeps index entries small
+MAX_PATH_LENGTH = 1000
+
+# Hot queries are built once with bound parameters. Building a select() per
+# call, and hashing it to find its compiled SQL in SQLAlchemy's cache, is
+# Python work repeated on every request; a prebuilt statement skips both.
+_USER_TASKS = (
+    select(Task)
+    .where(Task.user_id == bindparam("user_id"))
+    .options(selectinload(Task.tags))
+    .order_by(Task.position, Task.id)
+)
+# Inclusive so a change in the same tick as the watermark is not missed
+_USER_TASKS_SINCE = _USER_TASKS.where(Task.updated_at >= bindparam("updated_since"))
+_TASK_BY_ID = select(Task).where(Task.id == bindparam("task_id"))
+
+def _subtree_prefix(task: Task) -> str:
+    """Path shared by every descendant of the task."""
+    return f"{task.path}{task.id}/"
+
+def _in_subtree(prefix: str):
+    """Paths starting with prefix, as an index range ("0" is the character after "/")."""
+    return and_(Task.path >= prefix, Task.path < prefix[:-1] + "0")
 
 class TaskService:
-    def get_user_tasks(self, db: Session, user: User) -> List[Task]:
-        return db.exec(select(Task).where(Task.user_id == user.id)).all()
+    def __init__(self, cache: TaskListCache, flights: SingleFlight, positions: PositionService, tags: TagService,
+                 history: HistoryService):
+        self.cache = cache
+        self.flights = flights
+        self.positions = positions
+        self.tags = tags
+        self.history = history
+
+    def get_user_tasks_json(self, db: Session, user: User) -> bytes:
+        """
+        The user's task list serialized as JSON, served from the cache when possible.
+
+        Concurrent misses for the same user and cache version share one query.
+        The version changes on every write, so a request that arrives after a
+        write never joins a query that started before it.
+        """
+        cached, version = self.cache.get(user.id)
+        if cached is not None:
+            return cached
+        return self.flights.do(("tasks", user.id, version), lambda: self._load_tasks_json(db, user, version))
+
+    def _load_tasks_json(self, db: Session, user: User, version: int) -> bytes:
+        tasks = self.get_user_tasks(db, user)
+        payload = task_list_adapter.dump_json(task_list_adapter.validate_python(tasks, from_attributes=True))
+        self.cache.set(user.id, version, payload)
+        return payload
+
+    def get_user_tasks(self, db: Session, user: User, updated_since: Optional[datetime.datetime] = None) -> List[Task]:
+        if updated_since is not None:
+            return db.exec(_USER_TASKS_SINCE, params={"user_id": user.id, "updated_since": updated_since}).all()
+        return db.exec(_USER_TASKS, params={"user_id": user.id}).all()
+
+    def list_tasks(self, db: Session, user: User, updated_since: Optional[datetime.datetime] = None,
+                   due: Optional[str] = None, within: datetime.timedelta = datetime.timedelta(hours=24),
+                   tags: Optional[List[str]] = None, match_all: bool = False,
+                   limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Task]:
+        """
+        Tasks matching every given filter, in one query.
+
+        - updated_since: changed at or after that time.
+        - due: open tasks that are "overdue", or "upcoming" within `within`.
+        - tags: carrying any (or, with match_all, all) of the named tags. The
+          tag IDs are matched against the (tag_id, task_id) key of task_tag,
+          so only the matching links and tasks are read.
+
+        Tasks come in list order, or soonest due first when filtering by due.
+        `limit` and `after_id` (the last task of the previous page) page
+        through that order with a keyset condition.
+        """
+        if due is None and not tags and limit is None and after_id is None:
+            return self.get_user_tasks(db, user, updated_since)
+
+        statement = select(Task).where(Task.user_id == user.id)
+        if updated_since is not None:
+            statement = statement.where(Task.updated_at >= updated_since)
+        if tags:
+            names = set(tags)
+            tag_ids = self.tags.resolve(db, user, list(names))
+            if not tag_ids or (match_all and len(tag_ids) < len(names)):
+                return []
+            links = select(TaskTag.task_id).where(TaskTag.tag_id.in_(tag_ids.values()))
+            if match_all:
+                links = links.group_by(TaskTag.task_id).having(func.count() == len(tag_ids))
+            statement = statement.where(Task.id.in_(links))
+        if due is not None:
+            now = datetime.datetime.utcnow()
+            statement = statement.where(Task.due_at.is_not(None), Task.completed == False)  # noqa: E712
+            if due == "overdue":
+                statement = statement.where(Task.due_at < now)
+            else:
+                statement = statement.where(Task.due_at >= now, Task.due_at < now + within)
+            order = (Task.due_at, Task.id)
+        else:
+            order = (Task.position, Task.id)
+        if after_id is not None:
+            after = self.get_task(db, user, after_id)
+            statement = statement.where(tuple_(*order) > tuple_(*[getattr(after, column.key) for column in order]))
+        statement = statement.options(selectinload(Task.tags)).order_by(*order)
+        if limit is not None:
+            statement = statement.limit(limit)
+        return db.exec(statement).all()
+
+    def get_subtree(self, db: Session, user: User, task_id: int) -> List[Task]:
+        """The task followed by all its descendants, parents before children."""
+        task = self.get_task(db, user, task_id)
+        descendants = db.exec(
+            select(Task)
+            .where(Task.user_id == user.id, _in_subtree(_subtree_prefix(task)))
+            .options(selectinload(Task.tags))
+            .order_by(Task.path, Task.position, Task.id)
+        ).all()
+        return [task] + descendants
+
+    def get_rollup(self, db: Session, user: User, task_id: int) -> dict:
+        """Number of descendants of the task and how many of them are completed."""
+        task = self.get_task(db, user, task_id)
+        total, completed = db.exec(
+            select(func.count(), func.coalesce(func.sum(case((Task.completed == True, 1), else_=0)), 0))  # noqa: E712
+            .where(Task.user_id == user.id, _in_subtree(_subtree_prefix(task)))
+        ).one()
+        return {"task_id": task.id, "total": total, "completed": completed}
+
+    def get_history(self, db: Session, user: User, task_id: int, limit: int,
+                    before_version: Optional[int] = None) -> List[TaskHistory]:
+        """History of a task, newest first. Works for deleted tasks too."""
+        entries = self.history.get_history(db, user, task_id, limit, before_version)
+        if not entries and before_version is None:
+            self.get_task(db, user, task_id) # 404 unless the task predates its history
+        return entries
+
+    def get_archived_tasks(self, db: Session, user: User) -> List[TaskArchive]:
+        return db.exec(select(TaskArchive).where(TaskArchive.user_id == user.id)).all()
 
     def get_task(self, db: Session, user: User, task_id: int) -> Task:
-        task = db.get(Task, task_id)
+        if db.identity_key(Task, task_id) in db.identity_map:
+            task = db.get(Task, task_id) # Already loaded in this session, no query
+        else:
+            task = db.exec(_TASK_BY_ID, params={"task_id": task_id}).first()
         if not task or task.user_id != user.id:
             raise HTTPException(status_code=404, detail="Task not found")
         return task
 
+    def _last_position(self, db: Session, user: User) -> Optional[str]:
+        return db.exec(select(func.max(Task.position)).where(Task.user_id == user.id)).first()
+
+    def _child_path(self, parent: Optional[Task]) -> str:
+        if parent is None:
+            return "/"
+        path = _subtree_prefix(parent)
+        if len(path) > MAX_PATH_LENGTH:
+            raise HTTPException(status_code=400, detail="Task tree is too deep")
+        return path
+
     def create_task(self, db: Session, user: User, task_data: dict) -> Task:
-        task = Task(**task_data, user_id=user.id)
+        parent_id = task_data.get("parent_id")
+        parent = self.get_task(db, user, parent_id) if parent_id is not None else None
+        task = Task(
+            **task_data,
+            user_id=user.id,
+            position=key_between(self._last_position(db, user), None),
+            path=self._child_path(parent),
+        )
         db.add(task)
+        db.flush()
+        changes = {key: value for key, value in task_data.items() if value is not None}
+        self.history.add(db, [self.history.entry(task, "create", changes, task.created_at)])
         db.commit()
+        self.cache.invalidate(user.id)
         db.refresh(task)
         return task
 
     def update_task(self, db: Session, user: User, task_id: int, task_data: dict) -> Task:
         task = self.get_task(db, user, task_id)
+        changes = self.history.diff(task, task_data)
         for key, value in task_data.items():
             setattr(task, key, value)
+        if "remind_at" in task_data:
+            task.reminded_at = None # Re-arm the reminder
+        task.updated_at = datetime.datetime.utcnow()
+        if changes:
+            task.version += 1
+            self.history.add(db, [self.history.entry(task, "update", changes, task.updated_at)])
+        db.add(task)
+        db.commit()
+        self.cache.invalidate(user.id)
+        db.refresh(task)
+        return task
+
+    def move_task(self, db: Session, user: User, task_id: int, move_data: dict) -> Task:
+        """
+        Move a task in the list and/or under another parent.
+
+        With "after_id" (or without "parent_id") the task is placed right
+        after that task, or at the top when None. With "parent_id" the task
+        and all its subtasks move under that parent (top level when None).
+        """
+        task = self.get_task(db, user, task_id)
+        before = {"parent_id": task.parent_id, "position": task.position}
+        if "parent_id" in move_data:
+            self._reparent(db, user, task, move_data["parent_id"])
+        if "after_id" in move_data or "parent_id" not in move_data:
+            self._reposition(db, user, task, move_data.get("after_id"))
+
         task.updated_at = datetime.datetime.utcnow()
+        changes = {key: [old, getattr(task, key)] for key, old in before.items() if getattr(task, key) != old}
+        if changes:
+            task.version += 1
+            self.history.add(db, [self.history.entry(task, "move", changes, task.updated_at)])
         db.add(task)
         db.commit()
+        self.cache.invalidate(user.id)
         db.refresh(task)
+        self.positions.check(db.get_bind(), user.id, task.position)
         return task
 
+    def _reparent(self, db: Session, user: User, task: Task, parent_id: Optional[int]) -> None:
+        """
+        Move the subtree under a new parent: one UPDATE rewrites the path
+        prefix of every descendant, whatever the size of the subtree.
+        """
+        old_prefix = _subtree_prefix(task)
+        parent = None
+        if parent_id is not None:
+            parent = self.get_task(db, user, parent_id)
+            if parent.id == task.id or parent.path.startswith(old_prefix):
+                raise HTTPException(status_code=400, detail="Cannot move a task under itself or its subtasks")
+        new_path = self._child_path(parent)
+        if new_path == task.path:
+            return
+        new_prefix = f"{new_path}{task.id}/"
+
+        deepest = db.exec(
+            select(func.max(func.length(Task.path))).where(Task.user_id == user.id, _in_subtree(old_prefix))
+        ).first()
+        if deepest is not None and deepest - len(old_prefix) + len(new_prefix) > MAX_PATH_LENGTH:
+            raise HTTPException(status_code=400, detail="Task tree is too deep")
+        db.execute(
+            update_(Task)
+            .where(Task.user_id == user.id, _in_subtree(old_prefix))
+            .values(path=literal(new_prefix) + func.substr(Task.path, len(old_prefix) + 1))
+            .execution_options(synchronize_session=False)
+        )
+        task.parent_id = parent_id
+        task.path = new_path
+
+    def _reposition(self, db: Session, user: User, task: Task, after_id: Optional[int]) -> None:
+        """
+        Place the task right after task `after_id` (or at the top when None).
+
+        Only the moved row is updated: it gets a key between its new
+        neighbours. Keys that grow too long are shortened in the background.
+        """
+        after_key = None
+        if after_id is not None:
+            if after_id == task.id:
+                raise HTTPException(status_code=400, detail="Cannot move a task after itself")
+            after_key = self.get_task(db, user, after_id).position
+            if after_key is None:
+                raise HTTPException(status_code=409, detail="Task order is being rebuilt, try again shortly")
+
+        statement = select(Task.position).where(
+            Task.user_id == user.id, Task.id != task.id, Task.position.is_not(None)
+        )
+        if after_key is not None:
+            statement = statement.where(Task.position > after_key)
+        before_key = db.exec(statement.order_by(Task.position).limit(1)).first()
+
+        task.position = key_between(after_key, before_key)
+
+    def set_subtree_completed(self, db: Session, user: User, task_id: int, completed: bool) -> dict:
+        """Mark a task and all its descendants (in)complete with one UPDATE. Returns the new rollup."""
+        task = self.get_task(db, user, task_id)
+        now = datetime.datetime.utcnow()
+        changed = and_(
+            Task.user_id == user.id,
+            or_(Task.id == task.id, _in_subtree(_subtree_prefix(task))),
+            Task.completed != completed,
+        )
+        self.history.add_from_select(db, changed, "update", {"completed": [not completed, completed]}, now)
+        db.execute(
+            update_(Task)
+            .where(changed)
+            .values(completed=completed, updated_at=now, version=Task.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        self.cache.invalidate(user.id)
+        return self.get_rollup(db, user, task_id)
+
     def delete_task(self, db: Session, user: User, task_id: int):
+        """Delete a task together with its subtasks."""
         task = self.get_task(db, user, task_id)
-        db.delete(task)
+        subtree = and_(Task.user_id == user.id, or_(Task.id == task.id, _in_subtree(_subtree_prefix(task))))
+        self.tags.unlink_tasks(db, select(Task.id).where(subtree))
+        self.history.add_from_select(db, subtree, "delete", {}, datetime.datetime.utcnow())
+        db.execute(delete_(Task).where(subtree))
+        db.commit()
+        self.cache.invalidate(user.id)
+
+    def apply_batch(self, db: Session, user: User, create: List[dict], update: List[dict], delete: List[int]) -> dict:
+        """
+        Apply creates, updates and deletes in a single transaction.
+
+        All referenced tasks (including parents of new tasks) are loaded with
+        one query and must belong to the
+        user, otherwise nothing is changed. Responses are built before the
+        commit so no per-row refresh is needed afterwards.
+        """
+        parent_ids = {item["parent_id"] for item in create if item.get("parent_id") is not None}
+        ids = {item["id"] for item in update} | set(delete) | parent_ids
+        existing = {}
+        if ids:
+            existing = {
+                task.id: task
+                for task in db.exec(
+                    select(Task).where(Task.user_id == user.id, Task.id.in_(ids)).options(selectinload(Task.tags))
+                ).all()
+            }
+            missing = ids - existing.keys()
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Tasks not found: {sorted(missing)}")
+
+        now = datetime.datetime.utcnow()
+        positions = keys_between(self._last_position(db, user), None, len(create))
+        created = [
+            Task(
+                **task_data,
+                user_id=user.id,
+                created_at=now,
+                updated_at=now,
+                position=position,
+                path=self._child_path(existing.get(task_data.get("parent_id"))),
+            )
+            for task_data, position in zip(create, positions)
+        ]
+        db.add_all(created)
+
+        updated, changes = [], {}
+        for item in update:
+            task = existing[item["id"]]
+            data = {key: value for key, value in item.items() if key != "id"}
+            diff = self.history.diff(task, data)
+            for key, value in data.items():
+                setattr(task, key, value)
+            if "remind_at" in item:
+                task.reminded_at = None
+            task.updated_at = now
+            if diff:
+                task.version += 1
+                changes[task.id] = diff
+            updated.append(task)
+        db.add_all(updated)
+
+        deleted = []
+        if delete:
+            # Deleting a task deletes its subtasks too
+            roots = [existing[task_id] for task_id in set(delete)]
+            doomed = and_(
+                Task.user_id == user.id,
+                or_(Task.id.in_(delete), *[_in_subtree(_subtree_prefix(task)) for task in roots]),
+            )
+            deleted = db.exec(select(Task.id).where(doomed).order_by(Task.id)).all()
+            self.tags.unlink_tasks(db, select(Task.id).where(doomed))
+            self.history.add_from_select(db, doomed, "delete", {}, now)
+            db.execute(delete_(Task).where(doomed))
+
+        db.flush()
+        # One executemany for the history of every created and updated task
+        self.history.add(
+            db,
+            [
+                self.history.entry(task, "create", {k: v for k, v in data.items() if v is not None}, now)
+                for task, data in zip(created, create)
+            ]
+            + [self.history.entry(task, "update", changes[task.id], now) for task in updated if task.id in changes],
+        )
+        for task in created:
+            set_committed_value(task, "tags", [])
+        result = {
+            "created": [TaskResponse.model_validate(task) for task in created],
+            "updated": [TaskResponse.model_validate(task) for task in updated],
+            "deleted": deleted,
+        }
         db.commit()
+        self.cache.invalidate(user.id)
+        return result
 
-task_service = TaskService()
+task_service = TaskService(
+    task_list_cache,
+    SingleFlight(timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS),
+    position_service,
+    tag_service,
+    history_service,
+)
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.api import deps
+from backend.core.database import DatabaseRouter
+from backend.core.security import create_access_token
+
+
+def _sqlite_file(path, name):
+    """A SQLite database that answers "which database am I" with name."""
+    url = f"sqlite:///{path / name}.db"
+    router = DatabaseRouter(url)
+    with router.primary.begin() as connection:
+        connection.execute(text("CREATE TABLE whoami (name TEXT)"))
+        connection.execute(text("INSERT INTO whoami VALUES (:name)"), {"name": name})
+    router.primary.dispose()
+    return url
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    """Client for an app with one read route, served through a primary and a replica file."""
+
+    def make(replica_url=None, sticky_seconds=5.0):
+        router = DatabaseRouter(
+            _sqlite_file(tmp_path, "primary"),
+            replica_urls=[replica_url or _sqlite_file(tmp_path, "replica")],
+            sticky_seconds=sticky_seconds,
+        )
+        monkeypatch.setattr(deps, "db_router", router)
+        app = FastAPI()
+
+        @app.get("/whoami")
+        def whoami(db=Depends(deps.get_read_db)):
+            return db.execute(text("SELECT name FROM whoami")).scalar_one()
+
+        client = TestClient(app)
+        client.headers["Authorization"] = f"Bearer {create_access_token(1)}"
+        return client, router
+
+    return make
+
+
+def test_reads_go_to_the_replica(make_client):
+    client, _ = make_client()
+
+    assert client.get("/whoami").json() == "replica"
+
+
+def test_last_write_cookie_pins_reads_to_the_primary(make_client):
+    client, _ = make_client()
+
+    # Another worker served the write, so only the cookie knows about it
+    client.cookies.set(deps.LAST_WRITE_COOKIE, f"{time.time():.3f}")
+    assert client.get("/whoami").json() == "primary"
+
+
+def test_replica_is_used_again_after_the_sticky_window(make_client):
+    client, router = make_client(sticky_seconds=0.2)
+
+    client.cookies.set(deps.LAST_WRITE_COOKIE, f"{time.time():.3f}")
+    router.mark_write(1)
+    assert client.get("/whoami").json() == "primary"
+
+    time.sleep(0.3)
+    assert client.get("/whoami").json() == "replica"
+
+
+def test_reads_fall_back_to_the_primary_when_the_replica_is_down(make_client, tmp_path):
+    # SQLite cannot open a file in a directory that does not exist
+    client, router = make_client(replica_url=f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+
+    assert client.get("/whoami").json() == "primary"
+    assert client.get("/whoami").json() == "primary"
+    assert router._next_replica() is None  # Skipped until retry_seconds have passed
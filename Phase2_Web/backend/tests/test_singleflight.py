@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from backend.core.singleflight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+
+def _wait_for_waiters(flight, key, count):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters >= count:
+                return
+        time.sleep(0.001)
+    raise AssertionError("waiters never joined the call")
+
+
+def test_concurrent_calls_execute_once():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return b"tasks"
+
+    def worker():
+        results.append(flight.do("user:1", fn))
+
+    threads = threading.Thread(target=_run_concurrently, args=(10, worker))
+    threads.start()
+    _wait_for_waiters(flight, "user:1", 9)
+    release.set()
+    threads.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == [b"tasks"] * 10
+    assert flight.executions == 1
+    assert flight.coalesced == 9
+    assert flight.in_flight() == 0
+
+
+def test_leader_error_propagates_to_waiters():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    errors = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        raise ValueError("database down")
+
+    def worker():
+        try:
+            flight.do("user:1", fn)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = threading.Thread(target=_run_concurrently, args=(5, worker))
+    threads.start()
+    _wait_for_waiters(flight, "user:1", 4)
+    release.set()
+    threads.join(timeout=5)
+
+    assert len(calls) == 1
+    assert len(errors) == 5
+    assert len({id(e) for e in errors}) == 1
+
+
+def test_cancelled_leader_lets_waiters_run_fn():
+    class Cancelled(BaseException):
+        pass
+
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def leader_fn():
+        calls.append("leader")
+        release.wait(5)
+        raise Cancelled()
+
+    def waiter_fn():
+        calls.append("waiter")
+        return b"tasks"
+
+    def leader():
+        with pytest.raises(Cancelled):
+            flight.do("user:1", leader_fn)
+
+    def waiter():
+        results.append(flight.do("user:1", waiter_fn))
+
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    waiters = threading.Thread(target=_run_concurrently, args=(3, waiter))
+    waiters.start()
+    _wait_for_waiters(flight, "user:1", 3)
+    release.set()
+    leader_thread.join(timeout=5)
+    waiters.join(timeout=5)
+
+    assert calls.count("leader") == 1
+    assert calls.count("waiter") == 3
+    assert results == [b"tasks"] * 3
+
+
+def test_waiter_timeout_runs_fn():
+    flight = SingleFlight(timeout=0.01)
+    release = threading.Event()
+
+    leader = threading.Thread(target=flight.do, args=("user:1", lambda: release.wait(5)))
+    leader.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+
+    assert flight.do("user:1", lambda: b"fresh") == b"fresh"
+    release.set()
+    leader.join(timeout=5)
@@ -21,6 +21,7 @@ async function request<T>(endpoint: string, options: RequestInit = {}): Promise<
     const response = await fetch(`${API_URL}${endpoint}`, {
       ...options,
       headers,
+      credentials: 'include', // Sends the API's last_write cookie, which keeps reads after a write on the primary
     });
 
     if (!response.ok) {
@@ -0,0 +1,212 @@
+"""
+Stress test and reader-scaling benchmark for ConcurrentTodoManager.
+
+Run from the project directory (after `pip install -e .`, or with
+PYTHONPATH=src):
+
+    python benchmarks/concurrent_manager.py stress
+    python benchmarks/concurrent_manager.py bench --readers 1 2 4 8
+
+`stress` exits non-zero if any guarantee is broken; `bench` prints reads per
+second with one writer running next to a growing number of readers.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from typing import Callable, List
+
+from hackathon_todo.concurrent_manager import ConcurrentTodoManager
+from hackathon_todo.todo_manager import TodoManager
+
+
+# BENCH-1: Stress Test
+def stress(threads: int, tasks_per_thread: int) -> List[str]:
+    """
+    Hammer one manager from many threads and check its guarantees.
+
+    Writers mix add_task, add_tasks, toggles and deletes; readers check every
+    snapshot while they run.
+
+    Args:
+        threads: Number of writer threads (as many readers run next to them)
+        tasks_per_thread: Tasks each writer adds
+
+    Returns:
+        Descriptions of every broken guarantee (empty on success)
+    """
+    manager = ConcurrentTodoManager()
+    failures: List[str] = []
+    added: List[List[int]] = [[] for _ in range(threads)]
+    start = threading.Barrier(threads * 2)
+    writers_done = threading.Event()
+
+    def writer(index: int) -> None:
+        start.wait()
+        ids = added[index]
+        while len(ids) < tasks_per_thread:
+            if len(ids) % 10 == 0 and tasks_per_thread - len(ids) >= 5:
+                new_ids = manager.add_tasks((f"w{index} batch", "") for _ in range(5))
+                manager.set_completed(new_ids)
+            else:
+                new_ids = [manager.add_task(f"w{index} task")]
+                manager.toggle_complete(new_ids[0])
+            ids.extend(new_ids)
+        # Delete and re-add a few so IDs keep being allocated after deletes
+        manager.delete_tasks(ids[:3])
+        ids[:3] = [manager.add_task(f"w{index} re-add") for _ in range(3)]
+        manager.set_completed(ids[:3])
+
+    def reader() -> None:
+        start.wait()
+        while not writers_done.is_set():
+            snapshot = manager.get_all_tasks()
+            snapshot_ids = [task.id for task in snapshot]
+            if len(snapshot_ids) != len(set(snapshot_ids)):
+                failures.append("snapshot contains duplicate IDs")
+                return
+            # Tasks a reader holds must never change underneath it
+            seen = [(task, task.completed) for task in snapshot[-20:]]
+            time.sleep(0)
+            if any(task.completed != completed for task, completed in seen):
+                failures.append("a task held by a reader was mutated in place")
+                return
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    readers = [threading.Thread(target=reader) for _ in range(threads)]
+    for thread in workers + readers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    writers_done.set()
+    for thread in readers:
+        thread.join()
+
+    all_ids = [task_id for ids in added for task_id in ids]
+    if len(all_ids) != len(set(all_ids)):
+        failures.append(f"{len(all_ids) - len(set(all_ids))} duplicate IDs were handed out")
+    expected = threads * tasks_per_thread
+    stored = manager.get_all_tasks()
+    if len(stored) != expected:
+        failures.append(f"{len(stored)} tasks stored, expected {expected}")
+    if sorted(task.id for task in stored) != sorted(all_ids):
+        failures.append("stored task IDs differ from the IDs returned to writers")
+    for task in stored:
+        if not task.completed:
+            failures.append(f"task {task.id} lost its completion toggle")
+            break
+    return failures
+
+
+# BENCH-2: Reader Scaling Benchmark
+class LockedTodoManager(TodoManager):
+    """Baseline: one lock around every read and write."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.RLock()  # Base methods call get_task
+
+    def add_task(self, title: str, description: str = "") -> int:
+        with self._lock:
+            return super().add_task(title, description)
+
+    def toggle_complete(self, task_id: int) -> bool:
+        with self._lock:
+            return super().toggle_complete(task_id)
+
+    def get_all_tasks(self):
+        with self._lock:
+            return super().get_all_tasks()
+
+    def get_task(self, task_id: int):
+        with self._lock:
+            return super().get_task(task_id)
+
+
+def reads_per_second(factory: Callable[[], TodoManager], readers: int, tasks: int, seconds: float) -> float:
+    """
+    Measure reads per second with `readers` threads and one writer.
+
+    Each read is a get_task plus, every 10th time, a get_all_tasks; the
+    writer toggles a task every millisecond so snapshots keep being rebuilt.
+
+    Args:
+        factory: Builds the manager under test
+        readers: Number of reader threads
+        tasks: Tasks loaded before measuring
+        seconds: Measurement duration
+
+    Returns:
+        Total reads per second across all readers
+    """
+    manager = factory()
+    for i in range(tasks):
+        manager.add_task(f"task {i}")
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def reader(index: int) -> None:
+        count = 0
+        task_id = index
+        while not stop.is_set():
+            manager.get_task(task_id % tasks + 1)
+            if count % 10 == 0:
+                manager.get_all_tasks()
+            task_id += 7
+            count += 1
+        counts[index] = count
+
+    def writer() -> None:
+        task_id = 0
+        while not stop.is_set():
+            manager.toggle_complete(task_id % tasks + 1)
+            task_id += 1
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stress_parser = subparsers.add_parser("stress", help="Check thread-safety guarantees")
+    stress_parser.add_argument("--threads", type=int, default=8)
+    stress_parser.add_argument("--tasks", type=int, default=2000, help="Tasks added per writer thread")
+    stress_parser.add_argument("--rounds", type=int, default=5)
+    bench_parser = subparsers.add_parser("bench", help="Measure read throughput as readers scale")
+    bench_parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8])
+    bench_parser.add_argument("--tasks", type=int, default=1000, help="Tasks loaded before measuring")
+    bench_parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "stress":
+        # Switch threads as often as possible to surface races
+        sys.setswitchinterval(1e-6)
+        for round_number in range(1, args.rounds + 1):
+            failures = stress(args.threads, args.tasks)
+            if failures:
+                for failure in failures:
+                    print(f"round {round_number}: {failure}")
+                return 1
+        print(f"ok: {args.rounds} rounds, {args.threads} writers x {args.tasks} tasks, {args.threads} readers")
+        return 0
+
+    print(f"{'readers':>7}  {'concurrent reads/s':>18}  {'locked reads/s':>14}")
+    for readers in args.readers:
+        concurrent = reads_per_second(ConcurrentTodoManager, readers, args.tasks, args.seconds)
+        locked = reads_per_second(LockedTodoManager, readers, args.tasks, args.seconds)
+        print(f"{readers:>7}  {concurrent:>18,.0f}  {locked:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
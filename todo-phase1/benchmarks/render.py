@@ -0,0 +1,82 @@
+"""
+Benchmark for rendering the task table with a large list.
+
+Run from the project directory (after `pip install -e .`, or with
+PYTHONPATH=src):
+
+    python benchmarks/render.py
+    python benchmarks/render.py --tasks 10000 --repeat 20
+
+Output goes to /dev/null, so the figures are the cost of formatting and
+writing, not of a terminal drawing the text. Prints the best time of
+--repeat runs for printing the table line by line (the old display path),
+writing the full table in one call, and writing one page.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+from hackathon_todo.todo_manager import Task, TodoManager
+from hackathon_todo.ui import TABLE_HEADER, TABLE_RULE, TodoUI, format_task_row
+
+
+def print_per_line(tasks: List[Task]) -> None:
+    """Render the table the way display_tasks did before it was buffered."""
+    print("\n" + TABLE_RULE)
+    print(TABLE_HEADER)
+    print(TABLE_RULE)
+    for task in tasks:
+        print(format_task_row(task))
+    print(TABLE_RULE)
+    print(f"Total tasks: {len(tasks)}")
+
+
+def best_ms(fn: Callable[[], None], repeat: int) -> float:
+    """
+    Run fn `repeat` times with stdout on /dev/null.
+
+    Returns:
+        The fastest run in milliseconds
+    """
+    times = []
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                sys.stdout.flush()
+                times.append((time.perf_counter() - start) * 1000)
+        finally:
+            sys.stdout = stdout
+    return min(times)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant (best is reported)")
+    args = parser.parse_args(argv)
+
+    manager = TodoManager()
+    manager.add_tasks((f"Task number {i} with a longish title", f"Description of task {i}")
+                      for i in range(args.tasks))
+    tasks = manager.get_all_tasks()
+    ui = TodoUI(manager)
+
+    print(f"{'variant':<22}  {'ms':>9}")
+    for name, fn in [
+        ("per-line print", lambda: print_per_line(tasks)),
+        ("buffered full table", lambda: ui.display_tasks(tasks)),
+        ("one page", lambda: ui.display_page(tasks, 0)),
+    ]:
+        print(f"{name:<22}  {best_ms(fn, args.repeat):>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Non-interactive command line interface for the Hackathon Todo App.
+Provides scripted subcommands and a batch mode for bulk loads.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from typing import IO, Iterator, List, Optional, Tuple
+
+from .todo_manager import TodoManager
+from .ui import TodoUI
+
+
+BATCH_FORMATS = ("csv", "ndjson")
+BATCH_OPS = ("add", "done", "undone", "update", "delete")
+
+
+# CLI-1: Argument Parser
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the scripted subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="hackathon-todo",
+        description="Todo Manager. Run without arguments for the interactive menu."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = subparsers.add_parser("add", help="Add one or more tasks")
+    add_parser.add_argument("titles", nargs="+", help="Task title(s)")
+    add_parser.add_argument(
+        "-d", "--description", default="",
+        help="Description applied to every added task"
+    )
+    add_parser.add_argument("--list", action="store_true", help="List tasks afterwards")
+
+    subparsers.add_parser("list", help="List all tasks")
+
+    done_parser = subparsers.add_parser("done", help="Mark tasks as complete")
+    done_parser.add_argument("ids", nargs="+", type=int, help="Task ID(s)")
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="Apply tasks or commands from a CSV/NDJSON file or stdin"
+    )
+    batch_parser.add_argument(
+        "file", nargs="?", default="-",
+        help="Input file (default: '-' for stdin)"
+    )
+    batch_parser.add_argument(
+        "--format", choices=BATCH_FORMATS,
+        help="Input format (default: from file extension, else ndjson)"
+    )
+    batch_parser.add_argument("--list", action="store_true", help="List tasks afterwards")
+
+    return parser
+
+
+# CLI-2: Batch Input Parsing
+def detect_format(path: str, explicit: Optional[str] = None) -> str:
+    """
+    Decide the batch input format.
+
+    Args:
+        path: Input path ('-' for stdin)
+        explicit: Format given on the command line, if any
+
+    Returns:
+        Either 'csv' or 'ndjson'
+    """
+    if explicit:
+        return explicit
+    if path.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Parse batch records from a stream.
+
+    CSV input needs a header row with at least a 'title' column; an 'op'
+    column, if present, selects the operation per row. NDJSON input has one
+    JSON object per line; blank lines are skipped. Records without an 'op'
+    are treated as 'add'.
+
+    Args:
+        stream: Text stream to read from
+        fmt: Either 'csv' or 'ndjson'
+
+    Yields:
+        (line_number, record) pairs
+
+    Raises:
+        ValueError: If a line cannot be parsed
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e.msg})") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number}: expected a JSON object")
+        yield line_number, record
+
+
+# CLI-3: Batch Application
+def _text_field(record: dict, name: str, line_number: int) -> Optional[str]:
+    """
+    Return a record's text field, or None if it is missing or null.
+
+    Raises:
+        ValueError: If the value is not a string
+    """
+    value = record.get(name)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"Line {line_number}: '{name}' must be a string")
+    return value
+
+
+def apply_batch(manager: TodoManager, records: Iterator[Tuple[int, dict]]) -> List[str]:
+    """
+    Apply parsed batch records to the manager.
+
+    Consecutive 'add' records are collected and stored with a single
+    TodoManager.add_tasks call, so they are validated in one pass. Other
+    operations flush pending adds first, which keeps IDs predictable for
+    records that refer to tasks created earlier in the same batch.
+
+    Args:
+        manager: The TodoManager to apply records to
+        records: (line_number, record) pairs from read_records
+
+    Returns:
+        Output lines describing problems and a final summary
+
+    Raises:
+        ValueError: If a record is malformed or fails validation
+    """
+    output: List[str] = []
+    counts = {op: 0 for op in BATCH_OPS}
+    pending: List[Tuple[str, str]] = []
+    pending_lines: List[int] = []
+
+    def flush() -> None:
+        if not pending:
+            return
+        try:
+            manager.add_tasks(pending)
+        except ValueError as e:
+            # Map "Item N" back to the input line for a useful message
+            message = str(e)
+            if message.startswith("Item "):
+                position, _, detail = message[5:].partition(": ")
+                message = f"Line {pending_lines[int(position) - 1]}: {detail}"
+            raise ValueError(message) from None
+        counts["add"] += len(pending)
+        pending.clear()
+        pending_lines.clear()
+
+    for line_number, record in records:
+        op = str(record.get("op", "add")).strip().lower()
+        if op not in BATCH_OPS:
+            raise ValueError(f"Line {line_number}: unknown op '{op}'")
+
+        if op == "add":
+            title = _text_field(record, "title", line_number)
+            description = _text_field(record, "description", line_number)
+            pending.append((title or "", description or ""))
+            pending_lines.append(line_number)
+            continue
+
+        flush()
+        try:
+            task_id = int(record["id"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Line {line_number}: '{op}' needs a numeric 'id'") from None
+
+        if op in ("done", "undone"):
+            found = not manager.set_completed([task_id], completed=(op == "done"))
+        elif op == "update":
+            title = _text_field(record, "title", line_number)
+            description = _text_field(record, "description", line_number)
+            try:
+                found = manager.update_task(task_id, title, description)
+            except ValueError as e:
+                raise ValueError(f"Line {line_number}: {e}") from None
+        else:
+            found = manager.delete_task(task_id)
+
+        if found:
+            counts[op] += 1
+        else:
+            output.append(f"Warning: line {line_number}: task {task_id} not found")
+
+    flush()
+
+    summary = ", ".join(f"{op} {count}" for op, count in counts.items() if count)
+    output.append(f"Batch complete: {summary or 'nothing to do'}")
+    return output
+
+
+# CLI-4: Command Dispatch
+def run_command(manager: TodoManager, args: argparse.Namespace) -> Tuple[int, List[str]]:
+    """
+    Execute a parsed subcommand.
+
+    Args:
+        manager: The TodoManager to operate on
+        args: Parsed command line arguments
+
+    Returns:
+        (exit_code, output_lines)
+    """
+    output: List[str] = []
+
+    if args.command == "add":
+        try:
+            task_ids = manager.add_tasks((title, args.description) for title in args.titles)
+        except ValueError as e:
+            return 1, [f"Error: {e}"]
+        output.extend(f"Task added with ID: {task_id}" for task_id in task_ids)
+
+    elif args.command == "done":
+        missing = manager.set_completed(args.ids)
+        output.extend(f"Error: Task with ID {task_id} not found." for task_id in missing)
+        done = len(args.ids) - len(missing)
+        if done:
+            output.append(f"Marked {done} task(s) as completed.")
+        if missing:
+            return 1, output
+
+    elif args.command == "batch":
+        fmt = detect_format(args.file, args.format)
+        try:
+            if args.file == "-":
+                output.extend(apply_batch(manager, read_records(sys.stdin, fmt)))
+            else:
+                with open(args.file, newline="", encoding="utf-8") as stream:
+                    output.extend(apply_batch(manager, read_records(stream, fmt)))
+        except OSError as e:
+            return 1, [f"Error: {e}"]
+        except ValueError as e:
+            return 1, [f"Error: {e}"]
+
+    return 0, output
+
+
+# CLI-5: Entry Point
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a scripted subcommand and write its output in one buffered write.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    manager = TodoManager()
+
+    exit_code, output = run_command(manager, args)
+    stream = sys.stderr if exit_code else sys.stdout
+    if output:
+        stream.write("\n".join(output) + "\n")
+
+    if exit_code == 0 and (args.command == "list" or getattr(args, "list", False)):
+        TodoUI(manager).display_tasks(manager.get_all_tasks())
+
+    return exit_code
@@ -0,0 +1,147 @@
+"""
+Thread-safe variant of the todo task manager.
+Lets importers and readers share one TodoManager from a thread pool.
+"""
+
+import threading
+from dataclasses import replace
+from typing import Iterable, List, Optional, Tuple
+
+from .journal import ChangeJournal
+from .todo_manager import Task, TodoManager
+
+
+class ConcurrentTodoManager(TodoManager):
+    """
+    TodoManager that can be shared between threads.
+
+    Writers are serialized by a single lock, which also makes ID allocation
+    atomic. Readers never take the lock on the fast path:
+
+    - get_task is a single dictionary lookup.
+    - get_all_tasks returns a cached snapshot that is rebuilt (under the
+      lock) only after a write has invalidated it.
+
+    Stored tasks are never mutated in place. A write replaces the task with an
+    updated copy, so a Task a reader already holds never changes underneath it.
+    """
+
+    # CONC-1: Initialize Locking and Snapshot State
+    def __init__(self, journal: Optional[ChangeJournal] = None):
+        """
+        Initialize empty storage, the writer lock and the snapshot cache.
+
+        Args:
+            journal: Optional change journal; its listeners run under the writer lock
+        """
+        super().__init__(journal)
+        self._write_lock = threading.Lock()
+        self._snapshot: Optional[Tuple[Task, ...]] = None
+
+    # CONC-2: Copy-on-Write Helpers
+    def _detach(self, task_id: int) -> None:
+        """Replace a stored task with a private copy before it is modified."""
+        task = self._tasks.get(task_id)
+        if task is not None:
+            self._tasks[task_id] = replace(task)
+
+    def _invalidate(self) -> None:
+        """Drop the cached snapshot after a write."""
+        self._snapshot = None
+
+    # CONC-3: Serialized Writes
+    def add_task(self, title: str, description: str = "") -> int:
+        """Add a task; see TodoManager.add_task."""
+        with self._write_lock:
+            task_id = super().add_task(title, description)
+            self._invalidate()
+            return task_id
+
+    def add_tasks(self, items: Iterable[Tuple[str, str]]) -> List[int]:
+        """Add many tasks atomically; see TodoManager.add_tasks."""
+        # Materialize outside the lock so slow input never blocks other writers
+        items = list(items)
+        with self._write_lock:
+            task_ids = super().add_tasks(items)
+            self._invalidate()
+            return task_ids
+
+    def update_task(
+        self,
+        task_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> bool:
+        """Update a task; see TodoManager.update_task."""
+        with self._write_lock:
+            self._detach(task_id)
+            updated = super().update_task(task_id, title, description)
+            self._invalidate()
+            return updated
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task; see TodoManager.delete_task."""
+        with self._write_lock:
+            deleted = super().delete_task(task_id)
+            self._invalidate()
+            return deleted
+
+    def toggle_complete(self, task_id: int) -> bool:
+        """Toggle a task's completion status; see TodoManager.toggle_complete."""
+        with self._write_lock:
+            self._detach(task_id)
+            toggled = super().toggle_complete(task_id)
+            self._invalidate()
+            return toggled
+
+    def set_completed(self, task_ids: Iterable[int], completed: bool = True) -> List[int]:
+        """Set completion status of many tasks; see TodoManager.set_completed."""
+        task_ids = list(task_ids)
+        with self._write_lock:
+            for task_id in task_ids:
+                self._detach(task_id)
+            missing = super().set_completed(task_ids, completed)
+            self._invalidate()
+            return missing
+
+    def delete_tasks(self, task_ids: Iterable[int]) -> List[int]:
+        """Delete many tasks; see TodoManager.delete_tasks."""
+        task_ids = list(task_ids)
+        with self._write_lock:
+            missing = super().delete_tasks(task_ids)
+            self._invalidate()
+            return missing
+
+    def undo(self) -> bool:
+        """Undo the last journaled operation; see TodoManager.undo."""
+        with self._write_lock:
+            undone = super().undo()
+            self._invalidate()
+            return undone
+
+    def redo(self) -> bool:
+        """Redo the last undone operation; see TodoManager.redo."""
+        with self._write_lock:
+            redone = super().redo()
+            self._invalidate()
+            return redone
+
+    # CONC-4: Lock-Free Reads
+    def get_all_tasks(self) -> List[Task]:
+        """
+        Get all tasks from the latest snapshot.
+
+        Returns:
+            List of all Task objects as of the most recent completed write
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._write_lock:
+                if self._snapshot is None:
+                    self._snapshot = tuple(self._tasks.values())
+                snapshot = self._snapshot
+        return list(snapshot)
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a task by its ID without locking; see TodoManager.get_task."""
+        return self._tasks.get(task_id)
@@ -0,0 +1,207 @@
+"""
+Bounded change journal for the todo task manager.
+Records compact task deltas for undo/redo and incremental syncing.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+# JRNL-1: Change Record
+@dataclass(frozen=True)
+class Change:
+    """
+    A single change to one task.
+
+    Only the fields that changed are stored. An 'add' has no before-state and
+    a 'delete' has no after-state; both carry the full task fields on the
+    other side so the change can be reversed.
+
+    Attributes:
+        seq: Position of the change in the journal's change stream
+        op: One of 'add', 'update' or 'delete'
+        task_id: ID of the affected task
+        before: Field values before the change (None for 'add')
+        after: Field values after the change (None for 'delete')
+    """
+    seq: int
+    op: str
+    task_id: int
+    before: Optional[Dict[str, Any]]
+    after: Optional[Dict[str, Any]]
+
+    def inverse(self) -> Tuple[str, int, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Return the (op, task_id, before, after) delta that reverses this change.
+
+        Returns:
+            The reversing delta, without a sequence number
+        """
+        op = {"add": "delete", "delete": "add"}.get(self.op, self.op)
+        return op, self.task_id, self.after, self.before
+
+
+ChangeListener = Callable[[Change], None]
+
+
+# JRNL-2: Change Journal
+class ChangeJournal:
+    """
+    Ring buffer of task changes with undo/redo stacks and subscribers.
+
+    Undo entries group the changes made by one TodoManager call (a bulk add
+    is a single entry). The undo history is capped at `capacity` entries and
+    the retained change stream at `stream_capacity` changes; older items are
+    dropped as new ones arrive.
+    """
+
+    def __init__(self, capacity: int = 100, stream_capacity: Optional[int] = None):
+        """
+        Initialize an empty journal.
+
+        Args:
+            capacity: Maximum number of undo (and redo) entries kept
+            stream_capacity: Maximum number of changes retained for
+                changes_since (defaults to capacity)
+
+        Raises:
+            ValueError: If either capacity is less than 1
+        """
+        if stream_capacity is None:
+            stream_capacity = capacity
+        if capacity < 1 or stream_capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = capacity
+        self._undo: Deque[Tuple[Change, ...]] = deque(maxlen=capacity)
+        self._redo: Deque[Tuple[Change, ...]] = deque(maxlen=capacity)
+        self._stream: Deque[Change] = deque(maxlen=stream_capacity)
+        self._listeners: List[ChangeListener] = []
+        self._next_seq: int = 1
+        self._unrecorded: int = 0
+
+    # JRNL-3: Recording
+    def emit(
+        self,
+        op: str,
+        task_id: int,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]]
+    ) -> Change:
+        """
+        Append a change to the stream and notify subscribers.
+
+        Does not touch the undo/redo stacks; see record for that.
+
+        Returns:
+            The recorded Change
+        """
+        change = Change(self._next_seq, op, task_id, before, after)
+        self._next_seq += 1
+        self._stream.append(change)
+        for listener in list(self._listeners):
+            listener(change)
+        return change
+
+    def record(self, changes: List[Change]) -> None:
+        """
+        Push a group of already-emitted changes as one undo entry.
+
+        A new entry clears the redo stack. Inside an unrecorded() block
+        nothing is pushed.
+
+        Args:
+            changes: Changes made by a single operation (ignored if empty)
+        """
+        if changes and not self._unrecorded:
+            self._undo.append(tuple(changes))
+            self._redo.clear()
+
+    @contextmanager
+    def unrecorded(self) -> Iterator[None]:
+        """
+        Keep changes made inside the block off the undo/redo stacks.
+
+        The changes are still emitted to the stream and subscribers. Used for
+        changes that did not originate from the user, such as ones pulled from
+        a remote, which undo must not revert.
+        """
+        self._unrecorded += 1
+        try:
+            yield
+        finally:
+            self._unrecorded -= 1
+
+    # JRNL-4: Undo/Redo Stacks
+    def pop_undo(self) -> Optional[Tuple[Change, ...]]:
+        """Pop the most recent undo entry (None if there is nothing to undo)."""
+        return self._undo.pop() if self._undo else None
+
+    def pop_redo(self) -> Optional[Tuple[Change, ...]]:
+        """Pop the most recent redo entry (None if there is nothing to redo)."""
+        return self._redo.pop() if self._redo else None
+
+    def push_undo(self, changes: Tuple[Change, ...]) -> None:
+        """Push an entry back onto the undo stack without clearing redo."""
+        self._undo.append(changes)
+
+    def push_redo(self, changes: Tuple[Change, ...]) -> None:
+        """Push an entry onto the redo stack."""
+        self._redo.append(changes)
+
+    def can_undo(self) -> bool:
+        """Return True if there is an operation to undo."""
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        """Return True if there is an operation to redo."""
+        return bool(self._redo)
+
+    # JRNL-5: Change Stream
+    def subscribe(self, listener: ChangeListener) -> Callable[[], None]:
+        """
+        Call listener with every future change, including undo/redo effects.
+
+        Args:
+            listener: Callable invoked synchronously with each Change
+
+        Returns:
+            A function that removes the subscription
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent change (0 if none yet)."""
+        return self._next_seq - 1
+
+    def changes_since(self, seq: int) -> Iterator[Change]:
+        """
+        Iterate over retained changes with a sequence number greater than seq.
+
+        Args:
+            seq: Last sequence number the caller has already seen
+
+        Yields:
+            Changes in order
+
+        Raises:
+            LookupError: If changes after seq have already been evicted, in
+                which case the caller must do a full resync
+        """
+        if self._stream and seq + 1 < self._stream[0].seq:
+            raise LookupError(f"Changes after seq {seq} are no longer retained")
+        for change in list(self._stream):
+            if change.seq > seq:
+                yield change
+
+    def __iter__(self) -> Iterator[Change]:
+        """Iterate over all retained changes in order."""
+        return iter(list(self._stream))
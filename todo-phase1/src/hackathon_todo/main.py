@@ -2,12 +2,19 @@
 Main entry point for the Hackathon Todo App.
 """
 
+import sys
+
 from .todo_manager import TodoManager
 from .ui import TodoUI
 
 
 def main():
     """Main application entry point."""
+    # INT-2: Scripted subcommands skip the interactive menu
+    if len(sys.argv) > 1:
+        from .cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
     # INT-1: Initialize components and run application
     manager = TodoManager()
     ui = TodoUI(manager)
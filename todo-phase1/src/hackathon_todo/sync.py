@@ -0,0 +1,396 @@
+"""
+Offline-first sync between the local TodoManager and the Phase II REST API.
+Queues local changes, pushes them in batches and pulls remote changes
+incrementally by updated_at watermark.
+"""
+
+import http.client
+import json
+import socket
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+from .journal import Change
+from .todo_manager import TodoManager
+
+
+# Task fields that exist on both sides
+SYNCED_FIELDS = ("title", "description", "completed")
+
+# Methods whose requests carry an Idempotency-Key, so a retry is not applied twice
+KEYED_METHODS = ("POST", "PATCH")
+
+CONFLICT_POLICIES = ("last_write_wins", "local_wins", "remote_wins")
+
+
+class SyncError(Exception):
+    """Raised when the remote API rejects a request or cannot be reached."""
+
+
+# SYNC-1: Pooled HTTP Client
+class HttpClient:
+    """
+    Minimal JSON client that reuses keep-alive connections to one host.
+
+    Idle connections are kept in a small pool and handed out again for the
+    next request, so a sync run does not pay a TCP/TLS handshake per call.
+    """
+
+    def __init__(self, base_url: str, token: Optional[str] = None,
+                 max_idle: int = 4, timeout: float = 10.0):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: API root, e.g. 'http://localhost:8000/api/v1'
+            token: Bearer token sent with every request
+            max_idle: Maximum number of idle connections kept open
+            timeout: Socket timeout in seconds
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError("Base URL must start with http:// or https://")
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self._netloc = parts.netloc
+        self._prefix = parts.path.rstrip("/")
+        self.token = token
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        if self._idle:
+            return self._idle.pop()
+        return self._connection_class(self._netloc, timeout=self.timeout)
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        if len(self._idle) < self.max_idle:
+            self._idle.append(connection)
+        else:
+            connection.close()
+
+    def request(self, method: str, path: str, body: Any = None,
+                params: Optional[Dict[str, str]] = None) -> Any:
+        """
+        Send a JSON request and return the decoded JSON response.
+
+        POST and PATCH requests carry an Idempotency-Key header. A request
+        that fails on a pooled connection (which the server may have closed
+        while it sat idle) is retried once on a fresh connection with the same
+        key. Timeouts are not retried: the server may still be processing
+        the request.
+
+        Raises:
+            SyncError: On connection failure or a non-2xx response
+        """
+        url = self._prefix + path
+        if params:
+            url += "?" + urlencode(params)
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if method in KEYED_METHODS:
+            headers["Idempotency-Key"] = uuid.uuid4().hex
+
+        for attempt in range(2):
+            pooled = bool(self._idle)
+            connection = self._acquire()
+            try:
+                connection.request(method, url, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                if attempt == 0 and pooled and not isinstance(e, socket.timeout):
+                    continue
+                raise SyncError(f"{method} {url} failed: {e}") from None
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+
+            if response.status >= 400:
+                raise SyncError(f"{method} {url} returned {response.status}: {data.decode('utf-8', 'replace')}")
+            return json.loads(data) if data else None
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while self._idle:
+            self._idle.pop().close()
+
+
+# SYNC-2: Outbox Entry
+@dataclass
+class PendingChange:
+    """
+    A coalesced local change waiting to be pushed.
+
+    Attributes:
+        op: 'add', 'update' or 'delete'
+        fields: Synced field values to send (empty for 'delete')
+        changed_at: UTC time of the latest local change, used for conflicts
+    """
+    op: str
+    fields: Dict[str, Any] = field(default_factory=dict)
+    changed_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class SyncResult:
+    """Counts from one sync run."""
+    pushed: int = 0
+    pulled: int = 0
+    conflicts: int = 0
+    skipped: int = 0
+
+
+# SYNC-3: Sync Engine
+class SyncEngine:
+    """
+    Keeps a TodoManager in step with one user's tasks on the REST API.
+
+    Local changes are captured from the manager's change journal into an
+    outbox, coalesced per task (an add followed by edits is sent as a single
+    create) and pushed through the batch endpoint. Remote changes are pulled
+    with ?updated_since=<watermark>, so each pull only transfers tasks that
+    changed since the previous one.
+
+    Remote deletions are not visible to an incremental pull; run
+    pull(full=True) periodically to drop local copies of deleted tasks.
+    """
+
+    def __init__(self, manager: TodoManager, client: HttpClient, user_id: int,
+                 batch_size: int = 100, conflict_policy: str = "last_write_wins"):
+        """
+        Initialize the engine and start capturing local changes.
+
+        Args:
+            manager: The TodoManager to sync (must have a journal)
+            client: HTTP client pointed at the API root
+            user_id: Remote user ID whose tasks are synced
+            batch_size: Maximum number of operations per push request
+            conflict_policy: One of CONFLICT_POLICIES
+
+        Raises:
+            ValueError: If the manager has no journal or the policy is unknown
+        """
+        if manager.journal is None:
+            raise ValueError("SyncEngine needs a TodoManager with a ChangeJournal")
+        if conflict_policy not in CONFLICT_POLICIES:
+            raise ValueError(f"Conflict policy must be one of {', '.join(CONFLICT_POLICIES)}")
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+
+        self.manager = manager
+        self.client = client
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.conflict_policy = conflict_policy
+        self.watermark: Optional[datetime] = None
+
+        self._outbox: Dict[int, PendingChange] = {}
+        self._local_to_remote: Dict[int, int] = {}
+        self._remote_to_local: Dict[int, int] = {}
+        self._applying_remote = False
+        # Tasks that exist before the engine subscribes are uploaded on the first push
+        for task in manager.get_all_tasks():
+            self._outbox[task.id] = PendingChange("add", self._synced_fields(task.id))
+        self._unsubscribe = manager.journal.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """Stop capturing local changes and close pooled connections."""
+        self._unsubscribe()
+        self.client.close()
+
+    @property
+    def pending(self) -> int:
+        """Number of tasks with local changes not yet pushed."""
+        return len(self._outbox)
+
+    # SYNC-4: Capture and Coalesce Local Changes
+    def _on_change(self, change: Change) -> None:
+        if self._applying_remote:
+            return
+
+        task_id = change.task_id
+        entry = self._outbox.get(task_id)
+
+        if change.op == "delete":
+            if entry is not None and entry.op == "add":
+                # Never reached the server, nothing to send
+                del self._outbox[task_id]
+            elif task_id in self._local_to_remote:
+                self._outbox[task_id] = PendingChange("delete")
+            return
+
+        fields = {key: value for key, value in (change.after or {}).items() if key in SYNCED_FIELDS}
+        if change.op == "add":
+            # A re-added task (undo of delete) that the server still has is an update
+            op = "update" if task_id in self._local_to_remote else "add"
+            self._outbox[task_id] = PendingChange(op, fields)
+        elif task_id not in self._local_to_remote and (entry is None or entry.op == "delete"):
+            # Edit of a task the server has never seen: send the whole task as a create
+            self._outbox[task_id] = PendingChange("add", self._synced_fields(task_id))
+        elif entry is None or entry.op == "delete":
+            self._outbox[task_id] = PendingChange("update", fields)
+        else:
+            entry.fields.update(fields)
+            entry.changed_at = datetime.utcnow()
+
+    # SYNC-5: Push
+    def push(self) -> int:
+        """
+        Send queued local changes to the server in batches.
+
+        Returns:
+            Number of tasks pushed
+
+        Raises:
+            SyncError: If a batch request fails (unsent changes stay queued)
+        """
+        pushed = 0
+        path = f"/{self.user_id}/tasks/batch"
+        items = list(self._outbox.items())
+
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start:start + self.batch_size]
+            creates = [(task_id, entry) for task_id, entry in chunk if entry.op == "add"]
+            batch = {
+                "create": [
+                    {
+                        "title": entry.fields.get("title", ""),
+                        "description": entry.fields.get("description"),
+                        "completed": entry.fields.get("completed", False),
+                    }
+                    for _, entry in creates
+                ],
+                "update": [
+                    dict(entry.fields, id=self._local_to_remote[task_id])
+                    for task_id, entry in chunk if entry.op == "update"
+                ],
+                "delete": [
+                    self._local_to_remote[task_id]
+                    for task_id, entry in chunk if entry.op == "delete"
+                ],
+            }
+            result = self.client.request("POST", path, body=batch)
+
+            for (task_id, _), remote in zip(creates, result["created"]):
+                self._link(task_id, remote["id"])
+            for task_id, entry in chunk:
+                if entry.op == "delete":
+                    self._unlink(task_id)
+                del self._outbox[task_id]
+            pushed += len(chunk)
+
+        return pushed
+
+    # SYNC-6: Pull
+    def pull(self, full: bool = False) -> SyncResult:
+        """
+        Fetch remote changes since the watermark and apply them locally.
+
+        Args:
+            full: Ignore the watermark, fetch every task and also drop local
+                copies of tasks deleted on the server
+
+        Returns:
+            Counts of applied, conflicting and skipped tasks
+        """
+        params = {}
+        if self.watermark is not None and not full:
+            params["updated_since"] = self.watermark.isoformat()
+        remote_tasks = self.client.request("GET", f"/{self.user_id}/tasks", params=params) or []
+
+        result = SyncResult()
+        self._applying_remote = True
+        try:
+            # Remote changes are not the user's to undo
+            with self.manager.journal.unrecorded():
+                for remote in remote_tasks:
+                    updated_at = datetime.fromisoformat(remote["updated_at"])
+                    if self.watermark is None or updated_at > self.watermark:
+                        self.watermark = updated_at
+                    self._apply_remote(remote, updated_at, result)
+
+                if full:
+                    seen = {remote["id"] for remote in remote_tasks}
+                    for remote_id in list(self._remote_to_local):
+                        if remote_id not in seen:
+                            local_id = self._remote_to_local[remote_id]
+                            self._unlink(local_id)
+                            self._outbox.pop(local_id, None)
+                            self.manager.delete_task(local_id)
+                            result.pulled += 1
+        finally:
+            self._applying_remote = False
+        return result
+
+    def _apply_remote(self, remote: Dict[str, Any], updated_at: datetime, result: SyncResult) -> None:
+        fields = {
+            "title": remote["title"],
+            "description": remote.get("description") or "",
+            "completed": bool(remote["completed"]),
+        }
+        local_id = self._remote_to_local.get(remote["id"])
+
+        if local_id is not None and local_id in self._outbox:
+            result.conflicts += 1
+            entry = self._outbox[local_id]
+            if self.conflict_policy == "local_wins" or (
+                self.conflict_policy == "last_write_wins" and entry.changed_at >= updated_at
+            ):
+                return
+            del self._outbox[local_id]
+
+        try:
+            if local_id is None or self.manager.get_task(local_id) is None:
+                if local_id is not None:
+                    self._unlink(local_id)
+                local_id = self.manager.add_task(fields["title"], fields["description"])
+                self._link(local_id, remote["id"])
+            else:
+                self.manager.update_task(local_id, fields["title"], fields["description"])
+            self.manager.set_completed([local_id], fields["completed"])
+        except ValueError:
+            # Remote data that breaks local validation (e.g. a 300-char title)
+            result.skipped += 1
+            return
+        result.pulled += 1
+
+    # SYNC-7: Full Round Trip
+    def sync(self) -> SyncResult:
+        """
+        Pull remote changes, then push local ones.
+
+        Pulling first lets conflicts be resolved before anything is sent.
+
+        Returns:
+            Combined counts for the run
+        """
+        result = self.pull()
+        result.pushed = self.push()
+        return result
+
+    def _synced_fields(self, task_id: int) -> Dict[str, Any]:
+        task = self.manager.get_task(task_id)
+        return {key: getattr(task, key) for key in SYNCED_FIELDS}
+
+    def _link(self, local_id: int, remote_id: int) -> None:
+        self._local_to_remote[local_id] = remote_id
+        self._remote_to_local[remote_id] = local_id
+
+    def _unlink(self, local_id: int) -> None:
+        remote_id = self._local_to_remote.pop(local_id, None)
+        if remote_id is not None:
+            self._remote_to_local.pop(remote_id, None)
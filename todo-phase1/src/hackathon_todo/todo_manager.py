@@ -3,9 +3,15 @@ Business logic layer for todo task management.
 Handles all CRUD operations and task storage.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .journal import ChangeJournal
+
+
+# Task fields captured by the change journal (everything except the ID)
+JOURNALED_FIELDS = ("title", "description", "completed", "created_at")
 
 
 # CORE-2: Task Data Model
@@ -33,15 +39,62 @@ class TodoManager:
     Manages todo tasks with in-memory storage.
     Provides CRUD operations for tasks.
 
-    Storage: Uses a list for in-memory task storage.
+    Storage: Uses an insertion-ordered dictionary keyed by task ID, so
+    lookups, updates and deletes are O(1) while listing keeps creation order.
     All operations maintain data integrity and validate inputs.
+
+    History: When constructed with a ChangeJournal, every mutation records a
+    compact delta that can be undone/redone and is published to the journal's
+    change stream. Without a journal no history is kept.
     """
 
     # CORE-3: Initialize TodoManager Storage
-    def __init__(self):
-        """Initialize the TodoManager with empty task storage."""
-        self._tasks: List[Task] = []
+    def __init__(self, journal: Optional[ChangeJournal] = None):
+        """
+        Initialize the TodoManager with empty task storage.
+
+        Args:
+            journal: Optional change journal for undo/redo and change streaming
+        """
+        self._tasks: Dict[int, Task] = {}
         self._next_id: int = 1
+        self.journal = journal
+
+    # CORE-4: Input Validation Helpers
+    @staticmethod
+    def _validate_title(title: str) -> str:
+        """
+        Validate and normalize a task title.
+
+        Returns:
+            The stripped title
+
+        Raises:
+            ValueError: If title is empty or too long
+        """
+        if not title or not title.strip():
+            raise ValueError("Title cannot be empty")
+
+        title = title.strip()
+        if len(title) > 200:
+            raise ValueError("Title cannot exceed 200 characters")
+        return title
+
+    @staticmethod
+    def _validate_description(description: str) -> str:
+        """
+        Validate and normalize a task description.
+
+        Returns:
+            The stripped description
+
+        Raises:
+            ValueError: If description exceeds max length
+        """
+        description = (description or "").strip()
+        if len(description) > 1000:
+            raise ValueError("Description cannot exceed 1000 characters")
+        return description
 
     # CRUD-1: Implement Add Task
     def add_task(self, title: str, description: str = "") -> int:
@@ -60,18 +113,9 @@ class TodoManager:
         Raises:
             ValueError: If title is empty, too long, or description exceeds max length
         """
-        # Validate title
-        if not title or not title.strip():
-            raise ValueError("Title cannot be empty")
-
-        title = title.strip()
-        if len(title) > 200:
-            raise ValueError("Title cannot exceed 200 characters")
-
-        # Validate description
-        description = description.strip()
-        if len(description) > 1000:
-            raise ValueError("Description cannot exceed 1000 characters")
+        # Validate inputs
+        title = self._validate_title(title)
+        description = self._validate_description(description)
 
         # Generate unique ID and create task
         task_id = self._next_id
@@ -84,11 +128,61 @@ class TodoManager:
         )
 
         # Store task and increment ID counter
-        self._tasks.append(task)
+        self._tasks[task_id] = task
         self._next_id += 1
 
+        if self.journal is not None:
+            self._record([("add", task_id, None, self._task_fields(task))])
+
         return task_id
 
+    # BULK-1: Implement Bulk Add
+    def add_tasks(self, items: Iterable[Tuple[str, str]]) -> List[int]:
+        """
+        Add many tasks at once.
+
+        All items are validated in a single pass before anything is stored,
+        so either every task is added or none is.
+
+        Args:
+            items: Iterable of (title, description) pairs
+
+        Returns:
+            The IDs of the newly created tasks, in input order
+
+        Raises:
+            ValueError: If any item is invalid (message includes its 1-based position)
+        """
+        validated = []
+        for position, (title, description) in enumerate(items, start=1):
+            try:
+                validated.append(
+                    (self._validate_title(title), self._validate_description(description))
+                )
+            except ValueError as e:
+                raise ValueError(f"Item {position}: {e}") from None
+
+        first_id = self._next_id
+        now = datetime.now()
+        for offset, (title, description) in enumerate(validated):
+            task_id = first_id + offset
+            self._tasks[task_id] = Task(
+                id=task_id,
+                title=title,
+                description=description,
+                completed=False,
+                created_at=now
+            )
+        self._next_id = first_id + len(validated)
+
+        if self.journal is not None:
+            self._record([
+                ("add", task_id, None, self._task_fields(self._tasks[task_id]))
+                for task_id in range(first_id, self._next_id)
+            ])
+
+        return list(range(first_id, self._next_id))
+
     # CRUD-2: Implement Get Tasks
     def get_all_tasks(self) -> List[Task]:
         """
@@ -97,7 +191,7 @@ class TodoManager:
         Returns:
             List of all Task objects (empty list if no tasks exist)
         """
-        return self._tasks.copy()
+        return list(self._tasks.values())
 
     def get_task(self, task_id: int) -> Optional[Task]:
         """
@@ -109,10 +203,7 @@ class TodoManager:
         Returns:
             The Task object if found, None otherwise
         """
-        for task in self._tasks:
-            if task.id == task_id:
-                return task
-        return None
+        return self._tasks.get(task_id)
 
     # CRUD-3: Implement Update Task
     def update_task(
@@ -142,25 +233,30 @@ class TodoManager:
         if task is None:
             return False
 
-        # Validate and update title if provided
+        # Validate both fields before changing anything
         if title is not None:
-            if not title or not title.strip():
-                raise ValueError("Title cannot be empty")
+            title = self._validate_title(title)
+        if description is not None:
+            description = self._validate_description(description)
 
-            title = title.strip()
-            if len(title) > 200:
-                raise ValueError("Title cannot exceed 200 characters")
+        before = self._task_fields(task) if self.journal is not None else None
 
+        if title is not None:
             task.title = title
-
-        # Validate and update description if provided
         if description is not None:
-            description = description.strip()
-            if len(description) > 1000:
-                raise ValueError("Description cannot exceed 1000 characters")
-
             task.description = description
 
+        if before is not None:
+            after = self._task_fields(task)
+            changed = [key for key in JOURNALED_FIELDS if before[key] != after[key]]
+            if changed:
+                self._record([(
+                    "update",
+                    task_id,
+                    {key: before[key] for key in changed},
+                    {key: after[key] for key in changed}
+                )])
+
         return True
 
     # CRUD-4: Implement Delete Task
@@ -174,11 +270,13 @@ class TodoManager:
         Returns:
             True if task was deleted successfully, False if task not found
         """
-        for i, task in enumerate(self._tasks):
-            if task.id == task_id:
-                self._tasks.pop(i)
-                return True
-        return False
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return False
+
+        if self.journal is not None:
+            self._record([("delete", task_id, self._task_fields(task), None)])
+        return True
 
     # CRUD-5: Implement Toggle Complete
     def toggle_complete(self, task_id: int) -> bool:
@@ -198,4 +296,130 @@ class TodoManager:
             return False
 
         task.completed = not task.completed
+
+        if self.journal is not None:
+            self._record([
+                ("update", task_id, {"completed": not task.completed}, {"completed": task.completed})
+            ])
+        return True
+
+    # BULK-2: Implement Bulk Complete
+    def set_completed(self, task_ids: Iterable[int], completed: bool = True) -> List[int]:
+        """
+        Set the completion status of many tasks at once.
+
+        Args:
+            task_ids: IDs of the tasks to update
+            completed: The status to set (True for complete, False for incomplete)
+
+        Returns:
+            The IDs that were not found (empty list if all were updated)
+        """
+        missing = []
+        deltas = []
+        for task_id in task_ids:
+            task = self._tasks.get(task_id)
+            if task is None:
+                missing.append(task_id)
+            elif task.completed != completed:
+                task.completed = completed
+                deltas.append(("update", task_id, {"completed": not completed}, {"completed": completed}))
+
+        if self.journal is not None:
+            self._record(deltas)
+        return missing
+
+    # BULK-3: Implement Bulk Delete
+    def delete_tasks(self, task_ids: Iterable[int]) -> List[int]:
+        """
+        Delete many tasks at once.
+
+        Args:
+            task_ids: IDs of the tasks to delete
+
+        Returns:
+            The IDs that were not found (empty list if all were deleted)
+        """
+        missing = []
+        deltas = []
+        for task_id in task_ids:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                missing.append(task_id)
+            else:
+                deltas.append(("delete", task_id, self._task_fields(task), None))
+
+        if self.journal is not None:
+            self._record(deltas)
+        return missing
+
+    # HIST-1: Journal Helpers
+    @staticmethod
+    def _task_fields(task: Task) -> Dict[str, Any]:
+        """Return the journaled fields of a task as a dictionary."""
+        return {name: getattr(task, name) for name in JOURNALED_FIELDS}
+
+    def _record(self, deltas: List[Tuple[str, int, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        """Emit deltas to the journal stream and push them as one undo entry."""
+        journal = self.journal
+        journal.record([journal.emit(*delta) for delta in deltas])
+
+    def _apply_delta(
+        self,
+        op: str,
+        task_id: int,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Apply a journal delta to storage and publish it to the change stream.
+
+        Updated tasks are replaced with modified copies rather than mutated.
+        """
+        if op == "add":
+            self._tasks[task_id] = Task(id=task_id, **after)
+        elif op == "delete":
+            self._tasks.pop(task_id, None)
+        else:
+            self._tasks[task_id] = replace(self._tasks[task_id], **after)
+        self.journal.emit(op, task_id, before, after)
+
+    # HIST-2: Implement Undo/Redo
+    def undo(self) -> bool:
+        """
+        Undo the most recent operation recorded in the journal.
+
+        A task restored by undoing a delete keeps its ID but is listed after
+        the tasks that exist at the time of the undo.
+
+        Returns:
+            True if an operation was undone, False if there was nothing to undo
+        """
+        if self.journal is None:
+            return False
+        entry = self.journal.pop_undo()
+        if entry is None:
+            return False
+
+        for change in reversed(entry):
+            self._apply_delta(*change.inverse())
+        self.journal.push_redo(entry)
+        return True
+
+    def redo(self) -> bool:
+        """
+        Redo the most recently undone operation.
+
+        Returns:
+            True if an operation was redone, False if there was nothing to redo
+        """
+        if self.journal is None:
+            return False
+        entry = self.journal.pop_redo()
+        if entry is None:
+            return False
+
+        for change in entry:
+            self._apply_delta(change.op, change.task_id, change.before, change.after)
+        self.journal.push_undo(entry)
         return True
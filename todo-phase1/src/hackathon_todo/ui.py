@@ -3,10 +3,56 @@ User interface layer for the Hackathon Todo App.
 Handles all user interaction and display formatting.
 """
 
+import sys
 from typing import List, Optional
 from .todo_manager import TodoManager, Task
 
 
+DEFAULT_PAGE_SIZE = 20
+TABLE_RULE = "=" * 80
+TABLE_HEADER = f"{'ID':<5} {'Status':<10} {'Title':<30} {'Description':<35}"
+
+
+def format_task_row(task: Task) -> str:
+    """
+    Format a single task as one table row.
+
+    Args:
+        task: The task to format
+
+    Returns:
+        The formatted row (without trailing newline)
+    """
+    status = "[X]" if task.completed else "[ ]"
+    title = task.title[:27] + "..." if len(task.title) > 30 else task.title
+    desc = task.description[:32] + "..." if len(task.description) > 35 else task.description
+    return f"{task.id:<5} {status:<10} {title:<30} {desc:<35}"
+
+
+def render_task_table(tasks: List[Task], start: int = 0, stop: Optional[int] = None,
+                      footer: str = "") -> str:
+    """
+    Render a slice of tasks as a table in a single string.
+
+    Only the rows in tasks[start:stop] are formatted, so rendering one page
+    of a very large list costs the same as rendering a small list.
+
+    Args:
+        tasks: Full list of tasks
+        start: Index of the first row to render
+        stop: Index after the last row to render (None for the end of the list)
+        footer: Extra line shown after the task count (e.g. page info)
+
+    Returns:
+        The rendered table, ending with a newline
+    """
+    lines: List[str] = ["", TABLE_RULE, TABLE_HEADER, TABLE_RULE]
+    lines.extend(map(format_task_row, tasks[start:stop]))
+    lines.append(TABLE_RULE)
+    lines.append(f"Total tasks: {len(tasks)}{footer}")
+    return "\n".join(lines) + "\n"
+
+
 class TodoUI:
     """
     Console-based user interface for the todo application.
@@ -14,14 +60,27 @@ class TodoUI:
     """
 
     # UI-1: TodoUI Class Foundation
-    def __init__(self, manager: TodoManager):
+    def __init__(self, manager: TodoManager, page_size: int = DEFAULT_PAGE_SIZE):
         """
         Initialize the UI with a TodoManager instance.
 
         Args:
             manager: The TodoManager instance to use for operations
+            page_size: Number of tasks shown per page when viewing tasks
         """
         self.manager = manager
+        self.page_size = max(1, page_size)
+
+    # UI-1: Buffered Output Helper
+    def write(self, text: str) -> None:
+        """
+        Write text to stdout in a single write and flush once.
+
+        Args:
+            text: The text to write
+        """
+        sys.stdout.write(text)
+        sys.stdout.flush()
 
     # UI-1: Main Application Loop
     def run(self) -> None:
@@ -101,6 +160,8 @@ class TodoUI:
         """
         Display a list of tasks in a formatted table.
 
+        The whole table is built in memory and written in one call.
+
         Args:
             tasks: List of tasks to display
         """
@@ -108,19 +169,69 @@ class TodoUI:
             print("\nNo tasks yet. Add your first task to get started!")
             return
 
-        print(f"\n{'='*80}")
-        print(f"{'ID':<5} {'Status':<10} {'Title':<30} {'Description':<35}")
-        print(f"{'='*80}")
+        self.write(render_task_table(tasks))
 
-        for task in tasks:
-            status = "[X]" if task.completed else "[ ]"
-            title = task.title[:27] + "..." if len(task.title) > 30 else task.title
-            desc = task.description[:32] + "..." if len(task.description) > 35 else task.description
+    # UI-3: Display Tasks Page
+    def display_page(self, tasks: List[Task], page: int) -> None:
+        """
+        Display one page of tasks in a formatted table.
+
+        Args:
+            tasks: Full list of tasks
+            page: Zero-based page number (clamped to the valid range)
+        """
+        page_count = self.page_count(tasks)
+        page = min(max(page, 0), page_count - 1)
+        start = page * self.page_size
+        footer = f" | Page {page + 1}/{page_count}"
+        self.write(render_task_table(tasks, start, start + self.page_size, footer))
+
+    def page_count(self, tasks: List[Task]) -> int:
+        """Return the number of pages needed for tasks (at least 1)."""
+        return max(1, -(-len(tasks) // self.page_size))
+
+    # UI-3: Paged Task Browser
+    def browse_tasks(self, tasks: List[Task]) -> None:
+        """
+        Show tasks one page at a time with keyboard navigation.
+
+        Keys: n (next), p (previous), f (first), l (last), a page number,
+        or q / empty input to stop browsing.
+
+        Args:
+            tasks: List of tasks to browse
+        """
+        if not tasks:
+            print("\nNo tasks yet. Add your first task to get started!")
+            return
+
+        page_count = self.page_count(tasks)
+        page = 0
+        while True:
+            self.display_page(tasks, page)
+            if page_count == 1:
+                return
 
-            print(f"{task.id:<5} {status:<10} {title:<30} {desc:<35}")
+            try:
+                key = input("[n]ext [p]rev [f]irst [l]ast, page number, or [q]uit: ")
+            except EOFError:
+                return
+            key = key.strip().lower()
 
-        print(f"{'='*80}")
-        print(f"Total tasks: {len(tasks)}")
+            if key in ("", "q"):
+                return
+            elif key == "n":
+                page = min(page + 1, page_count - 1)
+            elif key == "p":
+                page = max(page - 1, 0)
+            elif key == "f":
+                page = 0
+            elif key == "l":
+                page = page_count - 1
+            elif key.isdigit() and 1 <= int(key) <= page_count:
+                page = int(key) - 1
+            else:
+                print(f"Error: Enter n, p, f, l, q or a page number between 1 and {page_count}.")
 
     # UI-4: Get Input Helper
     def get_input(self, prompt: str, allow_empty: bool = False) -> str:
@@ -227,7 +338,7 @@ class TodoUI:
 
         try:
             tasks = self.manager.get_all_tasks()
-            self.display_tasks(tasks)
+            self.browse_tasks(tasks)
         except Exception as e:
             print(f"\nError: Failed to retrieve tasks. {e}")
 
@@ -0,0 +1,174 @@
+"""
+SyncEngine and HttpClient against a local uvicorn stand-in for the Phase II API.
+
+The stand-in implements the two routes the sync module uses and, like the
+real API, replays the stored response when a request repeats an
+Idempotency-Key.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs
+
+import pytest
+
+uvicorn = pytest.importorskip("uvicorn")
+
+from hackathon_todo.journal import ChangeJournal
+from hackathon_todo.sync import HttpClient, SyncEngine, SyncError
+from hackathon_todo.todo_manager import TodoManager
+
+
+class StandInApi:
+    """In-memory /api/v1/{user_id}/tasks and /tasks/batch for one user."""
+
+    def __init__(self):
+        self.tasks = {}
+        self.next_id = 1
+        self.clock = datetime(2026, 1, 1)
+        self.requests = []  # (method, path, idempotency key)
+        self.responses = {}  # idempotency key -> body
+        self.delay = 0.0  # seconds before handling the next request
+
+    def _touch(self, task):
+        self.clock += timedelta(seconds=1)
+        task["updated_at"] = self.clock.isoformat()
+
+    def create(self, title, description=None, completed=False):
+        task = {"id": self.next_id, "title": title, "description": description, "completed": completed}
+        self.next_id += 1
+        self._touch(task)
+        self.tasks[task["id"]] = task
+        return task
+
+    def batch(self, body):
+        created = [self.create(item["title"], item.get("description"), item.get("completed", False))
+                   for item in body.get("create", [])]
+        for item in body.get("update", []):
+            task = self.tasks[item["id"]]
+            task.update({key: value for key, value in item.items() if key != "id"})
+            self._touch(task)
+        for task_id in body.get("delete", []):
+            self.tasks.pop(task_id, None)
+        return {"created": created}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        headers = dict(scope["headers"])
+        key = headers.get(b"idempotency-key", b"").decode() or None
+        self.requests.append((scope["method"], scope["path"], key))
+        if self.delay:
+            delay, self.delay = self.delay, 0.0
+            await asyncio.sleep(delay)
+
+        if key is not None and key in self.responses:
+            result = self.responses[key]
+        elif scope["method"] == "POST" and scope["path"].endswith("/tasks/batch"):
+            result = self.batch(json.loads(body))
+        elif scope["method"] == "GET" and scope["path"].endswith("/tasks"):
+            since = parse_qs(scope["query_string"].decode()).get("updated_since", [None])[0]
+            result = [task for task in self.tasks.values() if since is None or task["updated_at"] > since]
+        else:
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if key is not None:
+            self.responses[key] = result
+
+        payload = json.dumps(result).encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": payload})
+
+
+@pytest.fixture
+def api():
+    app = StandInApi()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    config = uvicorn.Config(app, log_level="warning", timeout_keep_alive=0.2)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    app.base_url = f"http://127.0.0.1:{sock.getsockname()[1]}/api/v1"
+    yield app
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+def make_engine(api, **kwargs):
+    manager = TodoManager(ChangeJournal())
+    return manager, SyncEngine(manager, HttpClient(api.base_url, **kwargs), user_id=1)
+
+
+def test_push_and_incremental_pull(api):
+    manager, engine = make_engine(api)
+    local_id = manager.add_task("Buy milk", "2 liters")
+    api.create("Call mom")
+
+    result = engine.sync()
+    assert (result.pulled, result.pushed) == (1, 1)
+    assert {task["title"] for task in api.tasks.values()} == {"Buy milk", "Call mom"}
+    assert sorted(task.title for task in manager.get_all_tasks()) == ["Buy milk", "Call mom"]
+
+    # Only tasks changed since the watermark come back
+    manager.toggle_complete(local_id)
+    engine.push()
+    api.create("Water plants")
+    assert engine.pull().pulled == 2
+    assert engine.pull().pulled == 0
+    assert api.requests[-1][0] == "GET"
+    engine.close()
+
+
+def test_undo_after_pull_keeps_remote_tasks(api):
+    manager, engine = make_engine(api)
+    api.create("Remote task")
+    engine.pull()
+
+    assert not manager.undo()
+    assert engine.pending == 0
+    engine.close()
+
+
+def test_stale_pooled_connection_is_retried_once(api):
+    manager, engine = make_engine(api)
+    engine.pull()
+    time.sleep(0.5)  # The stand-in closes idle keep-alive connections after 0.2s
+
+    manager.add_task("After idle")
+    assert engine.push() == 1
+
+    posts = [request for request in api.requests if request[0] == "POST"]
+    assert [task["title"] for task in api.tasks.values()] == ["After idle"]
+    assert len({key for _, _, key in posts}) == 1
+    engine.close()
+
+
+def test_timed_out_post_is_not_resent(api):
+    manager, engine = make_engine(api, timeout=0.3)
+    engine.pull()  # Leaves a pooled connection behind
+    manager.add_task("Slow")
+    api.delay = 0.6
+
+    with pytest.raises(SyncError):
+        engine.push()
+    time.sleep(0.5)
+
+    assert [request[0] for request in api.requests].count("POST") == 1
+    assert len(api.tasks) == 1
+    assert engine.pending == 1  # Still queued: the caller decides whether to push again
+    engine.close()